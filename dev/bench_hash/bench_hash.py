@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+import argparse
+import os
+import timeit
+from typing import Dict
+
+from subwinder.utils import _SumHasher
+
+CHUNK_SIZE_BYTES = 64 * 1024
+
+
+def main() -> None:
+    args = _parse_args()
+    results = bench_hash(args.runs)
+
+    for name, seconds in results.items():
+        print(f"{name:>8}: {seconds * 1_000_000:10.1f} us per file")
+    print(f"Speedup: {results['loop'] / results['current']:.1f}x")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-r",
+        "--runs",
+        type=int,
+        help="[Default: 200] Number of simulated files to hash for each hasher",
+        default=200,
+    )
+
+    return parser.parse_args()
+
+
+class LoopSumHasher(_SumHasher):
+    """
+    The original `_SumHasher` that summed each 8 byte block one at a time. Kept around
+    as a baseline to compare against.
+    """
+
+    def update(self, values: bytes) -> None:
+        for i in range(0, len(values), self.block_size):
+            chunk = values[i : i + self.block_size]
+            self.hash += int.from_bytes(chunk, byteorder="little")
+
+
+def _hash_chunks(hasher: _SumHasher, first: bytes, last: bytes) -> str:
+    hasher.update(first)
+    hasher.update(last)
+
+    return hasher.hexdigest()
+
+
+def bench_hash(runs: int = 200) -> Dict[str, float]:
+    """
+    Times hashing the two chunks of a simulated file with both the loop-based hasher
+    and the current one. Returns the average number of seconds per file for each.
+    """
+    first = os.urandom(CHUNK_SIZE_BYTES)
+    last = os.urandom(CHUNK_SIZE_BYTES)
+    filesize = CHUNK_SIZE_BYTES * 2
+
+    # Sanity check that we're actually timing equivalent work
+    ideal = _hash_chunks(LoopSumHasher(filesize), first, last)
+    assert ideal == _hash_chunks(_SumHasher(filesize), first, last)
+
+    results = {}
+    for name, hasher_class in [("loop", LoopSumHasher), ("current", _SumHasher)]:
+        total = timeit.timeit(
+            lambda: _hash_chunks(hasher_class(filesize), first, last), number=runs
+        )
+        results[name] = total / runs
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from subwinder._constants import TIME_FORMAT
+from subwinder._internal_utils import parse_timestamp
+
+
+def main() -> None:
+    args = _parse_args()
+    results = bench_timestamps(args.runs, args.unique)
+
+    for name, seconds in results.items():
+        print(f"{name:>9}: {seconds * 1_000_000:8.2f} us per timestamp")
+    print(f"Speedup (uncached): {results['strptime'] / results['uncached']:.1f}x")
+    print(f"Speedup (cached): {results['strptime'] / results['cached']:.1f}x")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-r",
+        "--runs",
+        type=int,
+        help="[Default: 20] Number of times to parse all of the timestamps",
+        default=20,
+    )
+    parser.add_argument(
+        "-u",
+        "--unique",
+        type=int,
+        help=(
+            "[Default: 500] Number of distinct timestamps (each is repeated once to"
+            " mimic results sharing upload dates)"
+        ),
+        default=500,
+    )
+
+    return parser.parse_args()
+
+
+def _timestamps(unique: int) -> List[str]:
+    rng = random.Random(0)
+    start = datetime(2005, 1, 1)
+    stamps = [
+        (start + timedelta(seconds=rng.randrange(20 * 365 * 24 * 60 * 60))).strftime(
+            TIME_FORMAT
+        )
+        for _ in range(unique)
+    ]
+
+    return stamps * 2
+
+
+def bench_timestamps(runs: int = 20, unique: int = 500) -> Dict[str, float]:
+    """
+    Times parsing a set of timestamps with `strptime`, with `parse_timestamp` while
+    skipping its memo, and with the memoized `parse_timestamp`. Returns the average
+    number of seconds per timestamp for each.
+    """
+    stamps = _timestamps(unique)
+    uncached = parse_timestamp.__wrapped__  # type: ignore
+
+    # Sanity check that we're actually timing equivalent work
+    ideal = [datetime.strptime(stamp, TIME_FORMAT) for stamp in stamps]
+    assert ideal == [uncached(stamp) for stamp in stamps]
+    assert ideal == [parse_timestamp(stamp) for stamp in stamps]
+
+    parsers = [
+        ("strptime", lambda stamp: datetime.strptime(stamp, TIME_FORMAT)),
+        ("uncached", uncached),
+        ("cached", parse_timestamp),
+    ]
+    results = {}
+    for name, parser in parsers:
+        total = timeit.timeit(lambda: [parser(stamp) for stamp in stamps], number=runs)
+        results[name] = total / (runs * len(stamps))
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ from typing import List, cast
 from subwinder import AuthSubwinder, MediaFile, info
 from subwinder.exceptions import SubHashError
 from subwinder.names import NameFormatter
-from subwinder.ranking import rank_search_subtitles
+from subwinder.ranking import Ranker, has_ext, score
 from subwinder.types import Lang2
 
 
@@ -43,15 +43,14 @@ def adv_quickstart(
 ) -> None:
     # So now let's get all the files in `INPUT_DIR` as `MediaFile` objects
     print(f"Scanning {input_dir}... ", end="")
+    # We only care about files
+    files = [item for item in input_dir.glob("**/*") if item.is_file()]
     media = []
-    for item in input_dir.glob("**/*"):
-        # We only care about files
-        if item.is_file():
-            # Hashing can fail if the file is too small (under 128 KiB)
-            try:
-                media.append(MediaFile(item))
-            except SubHashError:
-                pass
+    # Hash the files using a pool of threads, keeping them in the same order
+    for _, media_file in MediaFile.from_paths(files, ordered=True):
+        # Hashing can fail if the file is too small (under 128 KiB) or can't be read
+        if not isinstance(media_file, (SubHashError, OSError)):
+            media.append(media_file)
     print(f"Found {len(media)} files")
 
     # And now onto using the API, so I'm going to assume that all the credentials are
@@ -61,10 +60,7 @@ def adv_quickstart(
         # Now we can search for all of our `media` using our custom ranking function
         print("Searching... ", end="")
         results = asw.search_subtitles(
-            zip(media, repeat(lang)),
-            custom_rank_func,
-            author_whitelist,
-            sub_exts,
+            zip(media, repeat(lang)), custom_ranker(author_whitelist, sub_exts)
         )
         # Filter out items that didn't get any matches
         results = [result for result in results if result is not None]
@@ -72,7 +68,7 @@ def adv_quickstart(
 
         # Your number of downloads from the API are on a daily limit so slice our
         # desired number of downloads to the max
-        results = results[: asw.daily_download_info().remaining]
+        results = results[: asw.daily_remaining]
         print(f"Downloading {len(results)} subtitles... ", end="")
         download_paths = asw.download_subtitles(
             results, name_formatter=NameFormatter("{media_name}.{lang_3}.{ext}")
@@ -113,25 +109,23 @@ def adv_quickstart(
 
 
 # Lets setup our custom ranking function
-# Prefer `rank_by_whitelist` and keep the default ranking function as a fallback
-def custom_rank_func(results, query, author_whitelist, sub_exts=None):
-    return (
-        rank_by_whitelist(results, query, author_whitelist)
-        # Fallback to default ranking, but we decide not to `exclude_bad`
-        or rank_search_subtitles(results, query, exclude_bad=False, sub_exts=sub_exts)
-    )
+# Strongly prefer authors in the whitelist and use the score to break ties. We decide
+# not to exclude subtitles marked as bad, but we do only want `sub_exts` unless the
+# author is whitelisted
+def custom_ranker(author_whitelist, sub_exts):
+    def is_whitelisted(result):
+        # Author can be `None` if the subtitles were anonymously uploaded
+        return result.author is not None and result.author.name in author_whitelist
 
+    is_wanted_ext = has_ext(*sub_exts)
 
-def rank_by_whitelist(results, query, author_whitelist):
-    # Search all the results for a known-good author
-    for result in results:
-        # Author can be `None` if the subtitles were anonymously uploaded
-        if result.author is not None:
-            if result.author.name in author_whitelist:
-                return result
+    def is_wanted(result):
+        return is_whitelisted(result) or is_wanted_ext(result)
 
-    # No matching result
-    return None
+    return Ranker(
+        filters=[is_wanted],
+        keys=[(is_whitelisted, 1_000_000.0), (score, 1.0)],
+    )
 
 
 # So the reason storing this makes sense is that there is no way to go from a local
@@ -141,35 +135,40 @@ def rank_by_whitelist(results, query, author_whitelist):
 # can extend `Subtitles` while still using it in places that expect a `Subtitles`
 # (maybe you're storing and retrieving the information from a database or something).
 class ExtSubtitles(info.Subtitles):
+    # All of the members that make up a `Subtitles`
+    FIELDS = [
+        "size",
+        "id",
+        "file_id",
+        "sub_to_movie_id",
+        "filename",
+        "lang_2",
+        "ext",
+        "encoding",
+    ]
+
     @classmethod
     def from_subtitles(cls, sub_container):
         # Add the option for passing `SearchResults` in
         if isinstance(sub_container, info.SearchResult):
             sub_container = sub_container.subtitles
 
-        # We just want all the members from `sub_container` in our `ExtSubtitles`
-        # Yes this seems hacky, python's classes are _interesting_, so were going to
-        # create a `ExtSubtitles` skipping `__init__` by using `__new__` then set
-        # our members (aka `__dict__`) to all of those from `subtitles`
-        ext_subtitles = ExtSubtitles.__new__(ExtSubtitles)
-        ext_subtitles.__dict__ = sub_container.__dict__
-        return ext_subtitles
+        # We just want all the members from `sub_container` in our `ExtSubtitles`. The
+        # members are named the same as the params so we can just pass them all in
+        return cls(**{field: getattr(sub_container, field) for field in cls.FIELDS})
 
     def to_json_dict(self):
         # Need to get everything into a `dict` of json serializable values
-        json_dict = self.__dict__
+        json_dict = {field: getattr(self, field) for field in self.FIELDS}
         json_dict["filename"] = str(self.filename)
 
         return json_dict
 
     @classmethod
     def from_json_dict(cls, json_dict):
-        # And now we just need to do the reverse of `.to_json_dict(...)`
-        subtitles = info.Subtitles.__new__(info.Subtitles)
-        subtitles.filename = Path(subtitles.filename)
-
-        # Now return the `ExtSubtitles` for our `Subtitles`
-        return ExtSubtitles.from_subtitles(subtitles)
+        # And now we just need to do the reverse of `.to_json_dict(...)` which is easy
+        # since `filename` accepts a `str` too
+        return cls(**json_dict)
 
 
 if __name__ == "__main__":
@@ -125,8 +125,18 @@ def build_extended_media(obj):
 
 class ExtSearchResult(info.SearchResult):
     def __init__(self, search_result):
-        # All of the members are named the same the params so we can just pass in
-        super().__init__(**search_result.__dict__)
+        super().__init__(
+            search_result.author,
+            search_result.media,
+            search_result.subtitles,
+            search_result.upload_date,
+            search_result.num_bad_reports,
+            search_result.num_downloads,
+            search_result.num_comments,
+            search_result.rating,
+            search_result.score,
+            search_result.hearing_impaired,
+        )
 
     def __str__(self):
         TIME_FMT = "%Y-%m-%d %H:%M:%S"
@@ -1,6 +1,13 @@
 __version__ = "1.1.0"
 
+from subwinder.aio import AsyncAuthSubwinder, AsyncSubwinder
 from subwinder.core import AuthSubwinder, Subwinder
 from subwinder.media import MediaFile
 
-__all__ = ["AuthSubwinder", "MediaFile", "Subwinder"]
+__all__ = [
+    "AsyncAuthSubwinder",
+    "AsyncSubwinder",
+    "AuthSubwinder",
+    "MediaFile",
+    "Subwinder",
+]
@@ -0,0 +1,296 @@
+import asyncio
+import gzip
+import ssl
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from xml.parsers.expat import ExpatError
+from xmlrpc.client import ProtocolError, Transport, dumps, loads
+
+import subwinder._request
+from subwinder._constants import API_BASE
+from subwinder._internal_utils import type_check
+from subwinder._request import (
+    _RETRY_STATUS_CODES,
+    Endpoint,
+    PoolStats,
+    _call_params,
+    _send_error_resp,
+    _status_code,
+    _status_error,
+)
+from subwinder.types import ApiDict, Token
+
+# Plenty of room for the requests in flight from concurrent batches while still being
+# well under what the rate limit lets through anyways
+DEFAULT_MAX_CONNECTIONS = 16
+
+_Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class _Response:
+    def __init__(
+        self, status: int, reason: str, headers: Dict[str, str], body: bytes
+    ) -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.keep_alive = headers.get("connection", "").lower() != "close"
+
+
+class AsyncTransport:
+    """
+    Non-blocking XMLRPC transport that sends calls over HTTP/1.1 keeping up to
+    `max_connections` connections open so that they can be reused between calls.
+    Calls past `max_connections` wait for a connection to free up.
+    """
+
+    def __init__(
+        self, url: str = API_BASE, max_connections: int = DEFAULT_MAX_CONNECTIONS
+    ) -> None:
+        type_check(max_connections, int)
+        if max_connections < 1:
+            raise ValueError(
+                f"`max_connections` must be at least 1, given '{max_connections}'"
+            )
+
+        parts = urlsplit(url)
+        self.url = url
+        self.max_connections = max_connections
+
+        self._host = parts.hostname or ""
+        self._ssl = parts.scheme == "https"
+        self._port = parts.port or (443 if self._ssl else 80)
+        self._path = parts.path or "/"
+
+        self._idle: List[_Connection] = []
+        self._in_use = 0
+        self._hits = 0
+        self._misses = 0
+        self._reconnects = 0
+        # Created on first use so that it's tied to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(url: {repr(self.url)}, max_connections:"
+            f" {self.max_connections})"
+        )
+
+    async def _new_connection(self) -> _Connection:
+        context = ssl.create_default_context() if self._ssl else None
+        return await asyncio.open_connection(self._host, self._port, ssl=context)
+
+    async def _checkout(self) -> Tuple[_Connection, bool]:
+        while self._idle:
+            conn = self._idle.pop()
+            reader, writer = conn
+            if not reader.at_eof() and not writer.is_closing():
+                self._hits += 1
+                return conn, True
+
+            writer.close()
+
+        self._misses += 1
+        return await self._new_connection(), False
+
+    async def call(self, method_name: str, params: Sequence[Any]) -> Any:
+        """
+        Calls the XMLRPC method `method_name` with `params` returning the unmarshalled
+        result. Raises `ProtocolError` for non-200 responses and `Fault` for faults
+        just like `xmlrpc.client`.
+        """
+        body = dumps(tuple(params), method_name, allow_none=True).encode("utf-8")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+
+        async with self._semaphore:
+            self._in_use += 1
+            try:
+                resp = await self._roundtrip(body)
+            finally:
+                self._in_use -= 1
+
+        if resp.status != 200:
+            raise ProtocolError(
+                f"{self._host}{self._path}", resp.status, resp.reason, resp.headers
+            )
+
+        (result,), _ = loads(resp.body, use_builtin_types=False)
+        return result
+
+    async def _roundtrip(self, body: bytes) -> _Response:
+        conn, reused = await self._checkout()
+        try:
+            resp = await self._send(conn, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            conn[1].close()
+            # The server may have dropped an idle connection so retry once on a fresh
+            # one, but only if the connection was reused
+            if not reused:
+                raise
+
+            self._reconnects += 1
+            conn = await self._new_connection()
+            try:
+                resp = await self._send(conn, body)
+            except BaseException:
+                conn[1].close()
+                raise
+        except BaseException:
+            conn[1].close()
+            raise
+
+        if resp.keep_alive and len(self._idle) < self.max_connections:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+
+        return resp
+
+    async def _send(self, conn: _Connection, body: bytes) -> _Response:
+        reader, writer = conn
+        head = (
+            f"POST {self._path} HTTP/1.1\r\n"
+            f"Host: {self._host}\r\n"
+            f"User-Agent: {Transport.user_agent}\r\n"
+            "Content-Type: text/xml\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+        return await _read_response(reader)
+
+    async def close(self) -> None:
+        """
+        Closes all of the idle connections.
+        """
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    def stats(self) -> PoolStats:
+        """
+        Returns `PoolStats` describing how the connections have been used.
+        """
+        return PoolStats(
+            size=self.max_connections,
+            in_use=self._in_use,
+            idle=len(self._idle),
+            hits=self._hits,
+            misses=self._misses,
+            reconnects=self._reconnects,
+        )
+
+
+async def _read_response(reader: asyncio.StreamReader) -> _Response:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("The server closed the connection")
+
+    version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+    status, _, reason = rest.partition(" ")
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = await _read_chunked(reader)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        # Body is delimited by the server closing the connection
+        body = await reader.read()
+        headers["connection"] = "close"
+
+    if version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+        headers["connection"] = "close"
+
+    if headers.get("content-encoding", "").lower() == "gzip":
+        body = gzip.decompress(body)
+
+    return _Response(int(status), reason, headers, body)
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks: List[bytes] = []
+    while True:
+        size_line = await reader.readline()
+        # Chunk extensions are allowed after a ';'
+        size = int(size_line.split(b";")[0].strip(), 16)
+        if size == 0:
+            break
+
+        chunks.append(await reader.readexactly(size))
+        # Every chunk is followed by a CRLF
+        await reader.readexactly(2)
+
+    # Skip over any trailers
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+
+    return b"".join(chunks)
+
+
+async def _send(transport: AsyncTransport, method_name: str, *params: Any) -> Any:
+    """
+    Same as `subwinder._request._send`, but for the `AsyncTransport`.
+    """
+    # Read at call time so that `set_rate_limit` is shared with the sync client
+    rate_limiter = subwinder._request._rate_limiter
+    if rate_limiter is not None:
+        await rate_limiter.acquire_async()
+
+    try:
+        return await transport.call(method_name, params)
+    except (ExpatError, ProtocolError) as err:
+        return _send_error_resp(err)
+
+
+async def request(
+    transport: AsyncTransport, endpoint: Endpoint, token: Optional[Token], *params: Any
+) -> ApiDict:
+    """
+    Same as `subwinder._request.request`, but the call is sent over `transport` and
+    waiting between retries doesn't block the event loop.
+    """
+    TIMEOUT: int = 15
+    DELAY_FACTOR: int = 2
+    current_delay: float = 1.5
+    start: datetime = datetime.now()
+
+    call_params = _call_params(endpoint, token, params)
+
+    # Keep retrying if status code indicates rate limiting (429) or server error (5XX)
+    # until the `TIMEOUT` is hit
+    while True:
+        resp = await _send(transport, endpoint.value, *call_params)
+
+        if _status_code(resp) not in _RETRY_STATUS_CODES:
+            break
+
+        # Server under heavy load, wait and retry
+        remaining_time = TIMEOUT - (datetime.now() - start).total_seconds()
+        if remaining_time <= current_delay:
+            # Not enough time to try again so go ahead and `break`
+            break
+
+        await asyncio.sleep(current_delay)
+        current_delay *= DELAY_FACTOR
+
+    # Handle the response
+    err = _status_error(resp)
+    if err is not None:
+        raise err
+
+    return resp
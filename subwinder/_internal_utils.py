@@ -1,4 +1,11 @@
-from typing import Any, Tuple, Type, Union
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Tuple, Type, TypeVar, Union, cast
+
+from subwinder._constants import TIME_FORMAT
+
+T = TypeVar("T")
 
 
 def type_check(obj: Any, valid_classes: Union[Type[Any], Tuple[Type[Any], ...]]):
@@ -7,3 +14,43 @@ def type_check(obj: Any, valid_classes: Union[Type[Any], Tuple[Type[Any], ...]])
             f"Expected `obj` to be type from {valid_classes} or a derived class, but"
             f" got type {type(obj)} instead"
         )
+
+
+def intern_str(value: T) -> T:
+    """
+    Same as `sys.intern(value)`, but anything that isn't exactly a `str` (like the ints
+    the API sometimes gives for string fields) is passed through unchanged.
+    """
+    if type(value) is str:
+        return cast(T, sys.intern(cast(str, value)))
+
+    return value
+
+
+# Plenty for the distinct timestamps of a full search while keeping the memo small
+TIMESTAMP_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_timestamp(timestamp: str) -> datetime:
+    """
+    Same as `datetime.strptime(timestamp, TIME_FORMAT)`, but a lot faster for the
+    fixed-width timestamps the API uses. Repeated timestamps are memoized which is fine
+    since `datetime`s are immutable.
+    """
+    # `fromisoformat` parses "YYYY-MM-DD HH:MM:SS" exactly the same as `TIME_FORMAT`,
+    # anything else goes through `strptime` so that it's handled (or raises) the same
+    if (
+        len(timestamp) == 19
+        and timestamp[4] == "-"
+        and timestamp[7] == "-"
+        and timestamp[10] == " "
+        and timestamp[13] == ":"
+        and timestamp[16] == ":"
+    ):
+        try:
+            return datetime.fromisoformat(timestamp)
+        except ValueError:
+            pass
+
+    return datetime.strptime(timestamp, TIME_FORMAT)
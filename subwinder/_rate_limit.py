@@ -0,0 +1,166 @@
+import asyncio
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, List
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+from subwinder.types import AnyPath
+
+# The API allows 40 requests every 10 seconds. Any 10 second window lets through at
+# most `burst + 10 * rate` requests so these keep just under that
+DEFAULT_RATE = 3.5
+DEFAULT_BURST = 4
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that lets through `rate` requests per second on average
+    with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        if rate <= 0:
+            raise ValueError(f"`rate` must be positive, given '{rate}'")
+        if burst < 1:
+            raise ValueError(f"`burst` must be at least 1, given '{burst}'")
+
+        self.rate = rate
+        self.burst = burst
+
+        self._lock = threading.Lock()
+        # The bucket's state is the number of tokens as of the timestamp
+        self._state = [float(burst), time.time()]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rate: {self.rate}, burst: {self.burst})"
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[List[float]]:
+        with self._lock:
+            yield self._state
+
+    def _take(self) -> float:
+        """
+        Tries to take a token returning `0` if one was taken, otherwise the number of
+        seconds to wait before trying again.
+        """
+        with self._locked_state() as state:
+            tokens, last = state
+            now = time.time()
+            # Refill based off the time passed (ignoring clocks jumping backwards)
+            tokens = min(self.burst, tokens + max(now - last, 0) * self.rate)
+
+            if tokens >= 1:
+                state[:] = [tokens - 1, now]
+                return 0
+
+            state[:] = [tokens, now]
+            return (1 - tokens) / self.rate
+
+    def acquire(self) -> float:
+        """
+        Blocks until a request is allowed through, returning the seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if delay == 0:
+                return waited
+
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self) -> float:
+        """
+        Same as `acquire`, but waits without blocking the event loop.
+        """
+        waited = 0.0
+        while True:
+            delay = await self._take_async()
+            if delay == 0:
+                return waited
+
+            await asyncio.sleep(delay)
+            waited += delay
+
+    async def _take_async(self) -> float:
+        # The in-memory state is only locked for a moment so this is fine to call
+        # directly from the event loop
+        return self._take()
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Same as `TokenBucket`, but the state is kept in `lock_file` so that the limit is
+    shared by every process using the same file.
+    """
+
+    _STATE = struct.Struct("<dd")
+
+    def __init__(
+        self,
+        lock_file: AnyPath,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+    ) -> None:
+        super().__init__(rate, burst)
+        self.lock_file = Path(lock_file)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(lock_file: {repr(self.lock_file)}, rate:"
+            f" {self.rate}, burst: {self.burst})"
+        )
+
+    async def _take_async(self) -> float:
+        # Locking and reading the file blocks (possibly on another process) so keep it
+        # off of the event loop
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._take)
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[List[float]]:
+        # The thread lock keeps threads in this process from fighting over the file
+        with self._lock, self.lock_file.open("a+b") as file:
+            _lock_file(file)
+            try:
+                file.seek(0)
+                raw = file.read(self._STATE.size)
+                if len(raw) == self._STATE.size:
+                    state = list(self._STATE.unpack(raw))
+                else:
+                    # Fresh file so start with a full bucket
+                    state = [float(self.burst), time.time()]
+
+                yield state
+
+                file.seek(0)
+                file.truncate()
+                file.write(self._STATE.pack(*state))
+                file.flush()
+            finally:
+                _unlock_file(file)
+
+
+def _lock_file(file: BinaryIO) -> None:
+    if os.name == "nt":
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(file: BinaryIO) -> None:
+    if os.name == "nt":
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
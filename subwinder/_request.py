@@ -1,12 +1,25 @@
+import threading
 import time
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from http.client import ResponseNotReady
-from typing import Any, Dict, List, Optional, Type
+from http.client import (
+    HTTPSConnection,
+    ImproperConnectionState,
+    RemoteDisconnected,
+    ResponseNotReady,
+)
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
 from xml.parsers.expat import ExpatError
-from xmlrpc.client import ProtocolError, ServerProxy, Transport
+from xmlrpc.client import Fault, ProtocolError, SafeTransport, ServerProxy
 
 from subwinder._constants import API_BASE, REPO_URL
+from subwinder._rate_limit import (
+    DEFAULT_BURST,
+    DEFAULT_RATE,
+    FileTokenBucket,
+    TokenBucket,
+)
 from subwinder.exceptions import (
     SubAuthError,
     SubDownloadError,
@@ -15,7 +28,7 @@ from subwinder.exceptions import (
     SubUploadError,
     SubwinderError,
 )
-from subwinder.types import ApiDict, Token
+from subwinder.types import AnyPath, ApiDict, Token
 
 
 # The names of all the different endpoints exposed by opensubtitles
@@ -82,13 +95,298 @@ _API_ERROR_MAP: Dict[str, Type[SubwinderError]] = {
     "520": SubServerError,
 }
 
+# Rate limiting (429) and server errors (5XX) are worth retrying
+_RETRY_STATUS_CODES: Tuple[str, ...] = ("429", "503", "506", "520")
+
 _API_PROTOCOL_ERR_MAP: Dict[int, str] = {
     503: "503 Service Unavailable",
     506: "506 Server under maintenance",
     520: "520 Unknown internal error",
 }
 
-_client = ServerProxy(API_BASE, allow_none=True, transport=Transport())
+# Errors that indicate a kept-alive connection was closed out from under us
+_STALE_CONNECTION_ERRORS = (
+    RemoteDisconnected,
+    ImproperConnectionState,
+    ConnectionError,
+)
+
+DEFAULT_POOL_SIZE = 4
+
+
+@dataclass
+class PoolStats:
+    """
+    Data container for a snapshot of the connection pool's usage.
+    """
+
+    size: int
+    in_use: int
+    idle: int
+    hits: int
+    misses: int
+    reconnects: int
+
+
+class _PooledTransport(SafeTransport):
+    """
+    Thread-safe transport that keeps up to `max_connections` persistent HTTPS
+    connections alive between requests. Each request checks out a connection for the
+    duration of the call, and a connection that went stale while sitting idle (the
+    server's keep-alive ended) is transparently reconnected once.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_POOL_SIZE, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._local = threading.local()
+        self._idle: List[Tuple[str, HTTPSConnection]] = []
+        self._max_connections = 0
+        self._in_use = 0
+        self._hits = 0
+        self._misses = 0
+        self._reconnects = 0
+
+        self.resize(max_connections)
+
+    def _new_connection(self, host: str) -> HTTPSConnection:
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        return HTTPSConnection(chost, None, context=self.context, **(x509 or {}))
+
+    def _checkout(self, host: str) -> Tuple[HTTPSConnection, bool]:
+        with self._lock:
+            while self._in_use >= self._max_connections:
+                self._released.wait()
+            self._in_use += 1
+
+            # Prefer the most recently used connection since it's the least likely to
+            # have been closed by the server
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i][0] == host:
+                    self._hits += 1
+                    return self._idle.pop(i)[1], True
+
+            self._misses += 1
+
+        return self._new_connection(host), False
+
+    def _checkin(self, host: str, connection: HTTPSConnection) -> None:
+        with self._lock:
+            self._in_use -= 1
+            # Connections closed due to an error aren't worth keeping around
+            if connection.sock is not None:
+                self._idle.append((host, connection))
+            self._trim()
+            self._released.notify()
+
+    def _trim(self) -> None:
+        # Must be called with `_lock` held
+        while self._idle and len(self._idle) + self._in_use > self._max_connections:
+            _, connection = self._idle.pop(0)
+            connection.close()
+
+    def make_connection(self, host):
+        # `single_request` gets its connection from here, so hand back whichever one
+        # this thread has checked out
+        return self._local.connection
+
+    def close(self) -> None:
+        # Called by `single_request` when a request fails partway through. Only the
+        # calling thread's connection is in a bad state so leave the rest alone
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+
+    def close_all(self) -> None:
+        """
+        Closes all of the currently idle connections.
+        """
+        with self._lock:
+            for _, connection in self._idle:
+                connection.close()
+            self._idle = []
+
+    def request(self, host, handler, request_body, verbose=False):
+        connection, reused = self._checkout(host)
+        self._local.connection = connection
+
+        try:
+            try:
+                return self.single_request(host, handler, request_body, verbose)
+            except _STALE_CONNECTION_ERRORS:
+                # A fresh connection failing is a real error, but a reused one may
+                # have just hit the end of the server's keep-alive
+                if not reused:
+                    raise
+
+                with self._lock:
+                    self._reconnects += 1
+                # Closed connections automatically reconnect on the next request
+                connection.close()
+                return self.single_request(host, handler, request_body, verbose)
+        finally:
+            self._local.connection = None
+            self._checkin(host, connection)
+
+    def resize(self, max_connections: int) -> None:
+        """
+        Sets the maximum number of connections that can be open at once.
+        """
+        if max_connections < 1:
+            raise ValueError(
+                f"`max_connections` must be at least 1, given '{max_connections}'"
+            )
+
+        with self._lock:
+            self._max_connections = max_connections
+            self._trim()
+            self._released.notify_all()
+
+    def stats(self) -> PoolStats:
+        """
+        Returns a snapshot of the current `PoolStats`.
+        """
+        with self._lock:
+            return PoolStats(
+                size=self._max_connections,
+                in_use=self._in_use,
+                idle=len(self._idle),
+                hits=self._hits,
+                misses=self._misses,
+                reconnects=self._reconnects,
+            )
+
+
+_transport = _PooledTransport()
+# Flipped off if the server ever rejects `system.multicall`
+_multicall_supported = True
+# Proactively keeps requests under the API's rate limit
+_rate_limiter: Optional[TokenBucket] = TokenBucket()
+_client = ServerProxy(API_BASE, allow_none=True, transport=_transport)
+
+
+def set_pool_size(max_connections: int) -> None:
+    """
+    Sets the maximum number of persistent connections shared by all requests to the
+    API. Requests made while every connection is in use wait for one to free up.
+    """
+    _transport.resize(max_connections)
+
+
+def pool_stats() -> PoolStats:
+    """
+    Returns `PoolStats` describing how the shared connection pool has been used so far.
+    """
+    return _transport.stats()
+
+
+def set_rate_limit(
+    rate: Optional[float] = DEFAULT_RATE,
+    burst: int = DEFAULT_BURST,
+    lock_file: Optional[AnyPath] = None,
+) -> None:
+    """
+    Limits requests to the API to an average of `rate` requests per second with bursts
+    of up to `burst` requests. Processes that share the same `lock_file` also share
+    the limit. A `rate` of `None` disables rate limiting.
+    """
+    global _rate_limiter
+
+    if rate is None:
+        _rate_limiter = None
+    elif lock_file is None:
+        _rate_limiter = TokenBucket(rate, burst)
+    else:
+        _rate_limiter = FileTokenBucket(lock_file, rate, burst)
+
+
+def _call_params(
+    endpoint: Endpoint, token: Optional[Token], params: Sequence[Any]
+) -> List[Any]:
+    # Every endpoint except for the tokenless ones takes the token first
+    if endpoint in _TOKENLESS_ENDPOINTS:
+        return list(params)
+
+    return [token, *params]
+
+
+def _send(method: Callable[..., Any], *params: Any) -> Any:
+    """
+    Calls the XMLRPC `method` with `params` converting any transport level errors to
+    either a response `status` that can be retried or the appropriate exception.
+    """
+    # Wait our turn so that we stay under the rate limit instead of hitting it
+    if _rate_limiter is not None:
+        _rate_limiter.acquire()
+
+    try:
+        return method(*params)
+    except (ExpatError, ProtocolError, ResponseNotReady) as err:
+        return _send_error_resp(err)
+
+
+def _send_error_resp(err: Exception) -> ApiDict:
+    """
+    Converts an error from sending a request to either a response with a `status` that
+    can be retried, or raises the appropriate exception.
+    """
+    if isinstance(err, ExpatError):
+        # So an expat error was an error parsing the xml response. I believe this is
+        # hit when the API is having problems and sends a plaintext message instead
+        # of valid XML
+        raise SubServerError(
+            "The server sent invalid XML. Likely due to temporary server issues."
+        )
+    elif isinstance(err, ProtocolError):
+        # Try handling the `ProtocolError` appropriately
+        if err.errcode in _API_PROTOCOL_ERR_MAP:
+            return {"status": _API_PROTOCOL_ERR_MAP[err.errcode]}
+        else:
+            # Unexpected `ProtocolError`
+            raise SubLibError(
+                "The server returned an unhandled protocol error. Please raise an"
+                f" issue in the repo ({REPO_URL}) so that this can be handled in"
+                f" the future\nProtocolError: {err}"
+            )
+    elif isinstance(err, ResponseNotReady):
+        # From what I've found this occurs when the server's keep-alive ends and the
+        # socket closes. The transport already reconnects stale connections once,
+        # so hitting this means the server is really having issues and a
+        # `SubServerError` seems appropriate.
+        raise SubServerError(
+            "The server seems to be encoutering issues. Try again later."
+        )
+
+    raise err
+
+
+def _status_code(resp: ApiDict) -> str:
+    # Some endpoints don't return a status when "OK" like GetSubLanguages or
+    # ServerInfo, so force the status if it's missing
+    if "status" not in resp:
+        resp["status"] = "200 OK"
+
+    return resp["status"][:3]
+
+
+def _status_error(resp: ApiDict) -> Optional[SubwinderError]:
+    """
+    Returns the exception matching the status of `resp` or `None` if it was "OK".
+    """
+    status_code = _status_code(resp)
+    status_msg: str = resp["status"][4:]
+
+    if status_code == "200":
+        return None
+    elif status_code in _API_ERROR_MAP:
+        return _API_ERROR_MAP[status_code](status_msg)
+    else:
+        return SubLibError(
+            "the API returned an unhandled response, consider raising an issue to"
+            f" address this at {REPO_URL}\nResponse status: '{resp['status']}'"
+        )
 
 
 # TODO: give a way to let lib user to set `TIMEOUT`?
@@ -106,54 +404,18 @@ def request(endpoint: Endpoint, token: Optional[Token], *params: Any) -> ApiDict
     current_delay: float = 1.5
     start: datetime = datetime.now()
 
+    # Flexible way to call method while reducing error handling
+    method = getattr(_client, endpoint.value)
+    call_params = _call_params(endpoint, token, params)
+
     # Keep retrying if status code indicates rate limiting (429) or server error (5XX)
     # until the `TIMEOUT` is hit
     while True:
-        try:
-            if endpoint in _TOKENLESS_ENDPOINTS:
-                # Flexible way to call method while reducing error handling
-                resp = getattr(_client, endpoint.value)(*params)
-            else:
-                # Use the token if it's defined
-                resp = getattr(_client, endpoint.value)(token, *params)
-
-        except ExpatError:
-            # So an expat error was an error parsing the xml response. I believe this is
-            # hit when the API is having problems and sends a plaintext message instead
-            # of valid XML
-            raise SubServerError(
-                "The server sent invalid XML. Likely due to temporary server issues."
-            )
-        except ProtocolError as err:
-            # Try handling the `ProtocolError` appropriately
-            if err.errcode in _API_PROTOCOL_ERR_MAP:
-                resp = {"status": _API_PROTOCOL_ERR_MAP[err.errcode]}
-            else:
-                # Unexpected `ProtocolError`
-                raise SubLibError(
-                    "The server returned an unhandled protocol error. Please raise an"
-                    f" issue in the repo ({REPO_URL}) so that this can be handled in"
-                    f" the future\nProtocolError: {err}"
-                )
-        except ResponseNotReady:
-            # From what I've found this occurs when the server's keep-alive ends and the
-            # socket closes. This only seems to occur when the server is having issues,
-            # so a `SubServerError` seems appropriate.
-            raise SubServerError(
-                "The server seems to be encoutering issues. Try again later."
-            )
-
-        # Some endpoints don't return a status when "OK" like GetSubLanguages or
-        # ServerInfo, so force the status if it's missing
-        if "status" not in resp:
-            resp["status"] = "200 OK"
-
-        status_code: str = resp["status"][:3]
-        status_msg: str = resp["status"][4:]
+        resp = _send(method, *call_params)
 
         # Retry if rate limit was hit (429) or server error (5XX), otherwise handle
         # appropriately
-        if status_code not in ("429", "503", "506", "520"):
+        if _status_code(resp) not in _RETRY_STATUS_CODES:
             break
 
         # Server under heavy load, wait and retry
@@ -166,12 +428,70 @@ def request(endpoint: Endpoint, token: Optional[Token], *params: Any) -> ApiDict
         current_delay *= DELAY_FACTOR
 
     # Handle the response
-    if status_code == "200":
-        return resp
-    elif status_code in _API_ERROR_MAP:
-        raise _API_ERROR_MAP[status_code](status_msg)
-    else:
-        raise SubLibError(
-            "the API returned an unhandled response, consider raising an issue to"
-            f" address this at {REPO_URL}\nResponse status: '{resp['status']}'"
-        )
+    err = _status_error(resp)
+    if err is not None:
+        raise err
+
+    return resp
+
+
+def multicall(
+    calls: Sequence[Tuple[Endpoint, Optional[Token], Sequence[Any]]]
+) -> List[Union[ApiDict, SubwinderError]]:
+    """
+    Sends all of the `(endpoint, token, params)` `calls` in a single `system.multicall`
+    request. The responses are returned in the same order as `calls` where any call
+    that failed is replaced by the exception `request` would have raised for it. If the
+    server rejects multicall then the calls are just sent one at a time instead.
+    """
+    global _multicall_supported
+
+    if not calls:
+        return []
+
+    resps: Any = None
+    if _multicall_supported:
+        payload = [
+            {
+                "methodName": endpoint.value,
+                "params": _call_params(endpoint, token, params),
+            }
+            for endpoint, token, params in calls
+        ]
+        try:
+            resps = _send(_client.system.multicall, payload)
+        except Fault:
+            # Server doesn't support multicall, so don't bother trying again
+            _multicall_supported = False
+
+    # A single `dict` means the whole multicall hit a retryable server error, so let
+    # `request` handle each call with its usual backoff instead
+    if not isinstance(resps, list):
+        resps = [None] * len(calls)
+
+    results: List[Union[ApiDict, SubwinderError]] = []
+    for (endpoint, token, params), resp in zip(calls, resps):
+        # Successful calls are wrapped in a single item list, failures are a fault
+        # `dict`
+        if isinstance(resp, list):
+            resp = resp[0]
+            if _status_code(resp) not in _RETRY_STATUS_CODES:
+                err = _status_error(resp)
+                results.append(resp if err is None else err)
+                continue
+        elif isinstance(resp, dict) and "faultCode" in resp:
+            results.append(
+                SubLibError(
+                    f"The server faulted on '{endpoint.value}' ({resp['faultCode']}):"
+                    f" {resp['faultString']}"
+                )
+            )
+            continue
+
+        # Either multicall wasn't used or the call needs to be retried
+        try:
+            results.append(request(endpoint, token, *params))
+        except SubwinderError as err:
+            results.append(err)
+
+    return results
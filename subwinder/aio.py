@@ -0,0 +1,573 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Union, cast
+
+# See: https://github.com/LovecraftianHorror/subwinder/issues/52#issuecomment-637333960
+# if you want to know why `request` isn't imported with `from`
+import subwinder._async_request
+from subwinder._async_request import DEFAULT_MAX_CONNECTIONS, AsyncTransport
+from subwinder._internal_utils import type_check
+from subwinder._request import Endpoint, PoolStats
+from subwinder.cache import DownloadLedger, SearchCache, SubtitleStore, TokenStore
+from subwinder.core import (
+    _SESSION_ENDPOINTS,
+    _AuthMixin,
+    _check_batch_size,
+    _check_daily_remaining,
+    _check_guess_queries,
+    _check_search_queries,
+    _check_vote_score,
+    _chunks,
+    _dedupe_search_queries,
+    _DownloadPlan,
+    _fan_out_search_results,
+    _get_subtitles,
+    _login_token,
+    _parse_comments,
+    _parse_guesses,
+    _parse_previews,
+    _parse_suggestions,
+    _PreparedQuery,
+    _save_subtitles,
+    _search_batch_size,
+    _search_batches,
+    _should_coalesce,
+    _store_subtitles,
+    _sub_to_movie_id,
+    _unique_ids,
+    _validate_token,
+)
+from subwinder.exceptions import SubAuthError, SubLibError
+from subwinder.info import (
+    Comment,
+    DownloadInfo,
+    FullUser,
+    GuessMediaResult,
+    Media,
+    Movie,
+    SearchResult,
+    ServerInfo,
+    Subtitles,
+    TvSeries,
+)
+from subwinder.lang import _converter, lang_2s, lang_3s, lang_longs
+from subwinder.names import BaseNameFormatter, NameFormatter
+from subwinder.ranking import rank_guess_media, rank_search_subtitles
+from subwinder.types import AnyPath, ApiDict, SearchQuery, SubContainer, Token
+
+
+async def _gather_batch(
+    function: Callable,
+    batch_size: int,
+    iterables: Sequence[Sequence[Any]],
+    *args: Any,
+    **kwargs: Any,
+) -> List[Any]:
+    """
+    Same as `subwinder.core._batch`, but all the batches are run concurrently. Results
+    are still combined in the same order as `iterables`.
+    """
+    batches = await asyncio.gather(
+        *(
+            function(*chunked, *args, **kwargs)
+            for chunked in _chunks(batch_size, iterables)
+        )
+    )
+
+    results: List[Any] = []
+    for result in batches:
+        if result is not None:
+            results += result
+
+    return results
+
+
+async def _refresh_langs() -> None:
+    # Language lookups may have to fetch the language list which blocks, so make sure
+    # it's fresh from a thread instead of stalling the event loop
+    if not _converter.pinned and not _converter._is_fresh():
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, _converter._maybe_update)
+
+
+class AsyncSubwinder:
+    """
+    Same as `Subwinder`, but for use with `asyncio`. Up to `max_connections` requests
+    are kept in flight at once with connections reused between requests.
+    """
+
+    _token: Optional[Token] = None
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS) -> None:
+        self._transport = AsyncTransport(max_connections=max_connections)
+
+    async def __aenter__(self) -> AsyncSubwinder:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+    async def _request(self, endpoint: Endpoint, *params: Any) -> ApiDict:
+        """
+        Call the API `Endpoint` represented by `method` with any of the given `params`.
+        """
+        return await subwinder._async_request.request(
+            self._transport, endpoint, self._token, *params
+        )
+
+    async def close(self) -> None:
+        """
+        Closes any open connections. Automatically called on exiting `async with`.
+        """
+        await self._transport.close()
+
+    def pool_stats(self) -> PoolStats:
+        """
+        Returns `PoolStats` for this client's connections.
+        """
+        return self._transport.stats()
+
+    async def daily_download_info(self) -> DownloadInfo:
+        """
+        Returns `DownloadInfo` for the current client.
+        """
+        return (await self.server_info()).daily_download_info
+
+    async def get_languages(self) -> List[Tuple[str, str, str]]:
+        """
+        Gets a list of the supported languages for the API in their various formats.
+        """
+        await _refresh_langs()
+        return list(zip(lang_2s, lang_3s, lang_longs))
+
+    async def server_info(self) -> ServerInfo:
+        """
+        Returns `ServerInfo` for the opensubtitles.
+        """
+        return ServerInfo.from_data(await self._request(Endpoint.SERVER_INFO))
+
+
+class AsyncAuthSubwinder(_AuthMixin, AsyncSubwinder):
+    """
+    Same as `AuthSubwinder`, but for use with `asyncio`. The user is logged in on
+    entering `async with` and logged out on exiting it.
+    """
+
+    _replacing: Optional[asyncio.Future[Token]] = None
+
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        password_hash: Optional[str] = None,
+        useragent: Optional[str] = None,
+        search_cache: Optional[SearchCache] = None,
+        token_store: Optional[TokenStore] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ) -> None:
+        super().__init__(max_connections)
+
+        self._setup_auth(
+            username, password, password_hash, useragent, search_cache, token_store
+        )
+
+    async def __aenter__(self) -> AsyncAuthSubwinder:
+        if self.token_store is None:
+            await self._login()
+        else:
+            # The store's lock can wait on another process logging in so keep it off of
+            # the event loop
+            loop = asyncio.get_event_loop()
+            self._token = await loop.run_in_executor(
+                None,
+                self.token_store.acquire,
+                self._session_key,
+                self._login_session,
+                _validate_token,
+            )
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            # Shared sessions are only logged out by their last holder
+            last_holder = True
+            if self.token_store is not None:
+                loop = asyncio.get_event_loop()
+                last_holder = await loop.run_in_executor(
+                    None, self.token_store.release, self._session_key, self._token
+                )
+                if not last_holder:
+                    self._token = None
+
+            # Logout on exiting `async with` if all is well
+            if exc_type is None and last_holder:
+                await self._logout()
+        finally:
+            await self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(_token: {repr(self._token)})"
+
+    async def _request(self, endpoint: Endpoint, *params: Any) -> ApiDict:
+        token, token_store = self._token, self.token_store
+        try:
+            return await super()._request(endpoint, *params)
+        except SubAuthError:
+            if token_store is None or endpoint in _SESSION_ENDPOINTS:
+                raise
+
+        # The shared session expired or was logged out, so replace it and try again.
+        # Any other requests that got rejected in the meantime wait on the same
+        # replacement
+        if self._token == token:
+            if self._replacing is None:
+                loop = asyncio.get_event_loop()
+                self._replacing = loop.run_in_executor(
+                    None,
+                    token_store.replace,
+                    self._session_key,
+                    cast(Token, token),
+                    self._login_session,
+                )
+
+            replacing = self._replacing
+            try:
+                self._token = await replacing
+            finally:
+                self._replacing = None
+
+        return await super()._request(endpoint, *params)
+
+    def _login_session(self) -> Token:
+        # Called from the executor by the `token_store` so this has to block
+        return _login_token(*self._credentials)
+
+    async def _login(self) -> None:
+        """
+        Handles logging in the user and storing the auth token. Automatically called on
+        entering `async with` so no need to call it directly.
+        """
+        username, password_hash, useragent = self._credentials
+        resp = await self._request(
+            Endpoint.LOG_IN, username, password_hash, "en", useragent
+        )
+        self._token = Token(resp["token"])
+
+    async def _logout(self) -> None:
+        """
+        Attempts to log out the user from the current session. Automatically called on
+        exiting `async with` so no need to call it directly.
+        """
+        await self._request(Endpoint.LOG_OUT)
+        self._token = None
+
+    @property
+    def daily_remaining(self) -> Optional[int]:
+        """
+        The locally tracked number of downloads remaining for the day. Unlike
+        `AuthSubwinder.daily_remaining` this never makes a request, so it's `None`
+        until synced by `.server_info()`, `.daily_download_info()`, or a download.
+        """
+        return self._quota
+
+    async def _daily_remaining(self) -> int:
+        if self._quota_is_stale():
+            self._sync_quota((await self.daily_download_info()).remaining)
+
+        return cast(int, self._quota)
+
+    async def server_info(self) -> ServerInfo:
+        """
+        Returns `ServerInfo` for the opensubtitles. This also syncs `daily_remaining`.
+        """
+        info = await super().server_info()
+        self._sync_quota(info.daily_download_info.remaining)
+        return info
+
+    async def download_subtitles(
+        self,
+        downloads: Sequence[SubContainer],
+        download_dir: Optional[AnyPath] = None,
+        name_formatter: BaseNameFormatter = NameFormatter("{upload_filename}"),
+        skip_existing: bool = False,
+        ledger: Optional[DownloadLedger] = None,
+        store: Optional[SubtitleStore] = None,
+    ) -> List[Path]:
+        """
+        Same as `AuthSubwinder.download_subtitles`, but every batch is downloaded
+        concurrently.
+        """
+        await _refresh_langs()
+
+        # Checking for existing files is blocking IO so keep it off of the event loop
+        loop = asyncio.get_event_loop()
+        plan = await loop.run_in_executor(
+            None,
+            _DownloadPlan,
+            downloads,
+            download_dir,
+            name_formatter,
+            skip_existing,
+            ledger,
+            store,
+        )
+
+        if plan.pending_subs:
+            # Check that the user has enough downloads remaining for everything left
+            _check_daily_remaining(
+                await self._daily_remaining(), len(plan.pending_subs)
+            )
+
+        # Nothing is written from the store until the downloads are good to go
+        await loop.run_in_executor(None, plan.fill_from_store)
+
+        if plan.pending_subs:
+            # Download the subtitles in batches of 20, per api spec
+            try:
+                await _gather_batch(
+                    self._download_subtitles,
+                    20,
+                    [plan.pending_subs, plan.pending_paths],
+                    ledger,
+                    store,
+                )
+            except Exception:
+                # Either the API says we're out of downloads (407) or some batches may
+                # have gone through, so sync up again before the next check
+                self._invalidate_quota()
+                raise
+            self._use_quota(len(plan.pending_subs))
+
+        await loop.run_in_executor(None, plan.finish)
+        self._record_downloads(plan)
+
+        # Return the list of paths where subtitle files were saved
+        return plan.download_paths
+
+    async def _download_subtitles(
+        self,
+        sub_containers: List[Subtitles],
+        filepaths: List[Path],
+        ledger: Optional[DownloadLedger] = None,
+        store: Optional[SubtitleStore] = None,
+    ) -> None:
+        sub_file_ids = [sub_container.file_id for sub_container in sub_containers]
+
+        data = (await self._request(Endpoint.DOWNLOAD_SUBTITLES, sub_file_ids))["data"]
+
+        # Saving is regular file IO so keep it off of the event loop
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, _save_subtitles, data, filepaths)
+        if store is not None:
+            await loop.run_in_executor(
+                None, _store_subtitles, store, sub_file_ids, data
+            )
+        if ledger is not None:
+            await loop.run_in_executor(
+                None, ledger.record, list(zip(filepaths, sub_file_ids))
+            )
+
+    async def get_comments(
+        self, sub_containers: Sequence[SubContainer], batch_size: int = 20
+    ) -> List[List[Comment]]:
+        """
+        Same as `AuthSubwinder.get_comments`, but every batch is requested concurrently.
+        """
+        type_check(sub_containers, (list, tuple))
+        _check_batch_size(batch_size)
+
+        ids = [_get_subtitles(sub_container).id for sub_container in sub_containers]
+        unique = _unique_ids(ids)
+        groups = await _gather_batch(self._get_comments, batch_size, [unique])
+
+        # Give every container its own list, including repeats
+        by_id = dict(zip(unique, groups))
+        return [list(by_id[id]) for id in ids]
+
+    async def _get_comments(self, ids: List[str]) -> List[List[Comment]]:
+        data = (await self._request(Endpoint.GET_COMMENTS, _unique_ids(ids)))["data"]
+
+        return _parse_comments(ids, data)
+
+    async def user_info(self) -> FullUser:
+        """
+        Get information stored for the current user.
+        """
+        data = (await self._request(Endpoint.GET_USER_INFO))["data"]
+
+        await _refresh_langs()
+        return FullUser.from_data(data)
+
+    async def ping(self) -> None:
+        """
+        Pings the API to keep the session active.
+        """
+        await self._request(Endpoint.NO_OPERATION)
+
+    async def guess_media(
+        self,
+        queries: Sequence[str],
+        ranking_func: Callable[..., Optional[Media]] = rank_guess_media,
+        *rank_args: Any,
+        **rank_kwargs: Any,
+    ) -> List[Optional[Media]]:
+        """
+        Same as `guess_media_unranked`, but selects the best result using `ranking_func`
+        """
+        results = await self.guess_media_unranked(queries)
+
+        selected: List[Optional[Media]] = []
+        for result, query in zip(results, queries):
+            selected.append(ranking_func(result, query, *rank_args, **rank_kwargs))
+
+        return selected
+
+    async def guess_media_unranked(
+        self, queries: Sequence[str]
+    ) -> List[GuessMediaResult]:
+        """
+        Attempts to guess the media described by each of the `queries`.
+        """
+        queries = _check_guess_queries(queries)
+
+        # Batch to 3 per api spec
+        return await _gather_batch(self._guess_media_unranked, 3, [queries])
+
+    async def _guess_media_unranked(self, queries: List[str]) -> List[GuessMediaResult]:
+        data = (await self._request(Endpoint.GUESS_MOVIE_FROM_STRING, queries))["data"]
+
+        return _parse_guesses(queries, data)
+
+    async def report_media(self, sub_container: SubContainer) -> None:
+        """
+        Reports the subtitles tied to the `sub_container`. This can only be done if
+        the match was done using a `MediaFile` object.
+        """
+        sub_to_movie_id = _sub_to_movie_id(sub_container)
+
+        await self._request(Endpoint.REPORT_WRONG_MOVIE_HASH, sub_to_movie_id)
+
+    async def search_subtitles(
+        self,
+        queries: Iterable[SearchQuery],
+        ranking_func: Callable[..., Optional[SearchResult]] = rank_search_subtitles,
+        *rank_args: Any,
+        **rank_kwargs: Any,
+    ) -> List[Optional[SearchResult]]:
+        """
+        Same as `search_subtitles_unranked`, but the results are run through the
+        `ranking_func` first to try and determine the best result.
+        """
+        queries = list(queries)
+
+        groups = await self.search_subtitles_unranked(queries)
+
+        selected: List[Optional[SearchResult]] = []
+        for group, (query, _) in zip(groups, queries):
+            selected.append(ranking_func(group, query, *rank_args, **rank_kwargs))
+
+        return selected
+
+    async def search_subtitles_unranked(
+        self, queries: Iterable[SearchQuery]
+    ) -> List[List[SearchResult]]:
+        """
+        Searches for any subtitles that match the provided `queries`. Queries are
+        allowed to be `MediaFile`, `Movie`, or `Episode` objects.
+        """
+        await _refresh_langs()
+        prepared = [_PreparedQuery(q) for q in _check_search_queries(queries)]
+
+        # Only search for each unique query once
+        unique, positions = _dedupe_search_queries(prepared)
+        batch_size = _search_batch_size(self.limited_search_size)
+        coalesce = _should_coalesce(self.limited_search_size)
+        batches = list(_search_batches(unique, batch_size, coalesce))
+        self._record_search(prepared, len(unique), len(batches), batch_size)
+
+        groups = await asyncio.gather(
+            *(self._search_subtitles_unranked(batch) for batch in batches)
+        )
+        unique_groups = [group for batch in groups for group in batch]
+
+        return _fan_out_search_results(prepared, positions, unique_groups)
+
+    async def _search_subtitles_unranked(
+        self, queries: Sequence[_PreparedQuery]
+    ) -> List[List[SearchResult]]:
+        # The search cache can be on disk so keep it off of the event loop
+        loop = asyncio.get_event_loop()
+        plan = await loop.run_in_executor(None, self._plan_search, queries)
+
+        data = None
+        if plan.merged:
+            data = (await self._request(Endpoint.SEARCH_SUBTITLES, plan.merged))["data"]
+
+        return await loop.run_in_executor(None, plan.results, data)
+
+    async def suggest_media(self, query: str) -> List[Union[Movie, TvSeries]]:
+        """
+        Suggest results for guesses of what media is described by `query`.
+        """
+        type_check(query, str)
+
+        data = (await self._request(Endpoint.SUGGEST_MOVIE, query))["data"]
+
+        return _parse_suggestions(query, data)
+
+    async def add_comment(
+        self, sub_container: SubContainer, comment_str: str, bad: bool = False
+    ) -> None:
+        """
+        Adds the comment `comment_str` for the `sub_container`. If desired you can
+        denote that the comment is due to the result being `bad`.
+        """
+        sub_id = _get_subtitles(sub_container).id
+
+        await self._request(Endpoint.ADD_COMMENT, sub_id, comment_str, bad)
+
+    async def vote(self, sub_container: SubContainer, score: int) -> None:
+        """
+        Votes for the `sub_container` with a score of `score`.
+        """
+        sub_id = _get_subtitles(sub_container).id
+        _check_vote_score(score)
+
+        await self._request(Endpoint.SUBTITLES_VOTE, sub_id, score)
+
+    async def auto_update(self, program_name: str) -> Optional[ApiDict]:
+        """
+        Returns information about `program_name` that is supposed to be useful for
+        automatic updates. (Version info and download urls)
+        """
+        type_check(program_name, str)
+
+        try:
+            return await self._request(Endpoint.AUTO_UPDATE, program_name)
+        except SubLibError:
+            # No matching program name is returned as "invalid parameters"
+            return None
+
+    async def preview_subtitles(
+        self, sub_containers: Sequence[SubContainer]
+    ) -> List[str]:
+        """
+        Gets a preview for the subtitles represented by `sub_containers`.
+        """
+        type_check(sub_containers, (list, tuple))
+
+        file_ids = [_get_subtitles(sc).file_id for sc in sub_containers]
+
+        # Batch to 20 per api spec
+        return await _gather_batch(self._preview_subtitles, 20, [file_ids])
+
+    async def _preview_subtitles(self, ids: List[str]) -> List[str]:
+        data = (await self._request(Endpoint.PREVIEW_SUBTITLES, ids))["data"]
+
+        return _parse_previews(data)
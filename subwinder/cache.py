@@ -0,0 +1,847 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from subwinder._internal_utils import type_check
+from subwinder.types import AnyPath, ApiDict, Token
+from subwinder.utils import special_hash
+
+# Subtitles for a query change slowly, but a query with no results is more likely to
+# pick some up soon so those are kept for less time
+DEFAULT_SEARCH_TTL = 24 * 60 * 60
+DEFAULT_NEGATIVE_SEARCH_TTL = 60 * 60
+# Compressed subtitles are normally well under 100 KiB so this is room for plenty
+DEFAULT_STORE_MAX_BYTES = 1024 * 1024 * 1024
+STORE_CHUNK_SIZE = 64 * 1024
+# Sessions only expire after 15 minutes of inactivity so a token that was just used is
+# safe to reuse without checking it first
+DEFAULT_TOKEN_REVALIDATE_AFTER = 60
+# Logging in happens while holding the lock so leave plenty of time for it
+DEFAULT_TOKEN_LOCK_TIMEOUT = 60
+# `HashCache` hits only bump `last_used` in memory, then write it out in batches of
+# this many so that a rescan isn't one write transaction per file
+_TOUCH_BATCH_SIZE = 256
+
+
+@dataclass
+class CacheStats:
+    """
+    Data container for how much a cache has been used.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+
+
+_DB = TypeVar("_DB", bound="_SQLiteBacked")
+
+
+class _SQLiteBacked:
+    """
+    Base for everything here that keeps its state in a SQLite database. Access can
+    come from many threads (`MediaFile.from_paths`, `download_subtitles`'s
+    `parallelism`, or the async clients' executor) so the connection is shared and
+    serialized with `_lock`.
+    """
+
+    path: Path
+    _lock: threading.Lock
+    _db: sqlite3.Connection
+    # Bookkeeping for the ones that are caches
+    _hits: int = 0
+    _misses: int = 0
+    _evictions: int = 0
+    _num_entries: int = 0
+    # Just an ever increasing counter to avoid ties from clocks with a low resolution
+    _last_used: int = 0
+
+    def _connect(self, db_path: Path, *schema: str, **connect_kwargs: Any) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(db_path), check_same_thread=False, **connect_kwargs
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in schema:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def __enter__(self: _DB) -> _DB:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path: {repr(self.path)})"
+
+    def _tick(self) -> int:
+        # Must be called with `_lock` held
+        self._last_used += 1
+        return self._last_used
+
+    def _stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=self._num_entries,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class HashCache(_SQLiteBacked):
+    """
+    Opt-in on-disk cache of `special_hash`es stored in a SQLite database at `path`.
+    Entries are keyed off a file's device, inode, size, and modification time so any
+    change to a file is automatically a miss. Once the cache holds more than
+    `max_entries` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: AnyPath, max_entries: int = 1_000_000) -> None:
+        type_check(max_entries, int)
+        if max_entries < 1:
+            raise ValueError(f"`max_entries` must be at least 1, given '{max_entries}'")
+
+        self.path = Path(path)
+        self.max_entries = max_entries
+        # The `last_used` for any hits that haven't been written out yet
+        self._touched: Dict[Tuple[int, int, int, int], int] = {}
+
+        self._connect(
+            self.path,
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER,"
+            " hash TEXT NOT NULL, last_used INTEGER NOT NULL,"
+            " PRIMARY KEY (dev, ino, size, mtime_ns))",
+            "CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)",
+        )
+
+        self._num_entries, last_used = self._db.execute(
+            "SELECT COUNT(*), MAX(last_used) FROM hashes"
+        ).fetchone()
+        self._last_used = last_used or 0
+
+    def hash_file(self, filepath: AnyPath) -> Tuple[str, int]:
+        """
+        Returns the `special_hash` and size of the file at `filepath`, only hashing
+        the file if there isn't already an entry for it.
+        """
+        filepath = Path(filepath)
+        stat = filepath.stat()
+        key = _stat_key(stat)
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT hash FROM hashes"
+                " WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+                key,
+            ).fetchone()
+
+            if row is not None:
+                self._hits += 1
+                self._touched[key] = self._tick()
+                if len(self._touched) >= _TOUCH_BATCH_SIZE:
+                    self._flush_touched()
+                    self._db.commit()
+
+                return row[0], stat.st_size
+
+            self._misses += 1
+
+        # Hash outside of the lock so that other threads can keep going
+        hash = special_hash(filepath)
+
+        # Don't store the hash if the file changed while it was being hashed since
+        # there's no telling which version it represents
+        if _stat_key(os.stat(filepath)) == key:
+            self._insert(key, hash)
+
+        return hash, stat.st_size
+
+    def _flush_touched(self) -> None:
+        # Must be called with `_lock` held, the caller commits
+        if self._touched:
+            self._db.executemany(
+                "UPDATE hashes SET last_used = ?"
+                " WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+                [(last_used, *key) for key, last_used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _insert(self, key: Tuple[int, int, int, int], hash: str) -> None:
+        with self._lock:
+            # Evict with the latest recency
+            self._flush_touched()
+            self._db.execute(
+                "INSERT OR IGNORE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, hash, self._tick()),
+            )
+
+            # Other processes can share the database, so count what's really there
+            (self._num_entries,) = self._db.execute(
+                "SELECT COUNT(*) FROM hashes"
+            ).fetchone()
+            overflow = self._num_entries - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes"
+                    " ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self._num_entries -= overflow
+                self._evictions += overflow
+
+            self._db.commit()
+
+    def clear(self) -> None:
+        """
+        Removes all of the entries from the cache.
+        """
+        with self._lock:
+            self._touched.clear()
+            self._db.execute("DELETE FROM hashes")
+            self._db.commit()
+            self._num_entries = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+            self._db.close()
+
+    def stats(self) -> CacheStats:
+        """
+        Returns `CacheStats` for the lookups done with this `HashCache`.
+        """
+        return self._stats()
+
+
+def _stat_key(stat: os.stat_result) -> Tuple[int, int, int, int]:
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _check_ttls(ttl: float, negative_ttl: float) -> None:
+    if ttl < 0:
+        raise ValueError(f"`ttl` must be at least 0, given '{ttl}'")
+    if negative_ttl < 0:
+        raise ValueError(f"`negative_ttl` must be at least 0, given '{negative_ttl}'")
+
+
+class SearchCache(ABC):
+    """
+    Base class for caches of the raw results for a single `SearchSubtitles` query.
+    Results are kept for `ttl` seconds, or `negative_ttl` seconds if there were no
+    results.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_SEARCH_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_SEARCH_TTL,
+    ) -> None:
+        _check_ttls(ttl, negative_ttl)
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    def _expires(self, results: List[ApiDict]) -> float:
+        return time.time() + (self.ttl if results else self.negative_ttl)
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[List[ApiDict]]:
+        """
+        Returns the results stored for `key` or `None` if there aren't any that are
+        still fresh.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, results: List[ApiDict]) -> None:
+        """
+        Stores the `results` for `key`.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes all of the entries from the cache.
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        """
+        Returns `CacheStats` for the lookups done with this cache.
+        """
+        pass
+
+
+class MemorySearchCache(SearchCache):
+    """
+    In-memory `SearchCache` that evicts the least recently used entries once it holds
+    more than `max_entries`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = DEFAULT_SEARCH_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_SEARCH_TTL,
+    ) -> None:
+        type_check(max_entries, int)
+        if max_entries < 1:
+            raise ValueError(f"`max_entries` must be at least 1, given '{max_entries}'")
+
+        super().__init__(ttl, negative_ttl)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[float, List[ApiDict]]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(max_entries: {self.max_entries})"
+
+    def get(self, key: str) -> Optional[List[ApiDict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+            return entry[1]
+
+    def set(self, key: str, results: List[ApiDict]) -> None:
+        with self._lock:
+            self._entries[key] = (self._expires(results), results)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+            )
+
+
+class DiskSearchCache(_SQLiteBacked, SearchCache):
+    """
+    On-disk `SearchCache` stored in a SQLite database at `path` so that results are
+    kept between runs. Once the cache holds more than `max_entries` the least recently
+    used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: AnyPath,
+        max_entries: int = 1_000_000,
+        ttl: float = DEFAULT_SEARCH_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_SEARCH_TTL,
+    ) -> None:
+        type_check(max_entries, int)
+        if max_entries < 1:
+            raise ValueError(f"`max_entries` must be at least 1, given '{max_entries}'")
+
+        super().__init__(ttl, negative_ttl)
+        self.path = Path(path)
+        self.max_entries = max_entries
+
+        self._connect(
+            self.path,
+            "CREATE TABLE IF NOT EXISTS searches ("
+            " key TEXT PRIMARY KEY, results TEXT NOT NULL, expires REAL NOT NULL,"
+            " last_used INTEGER NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS searches_last_used ON searches (last_used)",
+        )
+        # Clear out anything that went stale since the last run
+        self._db.execute("DELETE FROM searches WHERE expires <= ?", (time.time(),))
+        self._db.commit()
+
+        self._num_entries, last_used = self._db.execute(
+            "SELECT COUNT(*), MAX(last_used) FROM searches"
+        ).fetchone()
+        self._last_used = last_used or 0
+
+    def get(self, key: str) -> Optional[List[ApiDict]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results, expires FROM searches WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= time.time():
+                if row is not None:
+                    self._db.execute("DELETE FROM searches WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._num_entries -= 1
+
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._db.execute(
+                "UPDATE searches SET last_used = ? WHERE key = ?", (self._tick(), key)
+            )
+            self._db.commit()
+
+            return json.loads(row[0])
+
+    def set(self, key: str, results: List[ApiDict]) -> None:
+        with self._lock:
+            exists = self._db.execute(
+                "SELECT 1 FROM searches WHERE key = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?)",
+                (key, json.dumps(results), self._expires(results), self._tick()),
+            )
+            if exists is None:
+                self._num_entries += 1
+
+            overflow = self._num_entries - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM searches WHERE rowid IN (SELECT rowid FROM searches"
+                    " ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self._num_entries -= overflow
+                self._evictions += overflow
+
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM searches")
+            self._db.commit()
+            self._num_entries = 0
+
+    def stats(self) -> CacheStats:
+        return self._stats()
+
+
+class DownloadLedger(_SQLiteBacked):
+    """
+    Opt-in record of which subtitles (by `file_id`) were downloaded to each path stored
+    in a SQLite database at `path`. Used with `download_subtitles`'s `skip_existing` so
+    that a file is only skipped if it still holds the same subtitles.
+    """
+
+    def __init__(self, path: AnyPath) -> None:
+        self.path = Path(path)
+
+        self._connect(
+            self.path,
+            "CREATE TABLE IF NOT EXISTS downloads ("
+            " path TEXT PRIMARY KEY, file_id TEXT NOT NULL)",
+        )
+
+    def get(self, filepath: AnyPath) -> Optional[str]:
+        """
+        Returns the `file_id` of the subtitles last downloaded to `filepath` if any.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT file_id FROM downloads WHERE path = ?", (_ledger_key(filepath),)
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def record(self, entries: Iterable[Tuple[AnyPath, str]]) -> None:
+        """
+        Records each of the `(filepath, file_id)` `entries` as downloaded.
+        """
+        rows = [(_ledger_key(filepath), file_id) for filepath, file_id in entries]
+
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO downloads VALUES (?, ?)", rows)
+            self._db.commit()
+
+    def clear(self) -> None:
+        """
+        Removes all of the entries from the ledger.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM downloads")
+            self._db.commit()
+
+
+def _ledger_key(filepath: AnyPath) -> str:
+    # Resolve so that the same file matches no matter what directory it's used from
+    return str(Path(filepath).resolve())
+
+
+class TokenStore(_SQLiteBacked):
+    """
+    Opt-in store of session tokens shared between processes through a SQLite database
+    at `path`. `AuthSubwinder`s using the same store and credentials reuse a session
+    that's still valid instead of logging in again, and the session is only logged out
+    once its last holder is done with it. Sessions that were used within the last
+    `revalidate_after` seconds are reused without checking them first. Access is
+    locked through the database so waiting on another process logging in can take up
+    to `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        path: AnyPath,
+        revalidate_after: float = DEFAULT_TOKEN_REVALIDATE_AFTER,
+        timeout: float = DEFAULT_TOKEN_LOCK_TIMEOUT,
+    ) -> None:
+        self.path = Path(path)
+        self.revalidate_after = revalidate_after
+
+        # Transactions are handled manually so that the database's lock can be held
+        # while checking or replacing a session
+        self._connect(
+            self.path,
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " key TEXT PRIMARY KEY, token TEXT NOT NULL, holders INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)",
+            timeout=timeout,
+            isolation_level=None,
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # `BEGIN IMMEDIATE` takes the write lock up front so only one holder at a time
+        # (across all processes) can check or replace a session
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _hold(self, key: str, token: Token, holders: int) -> Token:
+        # Must be called within `_transaction()`
+        self._db.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+            (key, token, holders, time.time()),
+        )
+        return token
+
+    def acquire(
+        self, key: str, login: Callable[[], Token], validate: Callable[[Token], bool]
+    ) -> Token:
+        """
+        Holds onto the session for `key` returning its token if `validate` says it's
+        still valid. Otherwise `login` is used to start a new session.
+        """
+        with self._transaction():
+            row = self._db.execute(
+                "SELECT token, holders, last_used FROM sessions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                token, holders, last_used = row
+                recent = time.time() - last_used < self.revalidate_after
+                if recent or validate(Token(token)):
+                    return self._hold(key, Token(token), holders + 1)
+
+            return self._hold(key, login(), 1)
+
+    def replace(self, key: str, stale: Token, login: Callable[[], Token]) -> Token:
+        """
+        Swaps out the `stale` token for `key` after it was rejected by the API. If
+        another holder already replaced it then its token is used instead of logging in
+        again.
+        """
+        with self._transaction():
+            row = self._db.execute(
+                "SELECT token, holders FROM sessions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] != stale:
+                token, holders = row
+                return self._hold(key, Token(token), holders + 1)
+
+            return self._hold(key, login(), 1)
+
+    def release(self, key: str, token: Token) -> bool:
+        """
+        Lets go of the session for `key`. Returns `True` if this was the last holder of
+        `token`, meaning the session should be logged out.
+        """
+        with self._transaction():
+            row = self._db.execute(
+                "SELECT token, holders FROM sessions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != token:
+                # The session was already replaced so there's nothing left to hold
+                return False
+
+            if row[1] > 1:
+                self._hold(key, token, row[1] - 1)
+                return False
+
+            self._db.execute("DELETE FROM sessions WHERE key = ?", (key,))
+            return True
+
+    def clear(self) -> None:
+        """
+        Forgets all of the stored sessions without logging them out.
+        """
+        with self._transaction():
+            self._db.execute("DELETE FROM sessions")
+
+
+class SubtitleStore(_SQLiteBacked):
+    """
+    Opt-in content-addressed store of downloaded subtitles kept compressed in the
+    `path` directory and keyed by their `file_id`. Used with `download_subtitles` so
+    that each `file_id` is only ever downloaded once. Subtitles are written out from
+    the store for every path that needs them, using hardlinks between the paths if
+    `hardlink` is set (falling back to copying). Once the store holds more than
+    `max_bytes` the least recently used subtitles are evicted.
+    """
+
+    def __init__(
+        self,
+        path: AnyPath,
+        max_bytes: int = DEFAULT_STORE_MAX_BYTES,
+        hardlink: bool = False,
+    ) -> None:
+        type_check(max_bytes, int)
+        if max_bytes < 1:
+            raise ValueError(f"`max_bytes` must be at least 1, given '{max_bytes}'")
+
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hardlink = hardlink
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._connect(
+            self.path / "index.sqlite",
+            "CREATE TABLE IF NOT EXISTS subtitles ("
+            " file_id TEXT PRIMARY KEY, size INTEGER NOT NULL,"
+            " last_used INTEGER NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS subtitles_last_used ON subtitles (last_used)",
+        )
+
+        self._num_entries, total_bytes, last_used = self._db.execute(
+            "SELECT COUNT(*), SUM(size), MAX(last_used) FROM subtitles"
+        ).fetchone()
+        self._total_bytes: int = total_bytes or 0
+        self._last_used = last_used or 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(path: {repr(self.path)}, max_bytes:"
+            f" {self.max_bytes})"
+        )
+
+    def _blob_path(self, file_id: str) -> Path:
+        # `file_id`s are numbers from the API, but hash them so any `str` is safe
+        return self.path / f"{hashlib.sha1(file_id.encode()).hexdigest()}.gz"
+
+    def put(self, file_id: str, compressed: Iterable[bytes]) -> None:
+        """
+        Stores the gzip'd subtitles `compressed` (chunks of the API's data after
+        decoding the base64) for `file_id`.
+        """
+        size = _write_atomically(self._blob_path(file_id), compressed)
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size FROM subtitles WHERE file_id = ?", (file_id,)
+            ).fetchone()
+            if row is None:
+                self._num_entries += 1
+            else:
+                self._total_bytes -= row[0]
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO subtitles VALUES (?, ?, ?)",
+                (file_id, size, self._tick()),
+            )
+            self._total_bytes += size
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        # Must be called with `_lock` held
+        while self._total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT file_id, size FROM subtitles ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            for file_id, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+                self._db.execute("DELETE FROM subtitles WHERE file_id = ?", (file_id,))
+                _unlink(self._blob_path(file_id))
+                self._num_entries -= 1
+                self._total_bytes -= size
+                self._evictions += 1
+
+    def materialize(self, file_id: str, filepaths: Sequence[Path]) -> bool:
+        """
+        Writes out the subtitles for `file_id` to each of `filepaths`. Returns `False`
+        without writing anything if `file_id` isn't in the store.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE subtitles SET last_used = ? WHERE file_id = ?",
+                (self._tick(), file_id),
+            )
+            self._db.commit()
+
+            if cursor.rowcount == 0:
+                self._misses += 1
+                return False
+
+            self._hits += 1
+
+        try:
+            source = gzip.open(self._blob_path(file_id))
+        except FileNotFoundError:
+            # Removed out from under us so drop the stale entry
+            self._forget_missing(file_id)
+            return False
+
+        # Extract in chunks instead of holding all the subtitles in memory at once
+        first, *rest = filepaths
+        with source:
+            chunks = iter(lambda: source.read(STORE_CHUNK_SIZE), b"")
+            _write_atomically(first, chunks)
+        self.copy(first, rest)
+
+        return True
+
+    def __contains__(self, file_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM subtitles WHERE file_id = ?", (file_id,)
+            ).fetchone()
+
+        return row is not None
+
+    def _forget_missing(self, file_id: str) -> None:
+        with self._lock:
+            # It turned out to be a miss after all
+            self._hits -= 1
+            self._misses += 1
+
+            row = self._db.execute(
+                "SELECT size FROM subtitles WHERE file_id = ?", (file_id,)
+            ).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM subtitles WHERE file_id = ?", (file_id,))
+                self._db.commit()
+                self._num_entries -= 1
+                self._total_bytes -= row[0]
+
+    def copy(self, source: Path, filepaths: Sequence[Path]) -> None:
+        """
+        Copies the already written subtitles at `source` to each of `filepaths`, or
+        hardlinks them if `hardlink` is set.
+        """
+        for filepath in filepaths:
+            if filepath == source:
+                continue
+
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            if self.hardlink:
+                try:
+                    _unlink(filepath)
+                    os.link(source, filepath)
+                    continue
+                except OSError:
+                    # Likely a different filesystem so fall back to copying
+                    pass
+
+            shutil.copyfile(source, filepath)
+
+    def clear(self) -> None:
+        """
+        Removes all of the subtitles from the store.
+        """
+        with self._lock:
+            for (file_id,) in self._db.execute("SELECT file_id FROM subtitles"):
+                _unlink(self._blob_path(file_id))
+            self._db.execute("DELETE FROM subtitles")
+            self._db.commit()
+            self._num_entries = 0
+            self._total_bytes = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Returns `CacheStats` for the lookups done with this `SubtitleStore`.
+        """
+        return self._stats()
+
+
+def _write_atomically(filepath: Path, chunks: Iterable[bytes]) -> int:
+    # Write to a temporary file next to `filepath` then swap it in so that there's
+    # never a partially written file. Returns the number of bytes written
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    temp = filepath.with_name(f".{filepath.name}.{os.getpid()}.{threading.get_ident()}")
+    size = 0
+    try:
+        with temp.open("wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+                size += len(chunk)
+
+        os.replace(temp, filepath)
+        return size
+    except BaseException:
+        _unlink(temp)
+        raise
+
+
+def _unlink(filepath: Path) -> None:
+    try:
+        filepath.unlink()
+    except FileNotFoundError:
+        pass
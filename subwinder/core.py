@@ -9,11 +9,30 @@ except ImportError:
     ATOMIC_DOWNLOADS_SUPPORT: bool = False
 
 
+import copy
 import hashlib
+import itertools
+import json
 import os
+import threading
+import time
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Iterable, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 # See: https://github.com/LovecraftianHorror/subwinder/issues/52#issuecomment-637333960
 # if you want to know why `request` isn't imported with `from`
@@ -22,11 +41,19 @@ from subwinder import utils
 from subwinder._constants import DEV_USERAGENT, Env
 from subwinder._internal_utils import type_check
 from subwinder._request import Endpoint
+from subwinder.cache import (
+    STORE_CHUNK_SIZE,
+    DownloadLedger,
+    SearchCache,
+    SubtitleStore,
+    TokenStore,
+)
 from subwinder.exceptions import (
     SubAuthError,
     SubDownloadError,
     SubLangError,
     SubLibError,
+    SubwinderError,
 )
 from subwinder.info import (
     Comment,
@@ -44,9 +71,75 @@ from subwinder.info import (
 )
 from subwinder.lang import LangFormat, lang_2s, lang_3s, lang_longs
 from subwinder.media import MediaFile
-from subwinder.names import BaseNameFormatter, NameFormatter
+from subwinder.names import BaseNameFormatter, NameFormatter, NameTarget
 from subwinder.ranking import rank_guess_media, rank_search_subtitles
-from subwinder.types import ApiDict, Searchable, SearchQuery, SubContainer, Token
+from subwinder.types import (
+    AnyPath,
+    ApiDict,
+    Searchable,
+    SearchQuery,
+    SubContainer,
+    Token,
+)
+
+# Each download that should be copied to the extra paths that share its `file_id`
+StoreCopies = List[Tuple[Path, List[Path]]]
+# `Subtitles` along with every path that should get them
+StoreGroup = Tuple[Subtitles, List[Path]]
+
+# Endpoints that manage the session itself so they're never retried with a new one
+_SESSION_ENDPOINTS = (Endpoint.LOG_IN, Endpoint.LOG_OUT)
+
+# Seconds before the locally tracked daily downloads are synced with the API again
+DEFAULT_QUOTA_RESYNC_INTERVAL = 10 * 60
+
+
+def _credentials(
+    username: Optional[str],
+    password: Optional[str],
+    password_hash: Optional[str],
+    useragent: Optional[str],
+) -> Tuple[str, str, str]:
+    """
+    Helper function that resolves the `username`, password hash, and `useragent` used
+    to log in from the parameters and env vars. If the parameter is passed in and the
+    env var is set then the parameter is used.
+    """
+    # Try to get any info from env vars if not passed in
+    useragent = os.environ.get(Env.USERAGENT.value) or useragent
+    username = os.environ.get(Env.USERNAME.value) or username
+    password = os.environ.get(Env.PASSWORD.value) or password
+    password_hash = os.environ.get(Env.PASSWORD_HASH.value) or password_hash
+
+    # TODO: these SubAuthErrors should really be TypeErrors or ValueErrors
+    if password_hash is not None and password is not None:
+        raise SubAuthError(
+            "`password` and `password_hash` are mutually exclusive. Only one or the"
+            " other should be set"
+        )
+
+    # Send the password as an md5 hash
+    if password is not None:
+        password_hash = hashlib.md5(password.encode("UTF-8")).hexdigest()
+
+    if useragent is None:
+        # TODO: warn on this once logging is setup
+        useragent = DEV_USERAGENT
+
+    if username is None:
+        raise SubAuthError(
+            "missing `username`, set when initializing `AuthSubwinder` or with the"
+            f" {Env.USERNAME.value} env var"
+        )
+
+    if password_hash is None:
+        raise SubAuthError(
+            "missing password hash, this can be set from either password or"
+            " password_hash when initializing `AuthSubwinder` or by setting either"
+            f" the {Env.PASSWORD.value} or {Env.PASSWORD_HASH.value} env var"
+        )
+
+    return username, password_hash, useragent
 
 
 def _build_search_query(query: Searchable, lang: str) -> ApiDict:
@@ -78,6 +171,31 @@ def _build_search_query(query: Searchable, lang: str) -> ApiDict:
     return internal_query
 
 
+def _chunks(
+    batch_size: int, iterables: Sequence[Sequence[Any]]
+) -> Iterator[List[Sequence[Any]]]:
+    """
+    Helper function that yields the matching chunks of at most `batch_size` items from
+    each of the `iterables`.
+    """
+    for i in range(0, len(iterables[0]), batch_size):
+        yield [iterable[i : i + batch_size] for iterable in iterables]
+
+
+def _iter_batches(iterable: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """
+    Helper function that lazily yields batches of at most `batch_size` items from
+    `iterable`.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+
+        yield batch
+
+
 def _batch(
     function: Callable,
     batch_size: int,
@@ -90,11 +208,7 @@ def _batch(
     `iterables` each call. Both `args` and `kwargs` will be passed in directly.
     """
     results: List[Any] = []
-    for i in range(0, len(iterables[0]), batch_size):
-        chunked: List[Any] = []
-        for iterable in iterables:
-            chunked.append(iterable[i : i + batch_size])
-
+    for chunked in _chunks(batch_size, iterables):
         result: List[Any] = function(*chunked, *args, **kwargs)
         if result is not None:
             results += result
@@ -102,6 +216,881 @@ def _batch(
     return results
 
 
+def _concurrent_batch(
+    function: Callable,
+    batch_size: int,
+    iterables: Sequence[Sequence[Any]],
+    workers: int,
+    *args: Any,
+    **kwargs: Any,
+) -> List[Any]:
+    """
+    Same as `_batch`, but keeps up to `workers` calls of `function` running at once.
+    Results are still combined in the same order as `iterables`.
+    """
+    type_check(workers, int)
+    if workers < 1:
+        raise ValueError(f"`workers` must be at least 1, given '{workers}'")
+
+    # No need to spin up threads to run one batch at a time
+    if workers == 1:
+        return _batch(function, batch_size, iterables, *args, **kwargs)
+
+    results: List[Any] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(function, *chunked, *args, **kwargs)
+            for chunked in _chunks(batch_size, iterables)
+        ]
+
+        for future in futures:
+            result: List[Any] = future.result()
+            if result is not None:
+                results += result
+
+    return results
+
+
+def _check_batch_size(batch_size: int) -> None:
+    type_check(batch_size, int)
+    if batch_size < 1:
+        raise ValueError(f"`batch_size` must be at least 1, given '{batch_size}'")
+
+
+def _get_subtitles(sub_container: SubContainer) -> Subtitles:
+    """
+    Helper function that gets the `Subtitles` from any `SubContainer`.
+    """
+    type_check(sub_container, (SearchResult, Subtitles))
+
+    if isinstance(sub_container, SearchResult):
+        return sub_container.subtitles
+
+    return sub_container
+
+
+def _check_vote_score(score: int) -> None:
+    type_check(score, int)
+
+    if score < 1 or score > 10:
+        raise ValueError(f"Subtitle Vote must be between 1 and 10, given '{score}'")
+
+
+def _sub_to_movie_id(sub_container: SubContainer) -> str:
+    sub_to_movie_id = _get_subtitles(sub_container).sub_to_movie_id
+
+    # This endpoint should only be used when the subtitles were matched by hash
+    if sub_to_movie_id is None:
+        raise ValueError(
+            "`report_media` can only be called if the subtitles were matched off a"
+            " search using a media files hash and size (This is done automatically"
+            " when searching with a `MediaFile` object)."
+        )
+
+    return sub_to_movie_id
+
+
+def _download_targets(
+    downloads: Sequence[SubContainer],
+    download_dir: Optional[AnyPath],
+    name_formatter: BaseNameFormatter,
+) -> Tuple[List[Subtitles], List[Path]]:
+    """
+    Helper function that gets the `Subtitles` to download for each of `downloads`
+    along with the path that each should be saved to.
+    """
+    type_check(downloads, (list, tuple))
+
+    if download_dir is not None:
+        download_dir = Path(download_dir)
+
+    targets = [_name_target(download, download_dir) for download in downloads]
+    sub_containers = [subtitles for subtitles, *_ in targets]
+    download_paths = name_formatter.generate_many(targets)
+
+    return sub_containers, download_paths
+
+
+def _name_target(download: SubContainer, download_dir: Optional[Path]) -> NameTarget:
+    # All downloads should be some container for `Subtitles`
+    type_check(download, (SearchResult, Subtitles))
+
+    if isinstance(download, SearchResult):
+        # `SearchResult` holds more info than `Subtitles`
+        media = download.media
+        return (
+            download.subtitles,
+            media.get_filename(),
+            media.get_dirname(),
+            download_dir,
+        )
+
+    return download, None, None, download_dir
+
+
+def _store_subtitles(
+    store: SubtitleStore, file_ids: List[str], data: List[ApiDict]
+) -> None:
+    """
+    Helper function that adds the raw `DownloadSubtitles` `data` to `store`.
+    """
+    for file_id, result in zip(file_ids, data):
+        store.put(file_id, utils._b64decode_chunks(result["data"], STORE_CHUNK_SIZE))
+
+
+def _pending_downloads(
+    sub_containers: List[Subtitles],
+    download_paths: List[Path],
+    skip_existing: bool,
+    ledger: Optional[DownloadLedger],
+) -> Tuple[List[Subtitles], List[Path]]:
+    """
+    Helper function that drops any downloads that are already saved when
+    `skip_existing` is set. With a `ledger` the saved file also has to be from the same
+    subtitles, otherwise it's downloaded again.
+    """
+    if not skip_existing:
+        return sub_containers, download_paths
+
+    pending_subs: List[Subtitles] = []
+    pending_paths: List[Path] = []
+    for subtitles, download_path in zip(sub_containers, download_paths):
+        if download_path.exists() and (
+            ledger is None or ledger.get(download_path) == subtitles.file_id
+        ):
+            continue
+
+        pending_subs.append(subtitles)
+        pending_paths.append(download_path)
+
+    return pending_subs, pending_paths
+
+
+def _store_downloads(
+    store: SubtitleStore, sub_containers: List[Subtitles], download_paths: List[Path]
+) -> Tuple[
+    List[Subtitles], List[Path], List[Tuple[Path, str]], StoreCopies, List[StoreGroup]
+]:
+    """
+    Helper function that groups the downloads by `file_id` so that each is only
+    downloaded once, setting aside the ones that are already in `store`. Nothing is
+    written yet. Returns the `Subtitles` and path to download for each missing
+    `file_id`, the extra paths that get a copy of a download along with their
+    `file_id`, the copies to make, and the groups to fill in with `_fill_from_store`
+    once the downloads are good to go.
+    """
+    grouped: Dict[str, StoreGroup] = {}
+    for subtitles, download_path in zip(sub_containers, download_paths):
+        grouped.setdefault(subtitles.file_id, (subtitles, []))[1].append(download_path)
+
+    missing_subs: List[Subtitles] = []
+    missing_paths: List[Path] = []
+    filled: List[Tuple[Path, str]] = []
+    copies: StoreCopies = []
+    hits: List[StoreGroup] = []
+    for file_id, group in grouped.items():
+        if file_id in store:
+            hits.append(group)
+        else:
+            _add_group_download(group, missing_subs, missing_paths, filled, copies)
+
+    return missing_subs, missing_paths, filled, copies, hits
+
+
+def _add_group_download(
+    group: StoreGroup,
+    missing_subs: List[Subtitles],
+    missing_paths: List[Path],
+    filled: List[Tuple[Path, str]],
+    copies: StoreCopies,
+) -> None:
+    # Only the first path is downloaded and the rest are copied from it
+    subtitles, paths = group
+    missing_subs.append(subtitles)
+    missing_paths.append(paths[0])
+    if len(paths) > 1:
+        copies.append((paths[0], paths[1:]))
+        filled += [(path, subtitles.file_id) for path in paths[1:]]
+
+
+def _fill_from_store(
+    store: SubtitleStore,
+    hits: List[StoreGroup],
+    missing_subs: List[Subtitles],
+    missing_paths: List[Path],
+    filled: List[Tuple[Path, str]],
+    copies: StoreCopies,
+) -> None:
+    """
+    Helper function that writes out the `hits` from `_store_downloads`. Anything that
+    was evicted from `store` since then gets added to the downloads instead.
+    """
+    for group in hits:
+        subtitles, paths = group
+        if store.materialize(subtitles.file_id, paths):
+            filled += [(path, subtitles.file_id) for path in paths]
+        else:
+            _add_group_download(group, missing_subs, missing_paths, filled, copies)
+
+
+def _finish_store_downloads(
+    store: Optional[SubtitleStore],
+    filled: List[Tuple[Path, str]],
+    copies: StoreCopies,
+    ledger: Optional[DownloadLedger],
+) -> None:
+    """
+    Helper function that copies each download to its extra paths from
+    `_store_downloads` and records everything that was filled in to `ledger`.
+    """
+    if store is not None:
+        for source, paths in copies:
+            store.copy(source, paths)
+
+    if ledger is not None and filled:
+        ledger.record(filled)
+
+
+def _session_key(username: str, password_hash: str, useragent: str) -> str:
+    """
+    Helper function that gets the key for sessions in a `TokenStore` so that only
+    sessions with the same credentials are shared.
+    """
+    credentials = "\0".join([username, password_hash, useragent])
+    return hashlib.sha256(credentials.encode("utf-8")).hexdigest()
+
+
+def _validate_token(token: Token) -> bool:
+    """
+    Helper function that checks if the session for `token` is still valid with a cheap
+    `NoOperation` call.
+    """
+    try:
+        subwinder._request.request(Endpoint.NO_OPERATION, token)
+    except SubAuthError:
+        return False
+
+    return True
+
+
+def _login_token(username: str, password_hash: str, useragent: str) -> Token:
+    """
+    Helper function that logs in returning the new session's token.
+    """
+    resp = subwinder._request.request(
+        Endpoint.LOG_IN, None, username, password_hash, "en", useragent
+    )
+    return Token(resp["token"])
+
+
+def _check_daily_remaining(daily_remaining: int, num_downloads: int) -> None:
+    if daily_remaining < num_downloads:
+        raise SubDownloadError(
+            f"Not enough daily downloads remaining ({daily_remaining} <"
+            f" {num_downloads})"
+        )
+
+
+def _save_subtitles(data: List[ApiDict], filepaths: List[Path]) -> None:
+    """
+    Helper function that saves the raw `DownloadSubtitles` `data` to `filepaths`.
+    """
+    for result, fpath in zip(data, filepaths):
+        # Create the directories if needed, then save the file
+        dirpath = fpath.parent
+        dirpath.mkdir(exist_ok=True)
+
+        # Subtitles are extracted straight to the file to avoid holding the whole
+        # thing in memory. Write atomically if possible, otherwise fall back to
+        # regular writing
+        if ATOMIC_DOWNLOADS_SUPPORT:
+            with atomic_write(fpath, mode="wb") as f:
+                utils.extract_to(result["data"], f)
+        else:
+            with fpath.open("wb") as f:
+                try:
+                    utils.extract_to(result["data"], f)
+                except Exception:
+                    # Don't leave a partially written file behind
+                    f.close()
+                    fpath.unlink()
+                    raise
+
+
+def _check_guess_queries(queries: Sequence[str]) -> List[str]:
+    type_check(queries, (list, tuple))
+    queries = list(queries)
+
+    for query in queries:
+        type_check(query, str)
+
+    return queries
+
+
+def _parse_guesses(queries: List[str], data: ApiDict) -> List[GuessMediaResult]:
+    # Special case: `""` is just silently excluded from the response so force it
+    if "" in queries and "" not in data:
+        data[""] = {}
+
+    # Convert the raw results to `GuessMediaResult`
+    return [GuessMediaResult.from_data(data[query]) for query in queries]
+
+
+def _check_search_queries(queries: Iterable[SearchQuery]) -> List[SearchQuery]:
+    """
+    Helper function that verifies that all the `queries` are correct before doing any
+    requests.
+    """
+    type_check(queries, (list, tuple, zip))
+    # Need to expand out the `zip` if used
+    return [_check_search_query(query_pair) for query_pair in queries]
+
+
+def _check_search_query(query_pair: SearchQuery) -> SearchQuery:
+    if not isinstance(query_pair, (list, tuple)) or len(query_pair) != 2:
+        raise ValueError(
+            "The `search_subtitles` variants expect a list of pairs of the form"
+            "(<queryable>, <2 letter language code>)"
+        )
+
+    query, lang_2 = query_pair
+    type_check(query, (MediaFile, Movie, Episode))
+
+    if lang_2 not in lang_2s:
+        # Show both the 2-char and long name if invalid lang is given
+        lang_map = [f"{k} -> {v}" for k, v in zip(lang_2s, lang_longs)]
+        lang_map = "\n".join(lang_map)
+
+        raise SubLangError(f"'{lang_2}' not found in valid lang list:\n{lang_map}")
+
+    return query_pair
+
+
+def _search_batch_size(limited_search_size: bool) -> int:
+    # The API limits to 5 results if the dev useragent is given so only search one
+    # item at a time. Otherwise use 20 since there should be plenty of options from
+    # the up to 500 results returned
+    return 1 if limited_search_size else 20
+
+
+def _search_cache_key(internal_query: ApiDict) -> str:
+    # Normalize the query so that equivalent queries share the same entry
+    return json.dumps({k: str(v) for k, v in internal_query.items()}, sort_keys=True)
+
+
+class _PreparedQuery:
+    """
+    A `SearchQuery` along with its query for the API and the keys it's deduped,
+    batched, and cached by. Built once per query so that none of the search steps
+    have to rebuild them.
+    """
+
+    __slots__ = ("query", "lang_2", "internal", "key", "media_key")
+
+    def __init__(self, query_pair: SearchQuery) -> None:
+        self.query, self.lang_2 = query_pair
+        self.internal = _build_search_query(self.query, self.lang_2)
+        self.key = _search_cache_key(self.internal)
+        # Same as the cache key, but ignoring the language so only the media matters
+        self.media_key = _search_cache_key(
+            {k: v for k, v in self.internal.items() if k != "sublanguageid"}
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _PreparedQuery):
+            return NotImplemented
+
+        return (self.query, self.lang_2) == (other.query, other.lang_2)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({repr((self.query, self.lang_2))})"
+
+
+def _dedupe_search_queries(
+    queries: Sequence[_PreparedQuery],
+) -> Tuple[List[_PreparedQuery], List[int]]:
+    """
+    Helper function that finds the unique `queries` where a query is a duplicate if it
+    would search for the exact same thing (like the same media file in two places).
+    Returns the unique queries along with the index of the unique query for each of
+    `queries`.
+    """
+    unique: List[_PreparedQuery] = []
+    positions: List[int] = []
+    unique_index: Dict[str, int] = {}
+    for prepared in queries:
+        index = unique_index.get(prepared.key)
+
+        if index is None:
+            index = len(unique)
+            unique_index[prepared.key] = index
+            unique.append(prepared)
+
+        positions.append(index)
+
+    return unique, positions
+
+
+def _fan_out_search_results(
+    queries: Sequence[_PreparedQuery],
+    positions: List[int],
+    unique_groups: List[List[SearchResult]],
+) -> List[List[SearchResult]]:
+    """
+    Helper function that gives each of `queries` the results of its unique query (see
+    `_dedupe_search_queries`). Duplicates get their own copy of each `SearchResult`
+    pointing at their own media's location.
+    """
+    groups: List[List[SearchResult]] = []
+    used: Set[int] = set()
+    for prepared, position in zip(queries, positions):
+        query = prepared.query
+        group = unique_groups[position]
+
+        # The first query for each unique query is the one that was searched for
+        if position in used:
+            copies = []
+            for result in group:
+                result = copy.copy(result)
+                result._locate_media(query.get_dirname(), query.get_filename())
+
+                copies.append(result)
+
+            group = copies
+
+        used.add(position)
+        groups.append(group)
+
+    return groups
+
+
+def _count_search_batches(
+    queries: Sequence[_PreparedQuery], batch_size: int, coalesce: bool = True
+) -> int:
+    return sum(1 for _ in _search_batches(queries, batch_size, coalesce))
+
+
+def _search_batches(
+    queries: Iterable[_PreparedQuery], batch_size: int, coalesce: bool = True
+) -> Iterator[List[_PreparedQuery]]:
+    """
+    Helper function that yields consecutive batches of `queries` that cover at most
+    `batch_size` different media. With `coalesce` queries for the same media in
+    different languages get merged into a single query so they only take up one spot
+    in the batch, otherwise each language takes up its own spot.
+    """
+    batch: List[_PreparedQuery] = []
+    batch_media: Set[str] = set()
+    for prepared in queries:
+        media_key = prepared.media_key if coalesce else prepared.key
+        if media_key not in batch_media and len(batch_media) == batch_size:
+            yield batch
+            batch = []
+            batch_media = set()
+
+        batch.append(prepared)
+        batch_media.add(media_key)
+
+    if batch:
+        yield batch
+
+
+def _should_coalesce(limited_search_size: bool) -> bool:
+    # The dev useragent only gets 5 results per query, merging languages would make
+    # them all share those 5 instead of each language getting its own
+    return not limited_search_size
+
+
+def _coalesce_search_queries(
+    queries: List[_PreparedQuery], coalesce: bool = True
+) -> Tuple[List[ApiDict], List[int]]:
+    """
+    Helper function that merges the API queries for the same media into one query
+    searching for all of their languages (`sublanguageid` takes a comma separated
+    list). Returns the merged queries along with the index of the merged query that
+    covers each of `queries`. Without `coalesce` nothing is merged.
+    """
+    if not coalesce:
+        return [prepared.internal for prepared in queries], list(range(len(queries)))
+
+    merged: List[ApiDict] = []
+    positions: List[int] = []
+    merged_index: Dict[str, int] = {}
+    for prepared in queries:
+        index = merged_index.get(prepared.media_key)
+
+        if index is None:
+            index = len(merged)
+            merged_index[prepared.media_key] = index
+            merged.append(dict(prepared.internal))
+        else:
+            lang_3 = prepared.internal["sublanguageid"]
+            merged_langs = merged[index]["sublanguageid"]
+            if lang_3 not in merged_langs.split(","):
+                merged[index]["sublanguageid"] = f"{merged_langs},{lang_3}"
+
+        positions.append(index)
+
+    return merged, positions
+
+
+def _split_search_results(
+    num_merged: int, positions: List[int], langs: List[str], data: List[ApiDict]
+) -> List[List[ApiDict]]:
+    """
+    Helper function that splits the raw `SearchSubtitles` `data` from searching for
+    merged queries back out to the original queries described by `positions` and
+    their 2 letter `langs` (see `_coalesce_search_queries`).
+    """
+    merged_groups: List[List[ApiDict]] = [[] for _ in range(num_merged)]
+    # `data` is falsy if there were no results at all
+    for raw_result in data or []:
+        # Results are returned in an arbitrary order so first figure out the query
+        merged_groups[int(raw_result["QueryNumber"])].append(raw_result)
+
+    return [
+        [raw for raw in merged_groups[position] if raw["ISO639"] == lang_2]
+        for position, lang_2 in zip(positions, langs)
+    ]
+
+
+def _cached_search_groups(
+    cache: Optional[SearchCache], queries: Sequence[_PreparedQuery]
+) -> List[Optional[List[ApiDict]]]:
+    """
+    Helper function that gets the cached raw results for each of `queries` where any
+    query that isn't cached is `None`.
+    """
+    if cache is None:
+        return [None] * len(queries)
+
+    return [cache.get(prepared.key) for prepared in queries]
+
+
+def _fill_search_groups(
+    cache: Optional[SearchCache],
+    queries: Sequence[_PreparedQuery],
+    raw_groups: List[Optional[List[ApiDict]]],
+    missing: List[int],
+    groups: List[List[ApiDict]],
+) -> None:
+    """
+    Helper function that fills in `raw_groups` at the `missing` indices with the
+    newly searched `groups`. The results are cached along the way, including queries
+    without any results.
+    """
+    for index, group in zip(missing, groups):
+        raw_groups[index] = group
+
+        if cache is not None:
+            cache.set(queries[index].key, group)
+
+
+def _parse_search_results(
+    queries: Sequence[_PreparedQuery], raw_groups: List[Optional[List[ApiDict]]]
+) -> List[List[SearchResult]]:
+    """
+    Helper function that converts the raw results grouped by the order of `queries` to
+    `SearchResult`s.
+    """
+    groups: List[List[SearchResult]] = []
+    for prepared, raw_results in zip(queries, raw_groups):
+        query = prepared.query
+        results: List[SearchResult] = []
+        for raw_result in raw_results or []:
+            # The fields are only parsed when they're used
+            result = SearchResult.from_data(raw_result)
+            result._locate_media(query.get_dirname(), query.get_filename())
+
+            results.append(result)
+
+        groups.append(results)
+
+    return groups
+
+
+def _parse_suggestions(query: str, data: Any) -> List[Union[Movie, TvSeries]]:
+    # `data` is an empty list if there were no results
+    return [] if not data else [build_media(media) for media in data[query]]
+
+
+def _parse_comments(ids: List[str], data: Any) -> List[List[Comment]]:
+    """
+    Helper function that groups the raw `GetComments` `data` by the order of `ids`.
+    Repeated ids each get their own list of the same comments.
+    """
+    positions: Dict[str, List[int]] = {}
+    for i, id in enumerate(ids):
+        positions.setdefault(id, []).append(i)
+
+    # Pack results, if any, into `Comment` objects grouped by the query order
+    comments: List[List[Comment]] = [[] for _ in ids]
+    if data:
+        for id, raw_comments in data.items():
+            parsed = [Comment.from_data(c) for c in raw_comments]
+
+            # Returned `id` has a leading _ for some reason so strip it
+            for i in positions[id[1:]]:
+                comments[i] = list(parsed)
+
+    return comments
+
+
+def _unique_ids(ids: Iterable[str]) -> List[str]:
+    """
+    Helper function that drops any repeated `ids` while keeping the order.
+    """
+    return list(dict.fromkeys(ids))
+
+
+def _parse_previews(data: List[ApiDict]) -> List[str]:
+    # Unpack our data
+    previews: List[str] = []
+    for preview in data:
+        encoding = preview["encoding"]
+        contents = preview["contents"]
+
+        # Extract and decode the previews
+        previews.append(utils.extract(contents).decode(encoding))
+
+    return previews
+
+
+class _DownloadPlan:
+    """
+    The downloads that are left to do for `downloads` once everything that's already
+    saved (with `skip_existing`) or in the `store` is set aside. Planning does blocking
+    file IO, but nothing is written until `fill_from_store`.
+    """
+
+    def __init__(
+        self,
+        downloads: Sequence[SubContainer],
+        download_dir: Optional[AnyPath],
+        name_formatter: BaseNameFormatter,
+        skip_existing: bool,
+        ledger: Optional[DownloadLedger],
+        store: Optional[SubtitleStore],
+    ) -> None:
+        sub_containers, self.download_paths = _download_targets(
+            downloads, download_dir, name_formatter
+        )
+        self.pending_subs, self.pending_paths = _pending_downloads(
+            sub_containers, self.download_paths, skip_existing, ledger
+        )
+        self.skipped = len(downloads) - len(self.pending_subs)
+        self.ledger = ledger
+        self.store = store
+
+        self.filled: List[Tuple[Path, str]] = []
+        self._copies: StoreCopies = []
+        self._hits: List[StoreGroup] = []
+        if store is not None:
+            (
+                self.pending_subs,
+                self.pending_paths,
+                self.filled,
+                self._copies,
+                self._hits,
+            ) = _store_downloads(store, self.pending_subs, self.pending_paths)
+
+    def fill_from_store(self) -> None:
+        """
+        Writes out everything that's in the `store`. Should only be called once the
+        downloads are good to go.
+        """
+        if self._hits:
+            _fill_from_store(
+                cast(SubtitleStore, self.store),
+                self._hits,
+                self.pending_subs,
+                self.pending_paths,
+                self.filled,
+                self._copies,
+            )
+            self._hits = []
+
+    def finish(self) -> None:
+        """
+        Makes the copies and records everything filled in to the `ledger` once the
+        downloads are saved.
+        """
+        _finish_store_downloads(self.store, self.filled, self._copies, self.ledger)
+
+
+class _SearchPlan:
+    """
+    Everything about searching for a batch of `queries` other than the request itself.
+    Any queries that aren't in the `search_cache` are left in `merged` to be searched
+    for with the results passed on to `results`.
+    """
+
+    def __init__(
+        self,
+        queries: Sequence[_PreparedQuery],
+        search_cache: Optional[SearchCache],
+        coalesce: bool,
+    ) -> None:
+        self.queries = queries
+        self.search_cache = search_cache
+
+        # Only search for the queries that aren't already cached
+        self.raw_groups = _cached_search_groups(search_cache, queries)
+        self.missing = [i for i, group in enumerate(self.raw_groups) if group is None]
+
+        # Languages for the same media are searched together then split back out
+        self.merged, self.positions = _coalesce_search_queries(
+            [queries[i] for i in self.missing], coalesce
+        )
+
+    def results(self, data: Any = None) -> List[List[SearchResult]]:
+        """
+        Gets the results for each of the `queries` given the raw `SearchSubtitles`
+        `data` from searching for `merged`.
+        """
+        if self.missing:
+            groups = _split_search_results(
+                len(self.merged),
+                self.positions,
+                [self.queries[i].lang_2 for i in self.missing],
+                data,
+            )
+            _fill_search_groups(
+                self.search_cache,
+                self.queries,
+                self.raw_groups,
+                self.missing,
+                groups,
+            )
+
+        return _parse_search_results(self.queries, self.raw_groups)
+
+
+@dataclass
+class DownloadStats:
+    """
+    Data container for how many downloads were done, skipped since the subtitles were
+    already saved, or filled in from a `SubtitleStore` without downloading.
+    """
+
+    downloaded: int
+    skipped: int
+    from_store: int
+
+
+@dataclass
+class SearchStats:
+    """
+    Data container for how much work searching for subtitles has skipped by only
+    searching for each unique query once.
+    """
+
+    queries: int
+    duplicates: int
+    requests_saved: int
+
+
+class _AuthMixin:
+    """
+    The state and bookkeeping shared by `AuthSubwinder` and `AsyncAuthSubwinder`, so
+    that they only differ in how requests get made.
+    """
+
+    limited_search_size: bool
+    search_cache: Optional[SearchCache] = None
+    _searched: int = 0
+    _duplicates: int = 0
+    _requests_saved: int = 0
+    _downloaded: int = 0
+    _skipped: int = 0
+    _from_store: int = 0
+    quota_resync_interval: float = DEFAULT_QUOTA_RESYNC_INTERVAL
+    _quota: Optional[int] = None
+    _quota_synced_at: float = 0.0
+    token_store: Optional[TokenStore] = None
+    _credentials: Tuple[str, str, str]
+    _session_key: str
+
+    def _setup_auth(
+        self,
+        username: Optional[str],
+        password: Optional[str],
+        password_hash: Optional[str],
+        useragent: Optional[str],
+        search_cache: Optional[SearchCache],
+        token_store: Optional[TokenStore],
+    ) -> None:
+        self._credentials = _credentials(username, password, password_hash, useragent)
+        self.limited_search_size = self._credentials[2] == DEV_USERAGENT
+        self.search_cache = search_cache
+        self.token_store = token_store
+        self._session_key = _session_key(*self._credentials)
+
+    def _quota_is_stale(self) -> bool:
+        # Whether the locally tracked daily downloads need to be synced with the API
+        return (
+            self._quota is None
+            or time.monotonic() - self._quota_synced_at >= self.quota_resync_interval
+        )
+
+    def _sync_quota(self, remaining: int) -> None:
+        self._quota = remaining
+        self._quota_synced_at = time.monotonic()
+
+    def _use_quota(self, num_downloads: int) -> None:
+        if self._quota is not None:
+            self._quota = max(self._quota - num_downloads, 0)
+
+    def _invalidate_quota(self) -> None:
+        self._quota = None
+
+    def _record_downloads(self, plan: _DownloadPlan) -> None:
+        self._downloaded += len(plan.pending_subs)
+        self._skipped += plan.skipped
+        self._from_store += len(plan.filled)
+
+    def download_stats(self) -> DownloadStats:
+        """
+        Returns `DownloadStats` for all the downloads done with this session.
+        """
+        return DownloadStats(
+            downloaded=self._downloaded,
+            skipped=self._skipped,
+            from_store=self._from_store,
+        )
+
+    def _plan_search(self, queries: Sequence[_PreparedQuery]) -> _SearchPlan:
+        return _SearchPlan(
+            queries, self.search_cache, _should_coalesce(self.limited_search_size)
+        )
+
+    def _record_search(
+        self,
+        queries: List[_PreparedQuery],
+        num_unique: int,
+        num_batches: int,
+        batch_size: int,
+    ) -> None:
+        self._searched += len(queries)
+        self._duplicates += len(queries) - num_unique
+
+        # Nothing is saved if there weren't any duplicates
+        if num_unique < len(queries):
+            coalesce = _should_coalesce(self.limited_search_size)
+            with_duplicates = _count_search_batches(queries, batch_size, coalesce)
+            self._requests_saved += with_duplicates - num_batches
+
+    def search_stats(self) -> SearchStats:
+        """
+        Returns `SearchStats` for all the searches done with this session.
+        """
+        return SearchStats(
+            queries=self._searched,
+            duplicates=self._duplicates,
+            requests_saved=self._requests_saved,
+        )
+
+
 class Subwinder:
     """
     The class used for all unauthenticated functionality exposed by the library.
@@ -138,76 +1127,92 @@ class Subwinder:
         return ServerInfo.from_data(self._request(Endpoint.SERVER_INFO))
 
 
-class AuthSubwinder(Subwinder):
+class AuthSubwinder(_AuthMixin, Subwinder):
     """
     The class used for all authenticated and unauthenticated functionality exposed by
     the library.
     """
 
-    limited_search_size: bool
-
     def __init__(
         self,
         username: Optional[str] = None,
         password: Optional[str] = None,
         password_hash: Optional[str] = None,
         useragent: Optional[str] = None,
+        search_cache: Optional[SearchCache] = None,
+        token_store: Optional[TokenStore] = None,
     ) -> None:
         """
         Signs in the user with the given `username`, `password` and program's
         `useragent`. These can also be set as environment variables instead if that's
         preferable. If the parameter is passed in and the env var is set then the
-        parameter is used.
-        """
-        # Try to get any info from env vars if not passed in
-        useragent = os.environ.get(Env.USERAGENT.value) or useragent
-        username = os.environ.get(Env.USERNAME.value) or username
-        password = os.environ.get(Env.PASSWORD.value) or password
-        password_hash = os.environ.get(Env.PASSWORD_HASH.value) or password_hash
-
-        # TODO: these SubAuthErrors should really be TypeErrors or ValueErrors
-        if password_hash is not None and password is not None:
-            raise SubAuthError(
-                "`password` and `password_hash` are mutually exclusive. Only one or the"
-                " other should be set"
-            )
-
-        # Send the password as an md5 hash
-        if password is not None:
-            password_hash = hashlib.md5(password.encode("UTF-8")).hexdigest()
-
-        self.limited_search_size = False
-        if useragent is None or useragent == DEV_USERAGENT:
-            # TODO: warn on this once logging is setup
-            useragent = DEV_USERAGENT
-            self.limited_search_size = True
-
-        if username is None:
-            raise SubAuthError(
-                "missing `username`, set when initializing `AuthSubwinder` or with the"
-                f" {Env.USERNAME.value} env var"
-            )
+        parameter is used. Searches are looked up in `search_cache` first when given.
+        With a `token_store` a still valid session from the store is reused instead of
+        logging in again.
+        """
+        self._setup_auth(
+            username, password, password_hash, useragent, search_cache, token_store
+        )
 
-        if password_hash is None:
-            raise SubAuthError(
-                "missing password hash, this can be set from either password or"
-                " password_hash when initializing `AuthSubwinder` or by setting either"
-                f" the {Env.PASSWORD.value} or {Env.PASSWORD_HASH.value} env var"
+        if token_store is None:
+            self._token = self._login(*self._credentials)
+        else:
+            self._session_lock = threading.Lock()
+            self._token = token_store.acquire(
+                self._session_key, self._login_session, _validate_token
             )
 
-        self._token = self._login(username, password_hash, useragent)
-
     def __enter__(self) -> AuthSubwinder:
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        # Shared sessions are only logged out by their last holder
+        last_holder = True
+        if self.token_store is not None:
+            last_holder = self.token_store.release(
+                self._session_key, cast(Token, self._token)
+            )
+            if not last_holder:
+                self._token = None
+
         # Logout on exiting `with` if all is well
-        if exc_type is None:
+        if exc_type is None and last_holder:
             self._logout()
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(_token: {repr(self._token)})"
 
+    def _request(self, endpoint: Endpoint, *params: Any) -> ApiDict:
+        token = self._token
+        try:
+            return super()._request(endpoint, *params)
+        except SubAuthError:
+            if endpoint in _SESSION_ENDPOINTS or not self._replace_session(token):
+                raise
+
+        return super()._request(endpoint, *params)
+
+    def _replace_session(self, token: Optional[Token]) -> bool:
+        """
+        Replaces the shared session for `token` after it expired or was logged out
+        (unless another thread already did), returning whether there's a new session
+        to try again with.
+        """
+        token_store = self.token_store
+        if token_store is None:
+            return False
+
+        with self._session_lock:
+            if self._token == token:
+                self._token = token_store.replace(
+                    self._session_key, cast(Token, token), self._login_session
+                )
+
+        return True
+
+    def _login_session(self) -> Token:
+        return self._login(*self._credentials)
+
     def _login(self, username: str, password: str, useragent: str) -> Token:
         """
         Handles logging in the user with the provided information and storing the auth
@@ -224,117 +1229,186 @@ class AuthSubwinder(Subwinder):
         self._request(Endpoint.LOG_OUT)
         self._token = None
 
+    @property
+    def daily_remaining(self) -> int:
+        """
+        The number of downloads remaining for the day. This is tracked locally from the
+        downloads done with this session, so only the first access makes a request
+        along with any after `quota_resync_interval` seconds or a failed download.
+        """
+        if self._quota_is_stale():
+            self._sync_quota(self.daily_download_info().remaining)
+
+        return cast(int, self._quota)
+
+    def server_info(self) -> ServerInfo:
+        """
+        Returns `ServerInfo` for the opensubtitles. This also syncs `daily_remaining`.
+        """
+        info = super().server_info()
+        self._sync_quota(info.daily_download_info.remaining)
+        return info
+
     def download_subtitles(
         self,
         downloads: Sequence[SubContainer],
         download_dir: Optional[Union[str, Path]] = None,
         name_formatter: BaseNameFormatter = NameFormatter("{upload_filename}"),
+        parallelism: int = 1,
+        skip_existing: bool = False,
+        ledger: Optional[DownloadLedger] = None,
+        store: Optional[SubtitleStore] = None,
     ) -> List[Path]:
         """
         Attempts to download the `SearchResult`s passed in as `downloads`. The download
         will attempt to place files in the same directory as the original file unless
         `download_dir` is provided. Files are automatically named according to the
-        provided `name_format`.
-        """
-        type_check(downloads, (list, tuple))
-
-        if download_dir is not None:
-            download_dir = Path(download_dir)
-
-        sub_containers: List[Subtitles] = []
-        download_paths: List[Path] = []
-        for download in downloads:
-            # All downloads should be some container for `Subtitles`
-            type_check(download, (SearchResult, Subtitles))
-
-            if isinstance(download, SearchResult):
-                # `SearchResult` holds more info than `Subtitles`
-                subtitles = download.subtitles
-                media_dirname = download.media.get_dirname()
-                media_filename = download.media.get_filename()
-            else:
-                subtitles = download
-                media_dirname = None
-                media_filename = None
-
-            sub_containers.append(subtitles)
-
-            download_paths.append(
-                name_formatter.generate(
-                    subtitles, media_filename, media_dirname, download_dir
+        provided `name_format`. Up to `parallelism` batches of downloads are kept in
+        flight at once, so extracting and saving one batch overlaps with downloading
+        the next. With `skip_existing` any downloads whose file already exists (and
+        holds the same subtitles according to `ledger` if provided) are skipped
+        without using up any of the daily downloads. With a `store` each `file_id` is
+        only ever downloaded once and then filled in from the `store` after that.
+        """
+        type_check(parallelism, int)
+        if parallelism < 1:
+            raise ValueError(f"`parallelism` must be at least 1, given '{parallelism}'")
+
+        plan = _DownloadPlan(
+            downloads, download_dir, name_formatter, skip_existing, ledger, store
+        )
+
+        if plan.pending_subs:
+            # Check that the user has enough downloads remaining for everything left
+            _check_daily_remaining(self.daily_remaining, len(plan.pending_subs))
+
+        # Nothing is written from the store until the downloads are good to go
+        plan.fill_from_store()
+
+        if plan.pending_subs:
+            # Download the subtitles in batches of 20, per api spec
+            try:
+                _concurrent_batch(
+                    self._download_subtitles,
+                    20,
+                    [plan.pending_subs, plan.pending_paths],
+                    parallelism,
+                    ledger,
+                    store,
                 )
-            )
+            except Exception:
+                # Either the API says we're out of downloads (407) or some batches may
+                # have gone through, so sync up again before the next check
+                self._invalidate_quota()
+                raise
+            self._use_quota(len(plan.pending_subs))
 
-        # TODO: don't need to do this if there's nothing to download
-        # Check that the user has enough downloads remaining to satisfy all `downloads`
-        daily_remaining = self.daily_download_info().remaining
-        if daily_remaining < len(downloads):
-            raise SubDownloadError(
-                f"Not enough daily downloads remaining ({daily_remaining} <"
-                f" {len(downloads)})"
-            )
+        plan.finish()
+        self._record_downloads(plan)
+
+        # Return the list of paths where subtitle files were saved
+        return plan.download_paths
 
+    def iter_download_subtitles(
+        self,
+        downloads: Iterable[SubContainer],
+        download_dir: Optional[AnyPath] = None,
+        name_formatter: BaseNameFormatter = NameFormatter("{upload_filename}"),
+        skip_existing: bool = False,
+        ledger: Optional[DownloadLedger] = None,
+        store: Optional[SubtitleStore] = None,
+    ) -> Iterator[Path]:
+        """
+        Same as `download_subtitles`, but `downloads` can be any iterable and the path
+        for each download is yielded as soon as its batch is saved.
+        """
         # Download the subtitles in batches of 20, per api spec
-        _batch(self._download_subtitles, 20, [sub_containers, download_paths])
+        for batch in _iter_batches(downloads, 20):
+            plan = _DownloadPlan(
+                batch, download_dir, name_formatter, skip_existing, ledger, store
+            )
 
-        # Return the list of paths where subtitle files were saved
-        return download_paths
+            if plan.pending_subs:
+                _check_daily_remaining(self.daily_remaining, len(plan.pending_subs))
+
+            plan.fill_from_store()
+
+            if plan.pending_subs:
+                try:
+                    self._download_subtitles(
+                        plan.pending_subs, plan.pending_paths, ledger, store
+                    )
+                except Exception:
+                    self._invalidate_quota()
+                    raise
+                self._use_quota(len(plan.pending_subs))
+
+            plan.finish()
+            self._record_downloads(plan)
+
+            yield from plan.download_paths
 
     def _download_subtitles(
-        self, sub_containers: List[Subtitles], filepaths: List[Path]
+        self,
+        sub_containers: List[Subtitles],
+        filepaths: List[Path],
+        ledger: Optional[DownloadLedger] = None,
+        store: Optional[SubtitleStore] = None,
     ) -> None:
-        sub_file_ids = []
         # Get all the file ids
         sub_file_ids = [sub_container.file_id for sub_container in sub_containers]
 
         data = self._request(Endpoint.DOWNLOAD_SUBTITLES, sub_file_ids)["data"]
 
-        for result, fpath in zip(data, filepaths):
-            subtitles = utils.extract(result["data"])
-
-            # Create the directories if needed, then save the file
-            dirpath = fpath.parent
-            dirpath.mkdir(exist_ok=True)
-
-            # Write atomically if possible, otherwise fall back to regular writing
-            if ATOMIC_DOWNLOADS_SUPPORT:
-                with atomic_write(fpath, mode="wb") as f:
-                    f.write(subtitles)
-            else:
-                with fpath.open("wb") as f:
-                    f.write(subtitles)
+        _save_subtitles(data, filepaths)
+        if store is not None:
+            _store_subtitles(store, sub_file_ids, data)
+        if ledger is not None:
+            ledger.record(zip(filepaths, sub_file_ids))
 
     def get_comments(
-        self, sub_containers: Sequence[SubContainer]
+        self,
+        sub_containers: Sequence[SubContainer],
+        batch_size: int = 20,
+        parallelism: int = 1,
     ) -> List[List[Comment]]:
         """
-        Get all `Comment`s for the provided `search_results` if there are any.
+        Get all `Comment`s for the provided `search_results` if there are any. The
+        comments for each subtitles are only requested once with up to `batch_size`
+        subtitles per request, and up to `parallelism` requests in flight at once.
         """
         type_check(sub_containers, (list, tuple))
+        _check_batch_size(batch_size)
+
+        ids = [_get_subtitles(sub_container).id for sub_container in sub_containers]
+        unique = _unique_ids(ids)
+        groups = _concurrent_batch(
+            self._get_comments, batch_size, [unique], parallelism
+        )
+
+        # Give every container its own list, including repeats
+        by_id = dict(zip(unique, groups))
+        return [list(by_id[id]) for id in ids]
 
-        ids: List[str] = []
-        for sub_container in sub_containers:
-            type_check(sub_container, (SearchResult, Subtitles))
+    def iter_get_comments(
+        self, sub_containers: Iterable[SubContainer], batch_size: int = 20
+    ) -> Iterator[List[Comment]]:
+        """
+        Same as `get_comments`, but `sub_containers` can be any iterable and the
+        comments for each are yielded as soon as their batch is done. Repeated
+        subtitles are only requested once when they end up in the same batch.
+        """
+        _check_batch_size(batch_size)
 
-            if isinstance(sub_container, SearchResult):
-                sub_container = sub_container.subtitles
-            ids.append(sub_container.id)
-        data = self._request(Endpoint.GET_COMMENTS, ids)["data"]
+        for batch in _iter_batches(sub_containers, batch_size):
+            ids = [_get_subtitles(sub_container).id for sub_container in batch]
 
-        # Group the results, if any, by the query order
-        groups: List[List[ApiDict]] = [[] for _ in sub_containers]
-        if data:
-            for id, comments in data.items():
-                # Returned `id` has a leading _ for some reason so strip it
-                index = ids.index(id[1:])
-                groups[index] = data[id]
+            yield from self._get_comments(ids)
 
-        # Pack results, if any, into `Comment` objects
-        comments: List[List[Comment]] = []
-        for raw_comments in groups:
-            comments.append([Comment.from_data(c) for c in raw_comments])
+    def _get_comments(self, ids: List[str]) -> List[List[Comment]]:
+        data = self._request(Endpoint.GET_COMMENTS, _unique_ids(ids))["data"]
 
-        return comments
+        return _parse_comments(ids, data)
 
     def user_info(self) -> FullUser:
         """
@@ -350,6 +1424,13 @@ class AuthSubwinder(Subwinder):
         """
         self._request(Endpoint.NO_OPERATION)
 
+    def multicall(self, chunk_size: int = 20) -> Multicall:
+        """
+        Returns a `Multicall` that queues up calls for this session so that they can
+        be sent together in as few requests as possible.
+        """
+        return Multicall(self, chunk_size)
+
     # FIXME: specifying a more explicit `Callable` would require being able to specify
     # some of the arguments. Relevant issue:
     # https://github.com/python/mypy/issues/5876
@@ -378,24 +1459,29 @@ class AuthSubwinder(Subwinder):
         function can be provided to better match the result with `ranking_func` where
         parameters can be passed to this function using `*args` and `**kwargs`.
         """
-        type_check(queries, (list, tuple))
-        queries = list(queries)
-
-        for query in queries:
-            type_check(query, str)
+        queries = _check_guess_queries(queries)
 
         # Batch to 3 per api spec
         return _batch(self._guess_media_unranked, 3, [queries])
 
+    def iter_guess_media_unranked(
+        self, queries: Iterable[str]
+    ) -> Iterator[GuessMediaResult]:
+        """
+        Same as `guess_media_unranked`, but `queries` can be any iterable and results
+        are yielded as soon as their batch is done.
+        """
+        # Batch to 3 per api spec
+        for batch in _iter_batches(queries, 3):
+            for query in batch:
+                type_check(query, str)
+
+            yield from self._guess_media_unranked(batch)
+
     def _guess_media_unranked(self, queries: List[str]) -> List[GuessMediaResult]:
         data = self._request(Endpoint.GUESS_MOVIE_FROM_STRING, queries)["data"]
 
-        # Special case: `""` is just silently excluded from the response so force it
-        if "" in queries and "" not in data:
-            data[""] = {}
-
-        # Convert the raw results to `GuessMediaResult`
-        return [GuessMediaResult.from_data(data[query]) for query in queries]
+        return _parse_guesses(queries, data)
 
     # TODO: can we ensure that the `search_result` was matched using a file hash before
     #       calling this endpoint
@@ -411,20 +1497,7 @@ class AuthSubwinder(Subwinder):
         would be better to add a comment instead to give context as to why they're bad
         (`.add_comment("<meaningful-comment>", bad=True)`).
         """
-        type_check(sub_container, (SearchResult, Subtitles))
-
-        # Get subtitles file_id from `sub_container`
-        if isinstance(sub_container, SearchResult):
-            sub_container = sub_container.subtitles
-        sub_to_movie_id = sub_container.sub_to_movie_id
-
-        # This endpoint should only be used when the subtitles were matched by hash
-        if sub_to_movie_id is None:
-            raise ValueError(
-                "`report_media` can only be called if the subtitles were matched off a"
-                " search using a media files hash and size (This is done automatically"
-                " when searching with a `MediaFile` object)."
-            )
+        sub_to_movie_id = _sub_to_movie_id(sub_container)
 
         self._request(Endpoint.REPORT_WRONG_MOVIE_HASH, sub_to_movie_id)
 
@@ -464,65 +1537,50 @@ class AuthSubwinder(Subwinder):
         also gets passed the provided `*args` and `**kwargs`.
         """
         # Verify that all the queries are correct before doing any requests
-        type_check(queries, (list, tuple, zip))
-        # Need to expand out the `zip` if used
-        queries = list(queries)
+        prepared = [_PreparedQuery(q) for q in _check_search_queries(queries)]
 
-        VALID_CLASSES = (MediaFile, Movie, Episode)
-        for query_pair in queries:
-            if not isinstance(query_pair, (list, tuple)) or len(query_pair) != 2:
-                raise ValueError(
-                    "The `search_subtitles` variants expect a list of pairs of the form"
-                    "(<queryable>, <2 letter language code>)"
-                )
+        # Only search for each unique query once
+        unique, positions = _dedupe_search_queries(prepared)
+        batch_size = _search_batch_size(self.limited_search_size)
+        coalesce = _should_coalesce(self.limited_search_size)
+        batches = list(_search_batches(unique, batch_size, coalesce))
+        self._record_search(prepared, len(unique), len(batches), batch_size)
 
-            query, lang_2 = query_pair
-            type_check(query, VALID_CLASSES)
+        unique_groups: List[List[SearchResult]] = []
+        for batch in batches:
+            unique_groups += self._search_subtitles_unranked(batch)
 
-            if lang_2 not in lang_2s:
-                # Show both the 2-char and long name if invalid lang is given
-                lang_map = [f"{k} -> {v}" for k, v in zip(lang_2s, lang_longs)]
-                lang_map = "\n".join(lang_map)
+        return _fan_out_search_results(prepared, positions, unique_groups)
 
-                raise SubLangError(
-                    f"'{lang_2}' not found in valid lang list:\n{lang_map}"
-                )
+    def iter_search_subtitles_unranked(
+        self, queries: Iterable[SearchQuery]
+    ) -> Iterator[List[SearchResult]]:
+        """
+        Same as `search_subtitles_unranked`, but `queries` can be any iterable and the
+        results for each query are yielded as soon as their batch is done. Duplicate
+        queries are only searched for once when they end up in the same batch.
+        """
+        batch_size = _search_batch_size(self.limited_search_size)
+        coalesce = _should_coalesce(self.limited_search_size)
 
-        # The API limits to 5 results if the dev useragent is given so only search one
-        # item at a time. Otherwise use 20 since there should be plenty of options from
-        # the up to 500 results returned
-        if self.limited_search_size:
-            batch_size = 1
-        else:
-            batch_size = 20
+        prepared = (_PreparedQuery(_check_search_query(q)) for q in queries)
+        for batch in _search_batches(prepared, batch_size, coalesce):
+            unique, positions = _dedupe_search_queries(batch)
+            self._record_search(batch, len(unique), 1, batch_size)
 
-        return _batch(
-            self._search_subtitles_unranked,
-            batch_size,
-            [queries],
-        )
+            unique_groups = self._search_subtitles_unranked(unique)
+            yield from _fan_out_search_results(batch, positions, unique_groups)
 
     def _search_subtitles_unranked(
-        self, queries: Sequence[SearchQuery]
+        self, queries: Sequence[_PreparedQuery]
     ) -> List[List[SearchResult]]:
-        internal_queries = [_build_search_query(q, l) for q, l in queries]
-        data = self._request(Endpoint.SEARCH_SUBTITLES, internal_queries)["data"]
+        plan = self._plan_search(queries)
 
-        # Go through the results and organize them in the order of `queries`
-        groups: List[List[SearchResult]] = [[] for _ in internal_queries]
-        for raw_result in data:
-            # Results are returned in an arbitrary order so first figure out the query
-            query_index = int(raw_result["QueryNumber"])
-            query, _ = queries[query_index]
+        data = None
+        if plan.merged:
+            data = self._request(Endpoint.SEARCH_SUBTITLES, plan.merged)["data"]
 
-            # Go ahead and format the result as a `SearchResult`
-            result = SearchResult.from_data(raw_result)
-            result.media.set_dirname(query.get_dirname())
-            result.media.set_filename(query.get_filename())
-
-            groups[query_index].append(result)
-
-        return groups
+        return plan.results(data)
 
     def suggest_media(self, query: str) -> List[Union[Movie, TvSeries]]:
         """
@@ -532,8 +1590,7 @@ class AuthSubwinder(Subwinder):
 
         data = self._request(Endpoint.SUGGEST_MOVIE, query)["data"]
 
-        # `data` is an empty list if there were no results
-        return [] if not data else [build_media(media) for media in data[query]]
+        return _parse_suggestions(query, data)
 
     def add_comment(
         self, sub_container: SubContainer, comment_str: str, bad: bool = False
@@ -542,12 +1599,7 @@ class AuthSubwinder(Subwinder):
         Adds the comment `comment_str` for the `search_result`. If desired you can
         denote that the comment is due to the result being `bad`.
         """
-        type_check(sub_container, (SearchResult, Subtitles))
-
-        # Get the `Subtitles` from `SearchResult`, then get subtitle id
-        if isinstance(sub_container, SearchResult):
-            sub_container = sub_container.subtitles
-        sub_id = sub_container.id
+        sub_id = _get_subtitles(sub_container).id
 
         self._request(Endpoint.ADD_COMMENT, sub_id, comment_str, bad)
 
@@ -555,16 +1607,8 @@ class AuthSubwinder(Subwinder):
         """
         Votes for the `sub_id_obj` with a score of `score`.
         """
-        type_check(sub_container, (SearchResult, Subtitles))
-        type_check(score, int)
-
-        if score < 1 or score > 10:
-            raise ValueError(f"Subtitle Vote must be between 1 and 10, given '{score}'")
-
-        # Get the `Subtitles` from `SearchResult`, then get subtitle id
-        if isinstance(sub_container, SearchResult):
-            sub_container = sub_container.subtitles
-        sub_id = sub_container.id
+        sub_id = _get_subtitles(sub_container).id
+        _check_vote_score(score)
 
         self._request(Endpoint.SUBTITLES_VOTE, sub_id, score)
 
@@ -590,26 +1634,228 @@ class AuthSubwinder(Subwinder):
         type_check(sub_containers, (list, tuple))
 
         # Get the subtitles file_ids from `sub_containers`
-        file_ids: List[str] = []
-        for sub_container in sub_containers:
-            type_check(sub_container, (SearchResult, Subtitles))
-            if isinstance(sub_container, SearchResult):
-                sub_container = sub_container.subtitles
-            file_ids.append(sub_container.file_id)
+        file_ids = [_get_subtitles(sc).file_id for sc in sub_containers]
 
         # Batch to 20 per api spec
         return _batch(self._preview_subtitles, 20, [file_ids])
 
+    def iter_preview_subtitles(
+        self, sub_containers: Iterable[SubContainer]
+    ) -> Iterator[str]:
+        """
+        Same as `preview_subtitles`, but `sub_containers` can be any iterable and the
+        previews are yielded as soon as their batch is done.
+        """
+        # Batch to 20 per api spec
+        for batch in _iter_batches(sub_containers, 20):
+            file_ids = [_get_subtitles(sc).file_id for sc in batch]
+
+            yield from self._preview_subtitles(file_ids)
+
     def _preview_subtitles(self, ids: List[str]) -> List[str]:
         data = self._request(Endpoint.PREVIEW_SUBTITLES, ids)["data"]
 
-        # Unpack our data
-        previews: List[str] = []
-        for preview in data:
-            encoding = preview["encoding"]
-            contents = preview["contents"]
+        return _parse_previews(data)
+
+
+class MulticallResult:
+    """
+    Placeholder for the result of a call queued in a `Multicall`. The result is
+    available once the `Multicall` has been flushed.
+    """
+
+    def __init__(self, parse: Optional[Callable[[ApiDict], Any]] = None) -> None:
+        self._parse = parse
+        self._done = False
+        self._value: Any = None
+        self._error: Optional[SubwinderError] = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(done: {self._done})"
+
+    def _resolve(self, resp: Union[ApiDict, SubwinderError]) -> None:
+        if isinstance(resp, SubwinderError):
+            self._error = resp
+        elif self._parse is not None:
+            self._value = self._parse(resp)
+
+        self._done = True
+
+    def done(self) -> bool:
+        """
+        Returns whether the call has been sent yet.
+        """
+        return self._done
+
+    def result(self) -> Any:
+        """
+        Returns the result of the call, or raises the exception that the call would
+        have raised if made directly.
+        """
+        if not self._done:
+            raise SubLibError(
+                "The result isn't available until the `Multicall` has been flushed"
+            )
+
+        if self._error is not None:
+            raise self._error
+
+        return self._value
+
 
-            # Extract and decode the previews
-            previews.append(utils.extract(contents).decode(encoding))
+class Multicall:
+    """
+    Queues calls to the API so that they can be sent together with `system.multicall`
+    in chunks of at most `chunk_size` calls. Everything queued is sent on exiting the
+    `with` block or whenever `flush` is called.
+    """
+
+    def __init__(self, session: AuthSubwinder, chunk_size: int = 20) -> None:
+        type_check(chunk_size, int)
+        if chunk_size < 1:
+            raise ValueError(f"`chunk_size` must be at least 1, given '{chunk_size}'")
+
+        self._session = session
+        self._chunk_size = chunk_size
+        self._queued: List[Tuple[Endpoint, Tuple[Any, ...], MulticallResult]] = []
+
+    def __enter__(self) -> Multicall:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Send off everything queued if all is well
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(queued: {len(self._queued)})"
+
+    def call(
+        self,
+        endpoint: Endpoint,
+        *params: Any,
+        parse: Optional[Callable[[ApiDict], Any]] = None,
+    ) -> MulticallResult:
+        """
+        Queues a call to `endpoint` with `params`. The raw response is passed through
+        `parse` when provided to get the final result.
+        """
+        type_check(endpoint, Endpoint)
+
+        result = MulticallResult(parse)
+        self._queued.append((endpoint, params, result))
+
+        return result
+
+    def flush(self) -> List[MulticallResult]:
+        """
+        Sends all of the queued calls, returning their results in the order that they
+        were queued.
+        """
+        queued, self._queued = self._queued, []
+
+        for i in range(0, len(queued), self._chunk_size):
+            chunk = queued[i : i + self._chunk_size]
+            for (_, _, result), resp in zip(chunk, self._send(chunk)):
+                result._resolve(resp)
+
+        return [result for _, _, result in queued]
+
+    def _send(
+        self, chunk: List[Tuple[Endpoint, Tuple[Any, ...], MulticallResult]]
+    ) -> List[Union[ApiDict, SubwinderError]]:
+        # Use whatever session the client has now since it may have been replaced
+        # since the calls were queued
+        token = self._session._token
+        resps = subwinder._request.multicall(
+            [(endpoint, token, params) for endpoint, params, _ in chunk]
+        )
+
+        # Same as `AuthSubwinder._request`, calls rejected since the shared session
+        # expired or was logged out are tried once more with the new session
+        rejected = [
+            i
+            for i, resp in enumerate(resps)
+            if isinstance(resp, SubAuthError) and chunk[i][0] not in _SESSION_ENDPOINTS
+        ]
+        if rejected and self._session._replace_session(token):
+            token = self._session._token
+            retried = subwinder._request.multicall(
+                [(chunk[i][0], token, chunk[i][1]) for i in rejected]
+            )
+            for i, resp in zip(rejected, retried):
+                resps[i] = resp
+
+        return resps
+
+    def add_comment(
+        self, sub_container: SubContainer, comment_str: str, bad: bool = False
+    ) -> MulticallResult:
+        """
+        Queued version of `AuthSubwinder.add_comment`.
+        """
+        sub_id = _get_subtitles(sub_container).id
+
+        return self.call(Endpoint.ADD_COMMENT, sub_id, comment_str, bad)
+
+    def get_comments(self, sub_containers: Sequence[SubContainer]) -> MulticallResult:
+        """
+        Queued version of `AuthSubwinder.get_comments`.
+        """
+        type_check(sub_containers, (list, tuple))
+
+        ids = [_get_subtitles(sub_container).id for sub_container in sub_containers]
+
+        return self.call(
+            Endpoint.GET_COMMENTS,
+            _unique_ids(ids),
+            parse=lambda resp: _parse_comments(ids, resp["data"]),
+        )
+
+    def ping(self) -> MulticallResult:
+        """
+        Queued version of `AuthSubwinder.ping`.
+        """
+        return self.call(Endpoint.NO_OPERATION)
+
+    def preview_subtitles(
+        self, sub_containers: Sequence[SubContainer]
+    ) -> MulticallResult:
+        """
+        Queued version of `AuthSubwinder.preview_subtitles`. Since this is a single
+        call it is limited to 20 `sub_containers` per api spec.
+        """
+        type_check(sub_containers, (list, tuple))
+        if len(sub_containers) > 20:
+            raise ValueError(
+                "`Multicall.preview_subtitles` can only preview 20 subtitles per call,"
+                f" given {len(sub_containers)}"
+            )
+
+        file_ids = [_get_subtitles(sc).file_id for sc in sub_containers]
+
+        return self.call(
+            Endpoint.PREVIEW_SUBTITLES,
+            file_ids,
+            parse=lambda resp: _parse_previews(resp["data"]),
+        )
+
+    def report_media(self, sub_container: SubContainer) -> MulticallResult:
+        """
+        Queued version of `AuthSubwinder.report_media`.
+        """
+        sub_to_movie_id = _sub_to_movie_id(sub_container)
+
+        return self.call(Endpoint.REPORT_WRONG_MOVIE_HASH, sub_to_movie_id)
+
+    def vote(self, sub_container: SubContainer, score: int) -> MulticallResult:
+        """
+        Queued version of `AuthSubwinder.vote`.
+        """
+        sub_id = _get_subtitles(sub_container).id
+        _check_vote_score(score)
 
-        return previews
+        return self.call(Endpoint.SUBTITLES_VOTE, sub_id, score)
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Union, cast
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar, Union, cast
 
-from subwinder._constants import REPO_URL, TIME_FORMAT
+from subwinder._constants import REPO_URL
+from subwinder._internal_utils import intern_str, parse_timestamp
 from subwinder.exceptions import SubLibError
 from subwinder.lang import LangFormat, lang_3s
 from subwinder.types import AnyPath, ApiDict, Lang2
 
+T = TypeVar("T")
+
+# Note: The containers use `__slots__` since a search can return hundreds of results per
+# query which adds up quickly with a `__dict__` for each object. Values that repeat a
+# lot between results (like languages and extensions) are interned as well
+
+
+def _as_path(path: Optional[AnyPath]) -> Optional[Path]:
+    # Reuse `Path`s as is so that all the results for a query share the same ones
+    if path is None or isinstance(path, Path):
+        return path
+
+    return Path(path)
+
 
 # TODO: allow for passing in a dict that maps the resolved class to the extended class?
 # Build the right info object from the "MovieKind"
@@ -40,6 +56,8 @@ class User:
     Data container holding basic user information.
     """
 
+    __slots__ = ("id", "name")
+
     id: str
     name: str
 
@@ -64,6 +82,14 @@ class FullUser(User):
     Data container holding extensive user information.
     """
 
+    __slots__ = (
+        "rank",
+        "num_uploads",
+        "num_downloads",
+        "preferred_languages",
+        "web_language",
+    )
+
     rank: str
     num_uploads: int
     num_downloads: int
@@ -82,7 +108,8 @@ class FullUser(User):
                 preferred.append(lang_3s.convert(lang, LangFormat.LANG_2))
 
         return cls(
-            **user.__dict__,
+            id=user.id,
+            name=user.name,
             rank=data["UserRank"],
             num_uploads=int(data["UploadCnt"]),
             num_downloads=int(data["DownloadCnt"]),
@@ -97,6 +124,8 @@ class Comment:
     Data container for a comment.
     """
 
+    __slots__ = ("author", "date", "text")
+
     author: User
     date: datetime
     text: str
@@ -106,7 +135,7 @@ class Comment:
         # Note: Anonymous user's can't leave comments so this is guaranteed to return a
         # `User`
         author: User = cast(User, User.from_data(data))
-        date: datetime = datetime.strptime(data["Created"], TIME_FORMAT)
+        date: datetime = parse_timestamp(data["Created"])
         text: str = data["Comment"]
 
         return cls(author, date, text)
@@ -118,6 +147,8 @@ class Media:
     Data container for a generic Media.
     """
 
+    __slots__ = ("name", "year", "imdbid", "_dirname", "_filename")
+
     name: str
     year: int
     imdbid: str
@@ -132,9 +163,9 @@ class Media:
         dirname: Optional[Path],
         filename: Optional[Path],
     ) -> None:
-        self.name = name
+        self.name = intern_str(name)
         self.year = year
-        self.imdbid = imdbid
+        self.imdbid = intern_str(imdbid)
         self.set_dirname(dirname)
         self.set_filename(filename)
 
@@ -161,10 +192,10 @@ class Media:
             self.set_filename(filepath.name)
 
     def set_filename(self, filename: Optional[AnyPath]) -> None:
-        self._filename = None if filename is None else Path(filename)
+        self._filename = _as_path(filename)
 
     def set_dirname(self, dirname: Optional[AnyPath]) -> None:
-        self._dirname = None if dirname is None else Path(dirname)
+        self._dirname = _as_path(dirname)
 
     def get_filepath(self) -> Optional[Path]:
         filename = self.get_filename()
@@ -187,6 +218,8 @@ class Movie(Media):
     Data container for a Movie.
     """
 
+    __slots__ = ()
+
     # Need to override the base class' method so that the signature is right :/
     @classmethod
     def from_data(cls, data: ApiDict) -> Movie:
@@ -198,6 +231,8 @@ class TvSeries(Media):
     Data container for a TV Series.
     """
 
+    __slots__ = ()
+
     # Need to override the base class' method so that the signature is right :/
     @classmethod
     def from_data(cls, data: ApiDict) -> TvSeries:
@@ -210,6 +245,8 @@ class Episode(TvSeries):
     Data contianer for a single TV Series Episode.
     """
 
+    __slots__ = ("season", "episode")
+
     season: int
     episode: int
 
@@ -256,6 +293,8 @@ class DownloadInfo:
     Data container for a user's daily download information.
     """
 
+    __slots__ = ("ip", "downloaded", "remaining", "limit", "limit_checked_by")
+
     ip: str
     downloaded: int
     remaining: int
@@ -280,6 +319,19 @@ class ServerInfo:
     Data container for various information for opensubtitles' server.
     """
 
+    __slots__ = (
+        "application",
+        "users_online",
+        "users_logged_in",
+        "users_online_peak",
+        "users_registered",
+        "bots_online",
+        "total_subtitles_downloaded",
+        "total_subtitle_files",
+        "total_movies",
+        "daily_download_info",
+    )
+
     application: str
     users_online: int
     users_logged_in: int
@@ -313,11 +365,23 @@ class Subtitles:
     Data container for a set of uploaded Subtitles.
     """
 
+    __slots__ = (
+        "size",
+        "id",
+        "file_id",
+        "sub_to_movie_id",
+        "_filename",
+        "lang_2",
+        "ext",
+        "encoding",
+    )
+
     size: int
     id: str
     file_id: str
     sub_to_movie_id: Optional[str]
-    filename: Path
+    # Kept as a `str` and only made into a `Path` when used
+    _filename: str
     lang_2: Lang2
     ext: str
     encoding: str
@@ -328,7 +392,7 @@ class Subtitles:
         id: str,
         file_id: str,
         sub_to_movie_id: Optional[str],
-        filename: Path,
+        filename: AnyPath,
         lang_2: Lang2,
         ext: str,
         encoding: str,
@@ -337,10 +401,18 @@ class Subtitles:
         self.id = id
         self.file_id = file_id
         self.sub_to_movie_id = sub_to_movie_id
-        self.filename = Path(filename)
-        self.lang_2 = lang_2
-        self.ext = ext
-        self.encoding = encoding
+        self.filename = filename
+        self.lang_2 = intern_str(lang_2)
+        self.ext = intern_str(ext)
+        self.encoding = intern_str(encoding)
+
+    @property
+    def filename(self) -> Path:
+        return Path(self._filename)
+
+    @filename.setter
+    def filename(self, filename: AnyPath) -> None:
+        self._filename = str(filename)
 
     @classmethod
     def from_data(cls, data: ApiDict) -> Subtitles:
@@ -363,39 +435,156 @@ class Subtitles:
         )
 
 
-@dataclass
+class _LazyField(Generic[T]):
+    """
+    Field of a `SearchResult` that's parsed from the raw API data on first access. The
+    value is then kept in the field's matching private slot.
+    """
+
+    def __init__(self, parse: Callable[[SearchResult], T]) -> None:
+        self.parse = parse
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = f"_{name}"
+
+    def __get__(self, obj: Optional[SearchResult], owner: Optional[type] = None) -> T:
+        if obj is None:
+            return cast(T, self)
+
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            # Not parsed yet
+            value = self.parse(obj)
+            setattr(obj, self.slot, value)
+            return value
+
+    def __set__(self, obj: SearchResult, value: T) -> None:
+        setattr(obj, self.slot, value)
+
+
+def _parse_media(result: SearchResult) -> Media:
+    media = build_media(result._data)
+    dirname, filename = result._media_location
+    media.set_dirname(dirname)
+    media.set_filename(filename)
+
+    return media
+
+
+def _parse_rating(result: SearchResult) -> Optional[float]:
+    rating = result._data["SubRating"]
+    # 0.0 is the listed rating if there are no ratings yet which seems deceptive at a
+    # glance
+    return None if rating == "0.0" else float(rating)
+
+
 class SearchResult:
     """
-    Data container for a search result from searching for subtitles.
+    Data container for a search result from searching for subtitles. Results built
+    with `from_data` keep the raw data and only parse each field when it's used since
+    most results from a search are thrown away after ranking.
     """
 
-    author: Optional[User]
-    media: Media
-    subtitles: Subtitles
-    upload_date: datetime
-    num_bad_reports: int
-    num_downloads: int
-    num_comments: int
-    rating: Optional[float]
-    score: float
-    hearing_impaired: bool
+    _FIELDS = (
+        "author",
+        "media",
+        "subtitles",
+        "upload_date",
+        "num_bad_reports",
+        "num_downloads",
+        "num_comments",
+        "rating",
+        "score",
+        "hearing_impaired",
+    )
+
+    __slots__ = ("_data", "_media_location") + tuple(f"_{field}" for field in _FIELDS)
+
+    author = _LazyField(lambda result: User.from_data(result._data))
+    media = _LazyField(_parse_media)
+    subtitles = _LazyField(lambda result: Subtitles.from_data(result._data))
+    upload_date = _LazyField(lambda result: parse_timestamp(result._data["SubAddDate"]))
+    num_bad_reports = _LazyField(lambda result: int(result._data["SubBad"]))
+    num_downloads = _LazyField(lambda result: int(result._data["SubDownloadsCnt"]))
+    num_comments = _LazyField(lambda result: int(result._data["SubComments"]))
+    rating = _LazyField(_parse_rating)
+    score = _LazyField(lambda result: float(result._data["Score"]))
+    hearing_impaired = _LazyField(
+        lambda result: bool(int(result._data["SubHearingImpaired"]))
+    )
+
+    def __init__(
+        self,
+        author: Optional[User],
+        media: Media,
+        subtitles: Subtitles,
+        upload_date: datetime,
+        num_bad_reports: int,
+        num_downloads: int,
+        num_comments: int,
+        rating: Optional[float],
+        score: float,
+        hearing_impaired: bool,
+    ) -> None:
+        self._data: ApiDict = {}
+        self._media_location: Tuple[Optional[AnyPath], Optional[AnyPath]] = (None, None)
+
+        self.author = author
+        self.media = media
+        self.subtitles = subtitles
+        self.upload_date = upload_date
+        self.num_bad_reports = num_bad_reports
+        self.num_downloads = num_downloads
+        self.num_comments = num_comments
+        self.rating = rating
+        self.score = score
+        self.hearing_impaired = hearing_impaired
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"{self.__class__.__name__}({fields})"
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
 
     @classmethod
     def from_data(cls, data: ApiDict) -> SearchResult:
-        return cls(
-            author=User.from_data(data),
-            media=build_media(data),
-            subtitles=Subtitles.from_data(data),
-            upload_date=datetime.strptime(data["SubAddDate"], TIME_FORMAT),
-            num_bad_reports=int(data["SubBad"]),
-            num_downloads=int(data["SubDownloadsCnt"]),
-            num_comments=int(data["SubComments"]),
-            # 0.0 is the listed rating if there are no ratings yet which seems deceptive
-            # at a glance
-            rating=None if data["SubRating"] == "0.0" else float(data["SubRating"]),
-            score=data["Score"],
-            hearing_impaired=bool(int(data["SubHearingImpaired"])),
-        )
+        result = cls.__new__(cls)
+        result._data = data
+        result._media_location = (None, None)
+
+        return result
+
+    def _locate_media(
+        self, dirname: Optional[AnyPath], filename: Optional[AnyPath]
+    ) -> None:
+        """
+        Points this result's media at `dirname` and `filename`. A parsed media is
+        copied first so that it isn't changed for any other results sharing it.
+        """
+        try:
+            media = copy.copy(self._media)
+        except AttributeError:
+            # Not parsed yet so just use the location when it is
+            self._media_location = (dirname, filename)
+            return
+
+        media.set_dirname(dirname)
+        media.set_filename(filename)
+        self._media = media
+
+    def _subtitles_ext(self) -> str:
+        """
+        The subtitles' extension without needing to parse the rest of the subtitles.
+        """
+        try:
+            return self._subtitles.ext
+        except AttributeError:
+            return self._data["SubFormat"].lower()
 
 
 @dataclass
@@ -404,6 +593,8 @@ class GuessMediaResult:
     Data container for a result from `AuthSubwinder`'s `guess_media` method
     """
 
+    __slots__ = ("best_guess", "from_string", "from_imdb")
+
     best_guess: Optional[Media]
     from_string: Optional[Media]
     from_imdb: List[Media]
@@ -2,16 +2,22 @@ from __future__ import annotations
 
 # Note: this whole file uses enough global variables to make my skin crawl, but I can't
 # really think of a nicer way of exposing everything
+import json
+import os
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
+from tempfile import NamedTemporaryFile
 from typing import Dict, Iterator, List, Optional, Tuple
 
 # See: https://github.com/LovecraftianHorror/subwinder/issues/52#issuecomment-637333960
 # if you want to know why `request` isn't imported with `from`
 import subwinder._request
 from subwinder._request import Endpoint
-from subwinder.exceptions import SubLangError
+from subwinder.exceptions import SubLangError, SubwinderError
+from subwinder.types import AnyPath
 
 
 class _LangKey(Enum):
@@ -40,34 +46,102 @@ class _LangConverter:
     """
 
     _last_updated: Optional[datetime]
-    _langs: List[List[str]]
+    # The lang lists for every `LangFormat` along with a map of each lang to its index
+    # in the list. Both are swapped in with one assignment so that lookups racing a
+    # background refresh never mix the old and new lists
+    _table: Tuple[List[List[str]], List[Dict[str, int]]]
+    # Where the language list is persisted between runs, if anywhere
+    cache_file: Optional[Path]
+    # Pinned languages are never refreshed from the API
+    pinned: bool
 
     # TODO: `_last_updated` doesn't actually get set??
     def __init__(self) -> None:
+        self.cache_file = None
+        self.pinned = False
+        self._update_lock = threading.Lock()
+        # Only held by the background refresh so lookups never wait on it
+        self._refresh_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
         self.default()
 
     def _fetch(self) -> List[Dict[str, str]]:
         return subwinder._request.request(Endpoint.GET_SUB_LANGUAGES, None)["data"]
 
     def _maybe_update(self, force: bool = False) -> None:
+        if self.pinned and not force:
+            return
+
         # Language list should refresh every hour, return early if still fresh unless
         # update is `force`d
         if not force and self._last_updated is not None:
-            if (datetime.now() - self._last_updated).total_seconds() < 3600:
+            if self._is_fresh():
+                return
+
+            # When using a `cache_file` serve the stale list right away and refresh it
+            # in the background instead of blocking the caller
+            if self.cache_file is not None:
+                self._refresh_in_background()
                 return
 
+        with self._update_lock:
+            # Another thread may have already updated while we were waiting
+            if force or not self._is_fresh():
+                self._update()
+
+    def _is_fresh(self) -> bool:
+        if self._last_updated is None:
+            return False
+
+        return (datetime.now() - self._last_updated).total_seconds() < 3600
+
+    @property
+    def _langs(self) -> List[List[str]]:
+        return self._table[0]
+
+    def _refresh_in_background(self) -> None:
+        # Someone else is already refreshing so keep serving the stale list
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        try:
+            self._refresher = threading.Thread(target=self._background_update)
+            self._refresher.daemon = True
+            self._refresher.start()
+        except BaseException:
+            self._refresh_lock.release()
+            raise
+
+    def _background_update(self) -> None:
+        # Must be started with `_refresh_lock` held, which is released once done
+        try:
+            self._update()
+        except SubwinderError:
+            # Keep serving the stale list, the next lookup will try again
+            pass
+        finally:
+            self._refresh_lock.release()
+
+    def _update(self) -> None:
+        # Must be called with either `_update_lock` or `_refresh_lock` held
         # Get language list from api
         lang_sets = self._fetch()
 
-        # Reset then recollect info
-        self.default()
+        # Collect the info then swap it in along with the refreshed updated time
+        langs: List[List[str]] = [[] for _ in LangFormat]
         for lang_set in lang_sets:
             for lang_format in LangFormat:
                 lang = lang_set[_LangKey.from_format(lang_format).value]
-                self._langs[lang_format.value].append(lang)
+                langs[lang_format.value].append(lang)
+
+        self.set(datetime.now(), langs)
 
-        # Refresh updated time
-        self._last_updated = datetime.now()
+        if self.cache_file is not None:
+            try:
+                self.save(self.cache_file)
+            except OSError:
+                # Failing to persist the list shouldn't keep it from being used
+                pass
 
     def default(self) -> None:
         self.set(None, [[] for _ in list(LangFormat)])
@@ -81,26 +155,81 @@ class _LangConverter:
         return last_updated, langs
 
     def set(self, last_updated: Optional[datetime], langs: List[List[str]]) -> None:
+        # Build the indexes up front so that lookups don't have to scan the lists.
+        # `setdefault` keeps the first match for any duplicates like `list.index`
+        indexes: List[Dict[str, int]] = []
+        for lang_list in langs:
+            index: Dict[str, int] = {}
+            for i, lang in enumerate(lang_list):
+                index.setdefault(lang, i)
+            indexes.append(index)
+
+        self._table = (langs, indexes)
         self._last_updated = last_updated
-        self._langs = langs
+
+    def load(self, path: Path) -> bool:
+        """
+        Loads the language list saved at `path`, returning whether it was loaded.
+        """
+        try:
+            with path.open() as file:
+                saved = json.load(file)
+
+            last_updated = datetime.fromtimestamp(saved["last_updated"])
+            langs = saved["langs"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or corrupt saves are the same as having nothing saved
+            return False
+
+        if len(langs) != len(LangFormat):
+            return False
+
+        self.set(last_updated, langs)
+        return True
+
+    def save(self, path: Path) -> None:
+        """
+        Saves the language list to `path`.
+        """
+        saved = {
+            "last_updated": None
+            if self._last_updated is None
+            else self._last_updated.timestamp(),
+            "langs": self._langs,
+        }
+
+        # Write to a temporary file first so that other processes never see a
+        # partially written file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile("w", dir=path.parent, delete=False) as file:
+            json.dump(saved, file)
+        os.replace(file.name, path)
+
+    def contains(self, lang: str, lang_format: LangFormat) -> bool:
+        self._maybe_update()
+
+        _, indexes = self._table
+        return lang in indexes[lang_format.value]
 
     def convert(self, lang: str, from_format: LangFormat, to_format: LangFormat) -> str:
         self._maybe_update()
 
+        langs, indexes = self._table
         try:
-            lang_index = self._langs[from_format.value].index(lang)
-        except ValueError:
+            lang_index = indexes[from_format.value][lang]
+        except KeyError:
             raise SubLangError(
                 f"Tried to convert language '{lang}', but not found in language list:"
-                f" {self._langs[from_format.value]}"
+                f" {langs[from_format.value]}"
             )
 
-        return self._langs[to_format.value][lang_index]
+        return langs[to_format.value][lang_index]
 
     def list(self, lang_format: LangFormat) -> List[str]:
         self._maybe_update()
 
-        return self._langs[lang_format.value]
+        langs, _ = self._table
+        return langs[lang_format.value]
 
 
 # `_converter` shared by all the `_Lang`s
@@ -118,6 +247,9 @@ class _Lang:
 
     _format: LangFormat
 
+    def __contains__(self, lang: object) -> bool:
+        return isinstance(lang, str) and _converter.contains(lang, self._format)
+
     def __iter__(self) -> Iterator[str]:
         return iter(_converter.list(self._format))
 
@@ -135,3 +267,41 @@ class _Lang:
 lang_2s = _Lang(LangFormat.LANG_2)
 lang_3s = _Lang(LangFormat.LANG_3)
 lang_longs = _Lang(LangFormat.LANG_LONG)
+
+
+def set_cache_file(path: Optional[AnyPath]) -> None:
+    """
+    Persist the language list to `path` so that it can be reused across runs, loading
+    it right away if it already exists. When the saved list goes stale it keeps being
+    used while a fresh list is fetched in the background. `None` stops persisting.
+    """
+    _converter.cache_file = None if path is None else Path(path)
+
+    if _converter.cache_file is not None:
+        _converter.load(_converter.cache_file)
+
+
+def pin_snapshot(path: Optional[AnyPath]) -> None:
+    """
+    Use the language list saved at `path` (from `save_snapshot`) without ever
+    refreshing it from the API, allowing for fully offline operation. `None` unpins
+    the list so that it's refreshed like normal.
+    """
+    if path is None:
+        _converter.pinned = False
+        return
+
+    path = Path(path)
+    if not _converter.load(path):
+        raise SubLangError(f"Unable to load a language snapshot from '{path}'")
+
+    _converter.pinned = True
+
+
+def save_snapshot(path: AnyPath) -> None:
+    """
+    Saves the current language list to `path` for later use with `pin_snapshot`.
+    """
+    # Make sure there's a list to save
+    _converter._maybe_update()
+    _converter.save(Path(path))
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, cast
-
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from subwinder._internal_utils import type_check
+from subwinder.exceptions import SubHashError
 from subwinder.types import AnyPath
 from subwinder.utils import special_hash
 
+if TYPE_CHECKING:
+    from subwinder.cache import HashCache
+
 
 @dataclass
 class MediaFile:
@@ -19,18 +36,85 @@ class MediaFile:
     _dirname: Optional[Path]
     _filename: Optional[Path]
 
-    def __init__(self, filepath: AnyPath) -> None:
+    def __init__(
+        self, filepath: AnyPath, hash_cache: Optional[HashCache] = None
+    ) -> None:
         """
-        Builds a `MediaFile` object from a local file.
+        Builds a `MediaFile` object from a local file. If a `hash_cache` is provided
+        then the file is only hashed when there isn't already an entry for it.
         """
         filepath = Path(filepath)
-        hash = special_hash(filepath)
-        size = filepath.stat().st_size
+        if hash_cache is None:
+            hash = special_hash(filepath)
+            size = filepath.stat().st_size
+        else:
+            hash, size = hash_cache.hash_file(filepath)
 
         self._from_parts(hash, size)
         # Set file info from given `filepath`
         self.set_filepath(filepath)
 
+    @classmethod
+    def from_paths(
+        cls,
+        filepaths: Iterable[AnyPath],
+        workers: int = 8,
+        ordered: bool = False,
+        hash_cache: Optional[HashCache] = None,
+    ) -> Iterator[Tuple[Path, Union[MediaFile, SubHashError, OSError]]]:
+        """
+        Builds `MediaFile` objects for all the `filepaths` using up to `workers`
+        threads. Pairs of `(filepath, media_file)` are yielded as each file finishes
+        hashing (or in the same order as `filepaths` if `ordered`), where any file that
+        can't be hashed has the `SubHashError` (too small) or `OSError` (missing,
+        unreadable, timed out, etc.) in place of the `MediaFile`. The `hash_cache` is
+        passed along to each `MediaFile`.
+        """
+        type_check(workers, int)
+        if workers < 1:
+            raise ValueError(f"`workers` must be at least 1, given '{workers}'")
+
+        # Keep the pool fed without pulling in all of `filepaths` at once
+        max_pending = workers * 2
+        remaining = iter(filepaths)
+        exhausted = False
+
+        pending: Dict[Future, Path] = {}
+        in_order: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        filepath = Path(next(remaining))
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    future = executor.submit(cls._try_from_path, filepath, hash_cache)
+                    pending[future] = filepath
+                    if ordered:
+                        in_order.append(future)
+
+                if not pending:
+                    break
+
+                if ordered:
+                    done: Iterable[Future] = [in_order.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield pending.pop(future), future.result()
+
+    @classmethod
+    def _try_from_path(
+        cls, filepath: Path, hash_cache: Optional[HashCache]
+    ) -> Union[MediaFile, SubHashError, OSError]:
+        try:
+            return cls(filepath, hash_cache)
+        except (SubHashError, OSError) as err:
+            return err
+
     @classmethod
     def from_parts(
         cls,
@@ -1,11 +1,28 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, cast
+from string import Formatter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, cast
 
 from subwinder.exceptions import SubDownloadError
 from subwinder.info import Subtitles
 from subwinder.lang import LangFormat, lang_2s
 
+# The `subtitles`, `media_filename`, `media_dirname`, and `download_dir` passed to
+# `generate`
+NameTarget = Tuple[Subtitles, Optional[Path], Optional[Path], Optional[Path]]
+
+NAME_FIELDS = frozenset(
+    [
+        "media_name",
+        "lang_2",
+        "lang_3",
+        "lang_long",
+        "ext",
+        "upload_name",
+        "upload_filename",
+    ]
+)
+
 
 # TODO: move all this once core is split up
 # TODO: Having a formatter setup to indicate hearing impaired would be a good example of
@@ -21,18 +38,102 @@ class BaseNameFormatter(ABC):
     ) -> Path:
         pass
 
+    def generate_many(self, targets: Iterable[NameTarget]) -> List[Path]:
+        """
+        Generates the path for each of `targets` where each target is the parameters
+        for `generate`. Override this if there's work that can be shared between all
+        of the `targets`.
+        """
+        return [self.generate(*target) for target in targets]
+
+
+def _template_fields(name_format: str) -> FrozenSet[str]:
+    """
+    Helper function that gets all of the fields used in `name_format` raising a
+    `ValueError` for anything that isn't one of the `NAME_FIELDS`.
+    """
+    fields: Set[str] = set()
+    for _, field_name, format_spec, _ in Formatter().parse(name_format):
+        if field_name is None:
+            continue
+
+        # Only the base name matters for things like "{upload_filename.stem}"
+        name = field_name.partition(".")[0].partition("[")[0]
+        if name not in NAME_FIELDS:
+            raise ValueError(
+                f"Unknown field '{{{field_name}}}' in `name_format`"
+                f" '{name_format}'. Valid fields are {sorted(NAME_FIELDS)}"
+            )
+
+        fields.add(name)
+        # Format specs can have their own nested fields
+        if format_spec:
+            fields |= _template_fields(format_spec)
+
+    return frozenset(fields)
+
 
 class NameFormatter(BaseNameFormatter):
     def __init__(self, name_format: str) -> None:
         self.name_format = name_format
+        # Parse the template once so that only the fields it uses get built
+        self._fields = _template_fields(name_format)
 
-    # TODO: is there some easy way to extend this or offer some of its functionality
     def generate(
         self,
         subtitles: Subtitles,
         media_filename: Optional[Path],
         media_dirname: Optional[Path],
         download_dir: Optional[Path],
+    ) -> Path:
+        langs = self._lang_values(subtitles.lang_2)
+
+        return self._generate(
+            subtitles, media_filename, media_dirname, download_dir, langs
+        )
+
+    def generate_many(self, targets: Iterable[NameTarget]) -> List[Path]:
+        # Respect derived classes that customize `generate`
+        if type(self).generate is not NameFormatter.generate:
+            return super().generate_many(targets)
+
+        # Lots of subtitles share a language so only look each one up once
+        lang_lookups: Dict[str, Dict[str, str]] = {}
+        paths: List[Path] = []
+        for subtitles, media_filename, media_dirname, download_dir in targets:
+            lang_2 = subtitles.lang_2
+            if lang_2 not in lang_lookups:
+                lang_lookups[lang_2] = self._lang_values(lang_2)
+
+            paths.append(
+                self._generate(
+                    subtitles,
+                    media_filename,
+                    media_dirname,
+                    download_dir,
+                    lang_lookups[lang_2],
+                )
+            )
+
+        return paths
+
+    def _lang_values(self, lang_2: str) -> Dict[str, str]:
+        values = {}
+        if "lang_3" in self._fields:
+            values["lang_3"] = lang_2s.convert(lang_2, LangFormat.LANG_3)
+        if "lang_long" in self._fields:
+            values["lang_long"] = lang_2s.convert(lang_2, LangFormat.LANG_LONG)
+
+        return values
+
+    # TODO: is there some easy way to extend this or offer some of its functionality
+    def _generate(
+        self,
+        subtitles: Subtitles,
+        media_filename: Optional[Path],
+        media_dirname: Optional[Path],
+        download_dir: Optional[Path],
+        langs: Dict[str, str],
     ) -> Path:
         # Make sure there is enough context to save subtitles
         if media_dirname is None and download_dir is None:
@@ -43,25 +144,15 @@ class NameFormatter(BaseNameFormatter):
                 " `download_subtitles`"
             )
 
-        if media_filename is None:
-            # Hacky way to see if `media_name` is used in `name_format`
-            try:
-                _ = self.name_format.format(
-                    lang_2="",
-                    lang_3="",
-                    lang_long="",
-                    ext="",
-                    upload_name="",
-                    upload_filename="",
-                )
-            except KeyError:
-                # Can't set the media's `media_name` if we have no `media_name`
-                # TODO: should be a TypeError or ValueError?
-                raise SubDownloadError(
-                    "Insufficient context. Need to set the `filename` for"
-                    f" {subtitles} if you plan on using `media_name` in the"
-                    " `name_format`"
-                )
+        fields = self._fields
+        if media_filename is None and "media_name" in fields:
+            # Can't set the media's `media_name` if we have no `media_name`
+            # TODO: should be a TypeError or ValueError?
+            raise SubDownloadError(
+                "Insufficient context. Need to set the `filename` for"
+                f" {subtitles} if you plan on using `media_name` in the"
+                " `name_format`"
+            )
 
         # Store the subtitle file next to the original media unless `download_dir`
         # was set
@@ -72,17 +163,14 @@ class NameFormatter(BaseNameFormatter):
         dir_path = cast(Path, dir_path)
 
         # Format the `filename` according to the `name_format` passed in
-        upload_name = subtitles.filename.stem
-        media_name = None if media_filename is None else media_filename.stem
-
-        filename = self.name_format.format(
-            media_name=media_name,
-            lang_2=subtitles.lang_2,
-            lang_3=lang_2s.convert(subtitles.lang_2, LangFormat.LANG_3),
-            lang_long=lang_2s.convert(subtitles.lang_2, LangFormat.LANG_LONG),
-            ext=subtitles.ext,
-            upload_name=upload_name,
-            upload_filename=subtitles.filename,
+        values: Dict[str, object] = dict(
+            langs, lang_2=subtitles.lang_2, ext=subtitles.ext
         )
+        if "media_name" in fields:
+            values["media_name"] = cast(Path, media_filename).stem
+        if "upload_name" in fields or "upload_filename" in fields:
+            upload_filename = subtitles.filename
+            values["upload_name"] = upload_filename.stem
+            values["upload_filename"] = upload_filename
 
-        return dir_path / filename
+        return dir_path / self.name_format.format_map(values)
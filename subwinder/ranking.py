@@ -1,8 +1,13 @@
-from typing import List, Optional
+import heapq
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
 
 from subwinder.info import GuessMediaResult, Media, SearchResult
 from subwinder.types import Searchable
 
+Filter = Callable[[SearchResult], bool]
+KeyFunc = Callable[[SearchResult], float]
+WeightedKey = Tuple[KeyFunc, float]
+
 
 def rank_guess_media(results: GuessMediaResult, query: str) -> Optional[Media]:
     """
@@ -14,6 +19,100 @@ def rank_guess_media(results: GuessMediaResult, query: str) -> Optional[Media]:
     return results.best_guess
 
 
+# Filters and keys for `Ranker`. These stick to the fields that are cheap to read from a
+# lazily parsed `SearchResult` where possible
+def is_good(result: SearchResult) -> bool:
+    """
+    Filter for results that no one has marked as bad.
+    """
+    return result.num_bad_reports == 0
+
+
+def has_ext(*exts: str) -> Filter:
+    """
+    Builds a filter (or key) for results whose subtitles have one of the
+    case-insensitive `exts`.
+    """
+    lowered = {ext.lower() for ext in exts}
+
+    def matches(result: SearchResult) -> bool:
+        return result._subtitles_ext().lower() in lowered
+
+    return matches
+
+
+def score(result: SearchResult) -> float:
+    """
+    Key for how well the API thinks the result matches the query.
+    """
+    return result.score
+
+
+def downloads(result: SearchResult) -> float:
+    """
+    Key for the number of times the subtitles have been downloaded.
+    """
+    return result.num_downloads
+
+
+def rating(result: SearchResult) -> float:
+    """
+    Key for the average rating of the subtitles (`0.0` if they haven't been rated).
+    """
+    return result.rating or 0.0
+
+
+def hearing_impaired(result: SearchResult) -> float:
+    """
+    Key that's `1` for subtitles meant for the hearing impaired and `0` otherwise.
+    """
+    return result.hearing_impaired
+
+
+class Ranker:
+    """
+    Declarative ranking for search results. Results have to pass all of the `filters`,
+    and the ones left are ranked by the sum of each key function in `keys` times its
+    weight (so a negative weight prefers lower values). Ties keep the order from the
+    API. A `Ranker` can be used directly as the `ranking_func` for `search_subtitles`.
+    """
+
+    def __init__(
+        self,
+        filters: Sequence[Filter] = (),
+        keys: Sequence[WeightedKey] = ((score, 1.0),),
+    ) -> None:
+        self.filters = list(filters)
+        self.keys = list(keys)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(filters: {self.filters}, keys: {self.keys})"
+
+    def __call__(
+        self, results: Iterable[SearchResult], query: Searchable, *_: Any, **__: Any
+    ) -> Optional[SearchResult]:
+        best = self.top(results, 1)
+        return best[0] if best else None
+
+    def rank(self, result: SearchResult) -> float:
+        """
+        The weighted rank of `result` where higher is better.
+        """
+        return sum(weight * key(result) for key, weight in self.keys)
+
+    def top(self, results: Iterable[SearchResult], k: int) -> List[SearchResult]:
+        """
+        Returns up to `k` of the best `results` from best to worst. This only goes over
+        `results` once using a heap of the best `k`.
+        """
+        filters = self.filters
+        passed = (
+            result for result in results if all(passes(result) for passes in filters)
+        )
+
+        return heapq.nlargest(k, passed, key=self.rank)
+
+
 # TODO: this really __should not__ `exclude_bad` by default
 def rank_search_subtitles(
     results: List[SearchResult],
@@ -29,24 +128,11 @@ def rank_search_subtitles(
     that has been marked as bad by a user, and `sub_exts` is an optional
     case-insensitive list of accepted subtitle extensions.
     """
-    best_result = None
-    max_score = None
-
-    # Force list of `sub_exts` to be lowercase
-    sub_exts = None if sub_exts is None else [ext.lower() for ext in sub_exts]
-
-    for result in results:
-        # Skip if someone listed sub as bad and `exclude_bad` is `True`
-        if exclude_bad and result.num_bad_reports > 0:
-            continue
-
-        # Skip incorrect `sub_ext`s if provided
-        if sub_exts is not None and result.subtitles.ext.lower() not in sub_exts:
-            continue
-
-        # Pick the one with the highest score if it matches all other criteria
-        if max_score is None or result.score > max_score:
-            best_result = result
-            max_score = result.score
+    filters: List[Filter] = []
+    if exclude_bad:
+        filters.append(is_good)
+    if sub_exts is not None:
+        filters.append(has_ext(*sub_exts))
 
-    return best_result
+    # Pick the one with the highest score out of the ones left
+    return Ranker(filters, [(score, 1.0)])(results, query)
@@ -1,9 +1,13 @@
 import base64
+import binascii
 import gzip
 import os
+import struct
+import zlib
 from pathlib import Path
-from typing import AnyStr
+from typing import AnyStr, BinaryIO, Iterator
 
+from subwinder._request import pool_stats, set_pool_size, set_rate_limit  # noqa: F401
 from subwinder.exceptions import SubHashError
 from subwinder.types import AnyPath
 
@@ -16,6 +20,62 @@ def extract(b: AnyStr) -> bytes:
     return gzip.decompress(compressed)
 
 
+# Tells `zlib` to expect a gzip header and trailer
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def extract_to(b: AnyStr, file: BinaryIO, chunk_size: int = 64 * 1024) -> int:
+    """
+    Same as `extract`, but streams the extracted `bytes` to the writable `file` in
+    chunks instead of building up the whole result in memory. Returns the number of
+    bytes written.
+    """
+    written = 0
+    for extracted in _gunzip_chunks(_b64decode_chunks(b, chunk_size)):
+        file.write(extracted)
+        written += len(extracted)
+
+    return written
+
+
+def _b64decode_chunks(b: AnyStr, chunk_size: int) -> Iterator[bytes]:
+    # Base64 decodes in groups of 4 characters, so carry over any leftovers (whitespace
+    # is ignored the same as `base64.b64decode`)
+    leftover = b""
+    for i in range(0, len(b), chunk_size):
+        chunk = b[i : i + chunk_size]
+        if isinstance(chunk, str):
+            chunk = chunk.encode("ascii")
+        chunk = leftover + chunk.translate(None, b" \t\r\n")
+
+        usable = len(chunk) - len(chunk) % 4
+        leftover = chunk[usable:]
+        if usable > 0:
+            yield binascii.a2b_base64(chunk[:usable])
+
+    if leftover:
+        raise binascii.Error("Incorrect padding")
+
+
+def _gunzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    decompressor = zlib.decompressobj(_GZIP_WBITS)
+    for chunk in chunks:
+        while chunk:
+            # Start on the next member if there's more than one gzip member
+            if decompressor.eof:
+                decompressor = zlib.decompressobj(_GZIP_WBITS)
+
+            yield decompressor.decompress(chunk)
+            chunk = decompressor.unused_data
+
+    yield decompressor.flush()
+
+    if not decompressor.eof:
+        raise EOFError(
+            "Compressed file ended before the end-of-stream marker was reached"
+        )
+
+
 # As per API spec with some tweaks to make it a bit nicer
 # https://trac.opensubtitles.org/projects/opensubtitles/wiki/HashSourceCodes
 def special_hash(filepath: AnyPath) -> str:
@@ -44,6 +104,11 @@ def special_hash(filepath: AnyPath) -> str:
     return hasher.hexdigest()
 
 
+def _sum_words(values: bytes, num_words: int) -> int:
+    # Unpack all the words in one go instead of looping over each one in python
+    return sum(struct.unpack_from(f"<{num_words}Q", values))
+
+
 class _SumHasher:
     def __init__(self, filesize: int) -> None:
         self.hash = filesize
@@ -51,9 +116,15 @@ class _SumHasher:
         self.block_size = 8
 
     def update(self, values: bytes) -> None:
-        for i in range(0, len(values), self.block_size):
-            chunk = values[i : i + self.block_size]
-            self.hash += int.from_bytes(chunk, byteorder="little")
+        # Treat `values` as an array of little-endian unsigned 8 byte ints with any
+        # trailing partial block being its own int
+        num_words, remainder = divmod(len(values), self.block_size)
+
+        if num_words > 0:
+            self.hash += _sum_words(values, num_words)
+        if remainder > 0:
+            tail = values[num_words * self.block_size :]
+            self.hash += int.from_bytes(tail, byteorder="little")
 
     def hexdigest(self) -> str:
         # Keep output in `self.digest_size`
@@ -9,6 +9,7 @@ from datetime import datetime as dt
 
 import pytest
 
+import subwinder._request
 from subwinder._constants import Env
 from subwinder.lang import _converter
 
@@ -66,6 +67,17 @@ def _fake_langs():
     _converter.set(*stored)
 
 
+# Requests are all mocked out so there's no need to wait on the rate limiter
+@pytest.fixture(autouse=True)
+def _no_rate_limit():
+    stored = subwinder._request._rate_limiter
+    subwinder._request._rate_limiter = None
+
+    yield
+
+    subwinder._request._rate_limiter = stored
+
+
 # Negates `_fake_langs` which by default fakes the language listing
 @pytest.fixture
 def no_fake_langs():
@@ -0,0 +1,26 @@
+import random
+
+import pytest
+
+from dev.bench_hash.bench_hash import LoopSumHasher, bench_hash
+from subwinder.utils import _SumHasher
+
+
+def test_matches_loop_hasher():
+    rng = random.Random(0)
+
+    # Include sizes that don't evenly divide into blocks to check the remainder
+    for size in [0, 1, 7, 8, 9, 4095, 64 * 1024]:
+        values = rng.getrandbits(size * 8).to_bytes(size, byteorder="little")
+        ideal = LoopSumHasher(size)
+        hasher = _SumHasher(size)
+        ideal.update(values)
+        hasher.update(values)
+
+        assert ideal.hexdigest() == hasher.hexdigest()
+
+
+@pytest.mark.slow
+def test_bench_hash():
+    results = bench_hash(runs=20)
+    assert results["current"] < results["loop"]
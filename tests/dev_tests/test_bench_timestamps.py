@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import pytest
+
+from dev.bench_timestamps.bench_timestamps import _timestamps, bench_timestamps
+from subwinder._constants import TIME_FORMAT
+from subwinder._internal_utils import parse_timestamp
+
+
+def test_matches_strptime():
+    for stamp in _timestamps(100):
+        assert parse_timestamp(stamp) == datetime.strptime(stamp, TIME_FORMAT)
+
+    # Anything that isn't fixed-width falls back to `strptime`
+    assert parse_timestamp("2011-1-8 7:36:01") == datetime(2011, 1, 8, 7, 36, 1)
+    for bad in ["2011-13-08 07:36:01", "2011-10-08T07:36:01", "2011-10-08", ""]:
+        with pytest.raises(ValueError):
+            parse_timestamp(bad)
+
+
+@pytest.mark.slow
+def test_bench_timestamps():
+    results = bench_timestamps(runs=5, unique=200)
+    assert results["uncached"] < results["strptime"]
+    assert results["cached"] < results["strptime"]
@@ -64,7 +64,6 @@ def test_interactive(mock_request, tmp_path):
             [{"sublanguageid": "eng", "imdbid": "4158110", "season": 1, "episode": 2}],
         ),
         call(Endpoint.PREVIEW_SUBTITLES, TOKEN, [SUB_ID]),
-        call(Endpoint.SERVER_INFO, TOKEN),
         call(Endpoint.DOWNLOAD_SUBTITLES, TOKEN, [SUB_ID]),
         call(Endpoint.LOG_OUT, TOKEN),
     ]
@@ -143,7 +142,6 @@ def test_adv_quickstart(mock_request, tmp_path: Path):
         call(Endpoint.LOG_IN, None, USERNAME, PASSWORD_HASH, "en", USERAGENT),
         *search_calls,
         call(Endpoint.SERVER_INFO, "<token>"),
-        call(Endpoint.SERVER_INFO, "<token>"),
         call(
             Endpoint.DOWNLOAD_SUBTITLES,
             "<token>",
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from xmlrpc.client import dumps, loads
+
+import pytest
+
+from subwinder import AsyncAuthSubwinder, AsyncSubwinder
+from subwinder._async_request import AsyncTransport, request
+from subwinder._constants import DEV_USERAGENT
+from subwinder._request import Endpoint
+from subwinder.cache import MemorySearchCache, TokenStore
+from subwinder.exceptions import SubAuthError, SubDownloadError, SubLibError
+from subwinder.info import Movie, TvSeries
+from tests.constants import (
+    DOWNLOAD_INFO,
+    MEDIA1,
+    SEARCH_RESULT1,
+    SEARCH_RESULT2,
+    SUBWINDER_RESPONSES,
+)
+
+
+def _fake_request(responses):
+    """
+    Builds a stand-in for `subwinder._async_request.request` that returns each of
+    `responses` in turn and records the calls made.
+    """
+    calls = []
+    responses = iter(responses)
+
+    async def fake(transport, endpoint, token, *params):
+        calls.append((endpoint, token, *params))
+        # Let any other calls get started to make sure they really are concurrent
+        await asyncio.sleep(0)
+        return next(responses)
+
+    return fake, calls
+
+
+def test_server_info():
+    with (SUBWINDER_RESPONSES / "server_info.json").open() as f:
+        RESP = json.load(f)
+
+    async def run():
+        async with AsyncSubwinder() as sw:
+            return await sw.daily_download_info()
+
+    fake, calls = _fake_request([RESP])
+    with patch("subwinder._async_request.request", fake):
+        assert asyncio.run(run()) == DOWNLOAD_INFO
+
+    assert calls == [(Endpoint.SERVER_INFO, None)]
+
+
+def test_login_logout():
+    LOG_IN_RESP = {"status": "200 OK", "token": "<token>"}
+    OK_RESP = {"status": "200 OK"}
+    CALLS = [
+        (Endpoint.LOG_IN, None, "<username>", "<hash>", "en", DEV_USERAGENT),
+        (Endpoint.NO_OPERATION, "<token>"),
+        (Endpoint.LOG_OUT, "<token>"),
+    ]
+
+    async def run():
+        async with AsyncAuthSubwinder("<username>", password_hash="<hash>") as asw:
+            assert asw.limited_search_size
+            await asw.ping()
+
+        return asw
+
+    fake, calls = _fake_request([LOG_IN_RESP, OK_RESP, OK_RESP])
+    with patch("subwinder._async_request.request", fake):
+        asw = asyncio.run(run())
+
+    assert calls == CALLS
+    assert asw._token is None
+
+
+def test_token_store(tmp_path):
+    OK_RESP = {"status": "200 OK"}
+    tokens = iter(["<token1>", "<token2>"])
+
+    def login_request(endpoint, token, *params):
+        assert endpoint == Endpoint.LOG_IN
+        return {"status": "200 OK", "token": next(tokens)}
+
+    async def fake(transport, endpoint, token, *params):
+        calls.append((endpoint, token))
+        await asyncio.sleep(0)
+        if token == "<token1>":
+            raise SubAuthError("401 Unauthorized")
+        return OK_RESP
+
+    async def run(store):
+        async with AsyncAuthSubwinder(
+            "<username>", password_hash="<hash>", token_store=store
+        ) as asw:
+            async with AsyncAuthSubwinder(
+                "<username>", password_hash="<hash>", token_store=store
+            ) as other:
+                # Both share the session and replace it together once it expires
+                assert asw._token == other._token == "<token1>"
+                await asyncio.gather(asw.ping(), asw.ping(), other.ping())
+                assert asw._token == other._token == "<token2>"
+
+            # `other` wasn't the last holder so it didn't log out
+            assert (Endpoint.LOG_OUT, "<token2>") not in calls
+
+    calls = []
+    with TokenStore(tmp_path / "tokens.sqlite") as store, patch(
+        "subwinder._request.request", login_request
+    ), patch("subwinder._async_request.request", fake):
+        asyncio.run(run(store))
+
+    # Only one new login for everything and the last holder logged out
+    assert next(tokens, None) is None
+    assert calls.count((Endpoint.NO_OPERATION, "<token2>")) == 3
+    assert calls[-1] == (Endpoint.LOG_OUT, "<token2>")
+
+
+def _dummy_async_auth_subwinder():
+    dummy = AsyncAuthSubwinder("<username>", password_hash="<hash>", useragent="<ua>")
+    dummy._token = "<token>"
+
+    return dummy
+
+
+def test_guess_media():
+    QUERIES = [
+        "heross01e08.avi",
+        "Insurgent.2015.READNFO.CAM.AAC.x264-LEGi0N",
+        "Night Watch",
+        "Aliens 1080p BluRay AC3 x264-ETRG.mkv",
+    ]
+    # Batches are still split, but they're all sent at once
+    CALLS = [
+        (Endpoint.GUESS_MOVIE_FROM_STRING, "<token>", QUERIES[:3]),
+        (Endpoint.GUESS_MOVIE_FROM_STRING, "<token>", QUERIES[3:]),
+    ]
+    IDEAL_RESULT = [
+        TvSeries("Heroes", 2006, "0813715", None, None),
+        Movie("Insurgent", 2015, "2908446", None, None),
+        Movie("Nochnoy dozor", 2004, "0403358", None, None),
+        Movie("Aliens", 1986, "0090605", None, None),
+    ]
+    with (SUBWINDER_RESPONSES / "guess_media.json").open() as f:
+        RESP = json.load(f)
+
+    fake, calls = _fake_request(RESP)
+    with patch("subwinder._async_request.request", fake):
+        guesses = asyncio.run(_dummy_async_auth_subwinder().guess_media(QUERIES))
+
+    assert guesses == IDEAL_RESULT
+    assert calls == CALLS
+
+
+def test_search_subtitles_unranked():
+    QUERIES = [(MEDIA1, "en")]
+    CALLS = [
+        (
+            Endpoint.SEARCH_SUBTITLES,
+            "<token>",
+            [
+                {
+                    "sublanguageid": "eng",
+                    "moviehash": "18379ac9af039390",
+                    "moviebytesize": "366876694",
+                },
+            ],
+        )
+    ]
+    with (SUBWINDER_RESPONSES / "search_subtitles.json").open() as f:
+        RESP = json.load(f)
+
+    asw = _dummy_async_auth_subwinder()
+    fake, calls = _fake_request([RESP])
+    with patch("subwinder._async_request.request", fake):
+        results = asyncio.run(asw.search_subtitles_unranked(QUERIES))
+
+    assert results == [[SEARCH_RESULT2]]
+    assert calls == CALLS
+
+
+def test_search_subtitles_unranked_cache():
+    with (SUBWINDER_RESPONSES / "search_subtitles.json").open() as f:
+        RESP = json.load(f)
+
+    class ThreadCache(MemorySearchCache):
+        def __init__(self):
+            super().__init__()
+            self.threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return super().get(key)
+
+        def set(self, key, results):
+            self.threads.add(threading.get_ident())
+            super().set(key, results)
+
+    asw = _dummy_async_auth_subwinder()
+    asw.search_cache = ThreadCache()
+    fake, calls = _fake_request([RESP])
+    with patch("subwinder._async_request.request", fake):
+        first = asyncio.run(asw.search_subtitles_unranked([(MEDIA1, "en")]))
+        second = asyncio.run(asw.search_subtitles_unranked([(MEDIA1, "en")]))
+
+    # The second search is answered from the cache which is never touched from the
+    # event loop's thread
+    assert first == second == [[SEARCH_RESULT2]]
+    assert len(calls) == 1
+    assert asw.search_cache.threads
+    assert threading.get_ident() not in asw.search_cache.threads
+
+
+def test_download_subtitles():
+    with (SUBWINDER_RESPONSES / "download_subtitles.json").open() as f:
+        RESP = json.load(f)
+    IDEAL_CONTENTS = (
+        "Hello there, I'm that good ole compressed and encoded subtitle information"
+        " that you so dearly want to save"
+    )
+
+    async def daily_download_info():
+        return DOWNLOAD_INFO
+
+    asw = _dummy_async_auth_subwinder()
+    with TemporaryDirectory() as temp_dir:
+        fake, calls = _fake_request([RESP])
+        with patch.object(asw, "daily_download_info", daily_download_info), patch(
+            "subwinder._async_request.request", fake
+        ):
+            paths = asyncio.run(
+                asw.download_subtitles([SEARCH_RESULT1.subtitles], temp_dir)
+            )
+
+        assert calls == [
+            (Endpoint.DOWNLOAD_SUBTITLES, "<token>", [SEARCH_RESULT1.subtitles.file_id])
+        ]
+        assert paths == [Path(temp_dir) / SEARCH_RESULT1.subtitles.filename]
+        assert paths[0].read_text() == IDEAL_CONTENTS
+        # The remaining downloads are tracked locally after that
+        assert asw.daily_remaining == DOWNLOAD_INFO.remaining - 1
+
+    # Not enough downloads left fails before downloading anything
+    downloads = [SEARCH_RESULT1.subtitles] * (DOWNLOAD_INFO.remaining + 1)
+    fake, calls = _fake_request([])
+    with patch.object(asw, "daily_download_info", daily_download_info), patch(
+        "subwinder._async_request.request", fake
+    ):
+        with pytest.raises(SubDownloadError):
+            asyncio.run(asw.download_subtitles(downloads, "unused"))
+
+    assert calls == []
+
+
+class _XmlRpcServer:
+    """
+    Tiny keep-alive HTTP/1.1 server that responds to every XMLRPC call with the next
+    of `responses` where each is either a value to return or an HTTP status code.
+    """
+
+    def __init__(self, responses):
+        self.responses = iter(responses)
+        self.connections = 0
+        self.methods = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            headers = {}
+            request_line = await reader.readline()
+            if not request_line:
+                break
+
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.lower()] = value.strip()
+
+            body = await reader.readexactly(int(headers["content-length"]))
+            _, method = loads(body)
+            self.methods.append(method)
+
+            resp = next(self.responses)
+            if isinstance(resp, int):
+                writer.write(
+                    f"HTTP/1.1 {resp} Nope\r\nContent-Length: 0\r\n\r\n".encode()
+                )
+            else:
+                # Send the body chunked to cover both ways of delimiting it
+                payload = dumps((resp,), methodresponse=True).encode()
+                half = len(payload) // 2
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                    + b"%x\r\n%s\r\n" % (half, payload[:half])
+                    + b"%x\r\n%s\r\n" % (len(payload) - half, payload[half:])
+                    + b"0\r\n\r\n"
+                )
+            await writer.drain()
+
+        writer.close()
+
+
+def test_async_transport():
+    OK_RESP = {"status": "200 OK", "data": "<data>"}
+
+    async def run(server):
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        transport = AsyncTransport(f"http://127.0.0.1:{port}/xml-rpc", 2)
+
+        try:
+            # Many calls at once only ever use up to `max_connections` connections
+            results = await asyncio.gather(
+                *(
+                    request(transport, Endpoint.NO_OPERATION, "<token>")
+                    for _ in range(6)
+                )
+            )
+            assert results == [OK_RESP] * 6
+            assert server.connections <= 2
+
+            # And later calls reuse the idle connections
+            await request(transport, Endpoint.SERVER_INFO, None)
+            assert server.connections <= 2
+            stats = transport.stats()
+            assert stats.hits >= 5
+            assert stats.in_use == 0
+
+            # Protocol errors are handled the same as the sync client
+            with pytest.raises(SubLibError):
+                await request(transport, Endpoint.NO_OPERATION, "<token>")
+        finally:
+            await transport.close()
+            listener.close()
+            await listener.wait_closed()
+
+    server = _XmlRpcServer([OK_RESP] * 7 + [400])
+    asyncio.run(run(server))
+
+    assert server.methods[-1] == "NoOperation"
@@ -0,0 +1,252 @@
+import gzip
+import os
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+
+from subwinder import MediaFile
+from subwinder.cache import (
+    CacheStats,
+    DiskSearchCache,
+    DownloadLedger,
+    HashCache,
+    MemorySearchCache,
+    SubtitleStore,
+    TokenStore,
+)
+from subwinder.exceptions import SubHashError
+from tests.utils import RandomTempFile
+
+
+def test_HashCache(tmp_path):
+    CACHE_PATH = tmp_path / "hashes.sqlite"
+
+    with RandomTempFile(128 * 1024, seed=1) as rand_file:
+        with HashCache(CACHE_PATH) as cache:
+            # First time through has to hash the file
+            assert cache.hash_file(rand_file) == ("25182dd38c3b3793", 128 * 1024)
+
+            # But after that it's just a lookup
+            with patch("subwinder.cache.special_hash") as mocked:
+                media = MediaFile(rand_file, cache)
+                mocked.assert_not_called()
+
+            assert media == MediaFile(rand_file)
+            assert cache.stats() == CacheStats(hits=1, misses=1, evictions=0, entries=1)
+
+        # Entries persist across instances
+        with HashCache(CACHE_PATH) as cache:
+            assert cache.stats().entries == 1
+
+            # Changing the file invalidates the entry
+            stat = rand_file.stat()
+            os.utime(rand_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            cache.hash_file(rand_file)
+            assert cache.stats() == CacheStats(hits=0, misses=1, evictions=0, entries=2)
+
+            cache.clear()
+            assert cache.stats().entries == 0
+
+
+def test_HashCache_eviction(tmp_path):
+    SIZES = [128 * 1024, 128 * 1024 + 1, 128 * 1024 + 2]
+
+    with HashCache(tmp_path / "hashes.sqlite", max_entries=2) as cache:
+        with RandomTempFile(SIZES[0], seed=0) as file1:
+            with RandomTempFile(SIZES[1], seed=1) as file2:
+                with RandomTempFile(SIZES[2], seed=2) as file3:
+                    cache.hash_file(file1)
+                    cache.hash_file(file2)
+                    # Use `file1` so that `file2` is the least recently used
+                    cache.hash_file(file1)
+                    cache.hash_file(file3)
+                    assert cache.stats().evictions == 1
+
+                    cache.hash_file(file1)
+                    cache.hash_file(file2)
+
+    assert cache.stats() == CacheStats(hits=2, misses=4, evictions=2, entries=2)
+
+    with pytest.raises(ValueError):
+        HashCache(tmp_path / "other.sqlite", max_entries=0)
+
+
+def test_HashCache_shared(tmp_path):
+    CACHE_PATH = tmp_path / "hashes.sqlite"
+    SIZES = [128 * 1024, 128 * 1024 + 1, 128 * 1024 + 2]
+
+    with ExitStack() as stack:
+        file1, file2, file3 = [
+            stack.enter_context(RandomTempFile(size, seed=i))
+            for i, size in enumerate(SIZES)
+        ]
+        cache1 = stack.enter_context(HashCache(CACHE_PATH, max_entries=2))
+        cache2 = stack.enter_context(HashCache(CACHE_PATH, max_entries=2))
+
+        cache1.hash_file(file1)
+        cache2.hash_file(file2)
+
+        # Hits don't write anything until a whole batch has built up
+        changes = cache1._db.total_changes
+        cache1.hash_file(file1)
+        assert cache1._db.total_changes == changes
+
+        # The entries added by the other instance are counted when evicting
+        cache2.hash_file(file3)
+        assert cache2.stats() == CacheStats(hits=0, misses=2, evictions=1, entries=2)
+
+
+def test_HashCache_from_paths(tmp_path):
+    with HashCache(tmp_path / "hashes.sqlite") as cache:
+        with RandomTempFile(128 * 1024, seed=1) as rand_file:
+            with RandomTempFile(128 * 1024 - 1) as small_file:
+                files = [rand_file, small_file]
+                for _ in range(2):
+                    results = dict(MediaFile.from_paths(files, hash_cache=cache))
+                    assert results[rand_file].hash == "25182dd38c3b3793"
+                    assert isinstance(results[small_file], SubHashError)
+
+        # Files that fail to hash are never stored
+        assert cache.stats() == CacheStats(hits=1, misses=3, evictions=0, entries=1)
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_SearchCache(tmp_path, backend):
+    RESULTS = [{"IDSubtitleFile": "1", "Score": 1.5}]
+
+    def build(**kwargs):
+        if backend == "memory":
+            return MemorySearchCache(**kwargs)
+        return DiskSearchCache(tmp_path / "searches.sqlite", **kwargs)
+
+    with patch("subwinder.cache.time.time", return_value=1000.0) as mocked_time:
+        cache = build(max_entries=2, ttl=100, negative_ttl=10)
+        assert cache.get("found") is None
+        cache.set("found", RESULTS)
+        cache.set("empty", [])
+        assert cache.get("found") == RESULTS
+        assert cache.get("empty") == []
+
+        # Empty results expire sooner than the rest
+        mocked_time.return_value = 1050.0
+        assert cache.get("empty") is None
+        assert cache.get("found") == RESULTS
+
+        # Past the max entries the least recently used is evicted
+        cache.set("a", [])
+        cache.set("b", [])
+        assert cache.get("found") is None
+
+        mocked_time.return_value = 1101.0
+        assert cache.stats() == CacheStats(hits=3, misses=3, evictions=1, entries=2)
+
+        cache.clear()
+        assert cache.stats().entries == 0
+
+    with pytest.raises(ValueError):
+        build(ttl=-1)
+
+
+def test_DiskSearchCache_persists(tmp_path):
+    CACHE_PATH = tmp_path / "searches.sqlite"
+
+    with DiskSearchCache(CACHE_PATH) as cache:
+        cache.set("key", [{"IDSubtitleFile": "1"}])
+
+    with DiskSearchCache(CACHE_PATH) as cache:
+        assert cache.get("key") == [{"IDSubtitleFile": "1"}]
+
+    # Stale entries are dropped when opened
+    with patch("subwinder.cache.time.time", return_value=2**40):
+        with DiskSearchCache(CACHE_PATH) as cache:
+            assert cache.stats().entries == 0
+
+
+def test_DownloadLedger(tmp_path, monkeypatch):
+    path = tmp_path / "ledger.sqlite"
+    with DownloadLedger(path) as ledger:
+        assert ledger.get(tmp_path / "a.srt") is None
+        ledger.record([(tmp_path / "a.srt", "1"), (tmp_path / "b.srt", "2")])
+        # Newer downloads replace older ones
+        ledger.record([(tmp_path / "a.srt", "3")])
+
+    # Entries are kept between runs and relative paths match too
+    monkeypatch.chdir(tmp_path)
+    with DownloadLedger(path) as ledger:
+        assert ledger.get("a.srt") == "3"
+        assert ledger.get(tmp_path / "b.srt") == "2"
+
+        ledger.clear()
+        assert ledger.get("a.srt") is None
+
+
+def test_SubtitleStore(tmp_path):
+    FIRST = gzip.compress(b"first subtitles")
+    SECOND = gzip.compress(b"second subtitles")
+    a, b, c = tmp_path / "a.srt", tmp_path / "dir" / "b.srt", tmp_path / "c.srt"
+
+    with SubtitleStore(tmp_path / "store", hardlink=True) as store:
+        assert not store.materialize("1", [a])
+        assert not a.exists()
+
+        store.put("1", [FIRST])
+        assert store.materialize("1", [a, b])
+        assert a.read_bytes() == b.read_bytes() == b"first subtitles"
+        assert os.path.samefile(a, b)
+
+    # Entries are kept between runs and least recently used ones get evicted
+    with SubtitleStore(tmp_path / "store", max_bytes=len(SECOND)) as store:
+        assert store.materialize("1", [c])
+        assert c.read_bytes() == b"first subtitles"
+        assert not os.path.samefile(a, c)
+
+        store.put("2", iter([SECOND[:4], SECOND[4:]]))
+        assert not store.materialize("1", [a])
+        assert store.materialize("2", [a])
+        assert a.read_bytes() == b"second subtitles"
+        # Linked files aren't changed when one gets replaced
+        assert b.read_bytes() == b"first subtitles"
+        assert store.stats() == CacheStats(hits=2, misses=1, evictions=1, entries=1)
+
+        store.clear()
+        assert not store.materialize("2", [a])
+        assert list((tmp_path / "store").glob("*.gz")) == []
+
+
+def test_TokenStore(tmp_path):
+    path = tmp_path / "tokens.sqlite"
+    tokens = iter(["<token1>", "<token2>", "<token3>"])
+    validated = []
+
+    def login():
+        return next(tokens)
+
+    def validate(token):
+        validated.append(token)
+        return token != "<token1>"
+
+    with TokenStore(path) as store:
+        # Sessions that were just used are shared without validating them
+        assert store.acquire("key", login, validate) == "<token1>"
+        assert store.acquire("key", login, validate) == "<token1>"
+        assert validated == []
+        assert not store.release("key", "<token1>")
+
+        # Anything else has to be validated, which fails here so there's a new login
+        with TokenStore(path, revalidate_after=0) as other:
+            assert other.acquire("key", login, validate) == "<token2>"
+        assert validated == ["<token1>"]
+
+        # Replacing a token that was already replaced reuses the newer one
+        assert store.replace("key", "<token1>", login) == "<token2>"
+        assert store.replace("key", "<token2>", login) == "<token3>"
+
+        # Only the last holder of the current token should log out
+        assert not store.release("key", "<token2>")
+        assert store.release("key", "<token3>")
+        assert not store.release("key", "<token3>")
+
+        store.acquire("key", lambda: "<token4>", validate)
+        store.clear()
+        assert store.acquire("key", lambda: "<token5>", validate) == "<token5>"
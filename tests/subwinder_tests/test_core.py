@@ -1,3 +1,4 @@
+import copy
 import json
 from datetime import datetime
 from pathlib import Path
@@ -7,11 +8,18 @@ from unittest.mock import call, patch
 
 import pytest
 
-from subwinder import AuthSubwinder, Subwinder
+from subwinder import AuthSubwinder, MediaFile, Subwinder
 from subwinder._request import Endpoint
-from subwinder.exceptions import SubDownloadError
+from subwinder.cache import DownloadLedger, MemorySearchCache, SubtitleStore, TokenStore
+from subwinder.core import (
+    DownloadStats,
+    SearchStats,
+    _build_search_query,
+    _PreparedQuery,
+)
+from subwinder.exceptions import SubAuthError, SubDownloadError
 from subwinder.info import Comment, Movie, TvSeries, User
-from subwinder.names import NameFormatter
+from subwinder.names import BaseNameFormatter, NameFormatter
 from tests.constants import (
     DOWNLOAD_INFO,
     EPISODE_INFO1,
@@ -104,6 +112,84 @@ def test__logout():
     _standard_asw_mock("_logout", "_request", QUERIES, RESP, CALL, None)
 
 
+def test_token_store(tmp_path):
+    tokens = iter(["<token1>", "<token2>", "<token3>"])
+    expired = set()
+    calls = []
+
+    def fake_request(endpoint, token, *params):
+        calls.append((endpoint, token))
+        if endpoint == Endpoint.LOG_IN:
+            return {"status": "200 OK", "token": next(tokens)}
+        if token in expired:
+            raise SubAuthError("401 Unauthorized")
+        return {"status": "200 OK"}
+
+    with TokenStore(tmp_path / "tokens.sqlite") as store, patch(
+        "subwinder._request.request", fake_request
+    ):
+        # The second client reuses the first one's session
+        asw1 = AuthSubwinder(
+            "<username>", "<password>", useragent="<ua>", token_store=store
+        )
+        asw2 = AuthSubwinder(
+            "<username>", "<password>", useragent="<ua>", token_store=store
+        )
+        assert asw1._token == asw2._token == "<token1>"
+        assert [endpoint for endpoint, _ in calls] == [Endpoint.LOG_IN]
+
+        # An expired session is replaced once and then shared again
+        expired.add("<token1>")
+        asw2.ping()
+        asw1.ping()
+        assert asw1._token == asw2._token == "<token2>"
+        assert calls[1:] == [
+            (Endpoint.NO_OPERATION, "<token1>"),
+            (Endpoint.LOG_IN, "<token1>"),
+            (Endpoint.NO_OPERATION, "<token2>"),
+            (Endpoint.NO_OPERATION, "<token1>"),
+            (Endpoint.NO_OPERATION, "<token2>"),
+        ]
+
+        def fake_multicall(multi_calls):
+            resps = []
+            for endpoint, token, params in multi_calls:
+                try:
+                    resps.append(fake_request(endpoint, token, *params))
+                except SubAuthError as err:
+                    resps.append(err)
+            return resps
+
+        # Queued calls use the session at flush time and get retried with the new
+        # session if it was replaced by another client
+        with patch("subwinder._request.multicall", fake_multicall):
+            with asw1.multicall() as mc:
+                ping = mc.ping()
+                expired.add("<token2>")
+                asw2.ping()
+        ping.result()
+        assert asw1._token == asw2._token == "<token3>"
+        assert calls[-2:] == [
+            (Endpoint.NO_OPERATION, "<token2>"),
+            (Endpoint.NO_OPERATION, "<token3>"),
+        ]
+
+        # Only the last client out logs out
+        del calls[:]
+        with asw1:
+            pass
+        with asw2:
+            pass
+        assert calls == [(Endpoint.LOG_OUT, "<token3>")]
+
+    # Without a store nothing is retried
+    asw = _dummy_auth_subwinder()
+    asw._token = "<token1>"
+    with patch("subwinder._request.request", fake_request):
+        with pytest.raises(SubAuthError):
+            asw.ping()
+
+
 def test_add_comment():
     QUERIES = (SEARCH_RESULT1, "bad comment", True)
     RESP = {"status": "200 OK", "seconds": "0.228"}
@@ -128,12 +214,12 @@ def test_download_subtitles():
     dirname = cast(Path, dirname)
     BARE_PATH = dirname / SEARCH_RESULT1.subtitles.filename
     BARE_QUERIES = [[SEARCH_RESULT1]]
-    BARE_CALL = ([SEARCH_RESULT1.subtitles], [BARE_PATH])
+    BARE_CALL = ([SEARCH_RESULT1.subtitles], [BARE_PATH], None, None)
     BARE_IDEAL = [BARE_PATH]
 
     FULL_PATH = Path("test dir") / "test file"
     FULL_QUERIES = [[SEARCH_RESULT1.subtitles], "test dir", NameFormatter("test file")]
-    FULL_CALL = ([SEARCH_RESULT1.subtitles], [FULL_PATH])
+    FULL_CALL = ([SEARCH_RESULT1.subtitles], [FULL_PATH], None, None)
     FULL_IDEAL = [FULL_PATH]
     RESP = None
 
@@ -169,6 +255,112 @@ def test_download_subtitles():
     BARE_QUERIES[0][0].media.set_filename(temp_filename)
 
 
+def test_download_subtitles_skip_existing(tmp_path):
+    SUBTITLES = SEARCH_RESULT1.subtitles
+    OTHER = SEARCH_RESULT2.subtitles
+    FORMATTER = NameFormatter("{upload_name}.{lang_2}")
+    EXISTING = tmp_path / f"{SUBTITLES.filename.stem}.{SUBTITLES.lang_2}"
+    MISSING = tmp_path / f"{OTHER.filename.stem}.{OTHER.lang_2}"
+    EXISTING.write_text("already downloaded")
+
+    asw = _dummy_auth_subwinder()
+    with patch.object(
+        asw, "daily_download_info", return_value=DOWNLOAD_INFO
+    ), patch.object(asw, "_download_subtitles", return_value=None) as mocked:
+        # Only the missing file is downloaded, but all the paths are still returned
+        result = asw.download_subtitles(
+            [SUBTITLES, OTHER], tmp_path, FORMATTER, skip_existing=True
+        )
+        assert result == [EXISTING, MISSING]
+        mocked.assert_called_once_with([OTHER], [MISSING], None, None)
+        assert asw.download_stats() == DownloadStats(
+            downloaded=1, skipped=1, from_store=0
+        )
+
+        # Nothing to download means the daily downloads aren't even checked
+        mocked.reset_mock()
+        MISSING.write_text("already downloaded")
+        paths = asw.iter_download_subtitles(
+            iter([SUBTITLES, OTHER]), tmp_path, FORMATTER, skip_existing=True
+        )
+        assert list(paths) == [EXISTING, MISSING]
+        mocked.assert_not_called()
+        asw.daily_download_info.assert_called_once()
+        assert asw.download_stats() == DownloadStats(
+            downloaded=1, skipped=3, from_store=0
+        )
+
+    # With a ledger the existing files also have to be from the same subtitles
+    with DownloadLedger(tmp_path / "ledger.sqlite") as ledger:
+        ledger.record([(EXISTING, SUBTITLES.file_id), (MISSING, "<other-file-id>")])
+
+        with patch.object(asw, "daily_download_info", return_value=DOWNLOAD_INFO):
+            with patch.object(asw, "_download_subtitles", return_value=None) as mocked:
+                asw.download_subtitles(
+                    [SUBTITLES, OTHER],
+                    tmp_path,
+                    FORMATTER,
+                    skip_existing=True,
+                    ledger=ledger,
+                )
+
+        mocked.assert_called_once_with([OTHER], [MISSING], ledger, None)
+
+
+def test_download_subtitles_store(tmp_path):
+    SUBTITLES = SEARCH_RESULT1.subtitles
+    OTHER = SEARCH_RESULT2.subtitles
+    FIRST = tmp_path / "first.txt"
+    SECOND = tmp_path / "second.txt"
+    THIRD = tmp_path / "third.txt"
+    with (SUBWINDER_RESPONSES / "download_subtitles.json").open() as f:
+        RESP = json.load(f)
+
+    # Hands out the next path from `paths` for each download
+    class PathFormatter(BaseNameFormatter):
+        def __init__(self, paths):
+            self.paths = iter(paths)
+
+        def generate(self, *_):
+            return next(self.paths)
+
+    asw = _dummy_auth_subwinder()
+    with SubtitleStore(tmp_path / "store") as store, patch.object(
+        asw, "daily_download_info", return_value=DOWNLOAD_INFO
+    ), patch.object(asw, "_request", return_value=RESP) as mocked:
+        # Repeated subtitles are only downloaded once and copied to the other paths
+        asw._download_subtitles([SUBTITLES], [FIRST], None, store)
+        formatter = PathFormatter([FIRST, SECOND])
+        asw.download_subtitles([OTHER, OTHER], tmp_path, formatter, store=store)
+        mocked.assert_called_with(Endpoint.DOWNLOAD_SUBTITLES, [OTHER.file_id])
+        assert SECOND.read_bytes() == FIRST.read_bytes()
+        assert asw.download_stats() == DownloadStats(
+            downloaded=1, skipped=0, from_store=1
+        )
+
+        # Anything already in the store isn't downloaded at all
+        mocked.reset_mock()
+        formatter = PathFormatter([THIRD])
+        asw.download_subtitles([SUBTITLES], tmp_path, formatter, store=store)
+        mocked.assert_not_called()
+        assert THIRD.read_bytes() == FIRST.read_bytes()
+        assert asw.download_stats() == DownloadStats(
+            downloaded=1, skipped=0, from_store=2
+        )
+
+        # Nothing is filled in from the store if there aren't enough downloads left
+        uncached = copy.copy(OTHER)
+        uncached.file_id = "<uncached-file-id>"
+        FOURTH = tmp_path / "fourth.txt"
+        asw._sync_quota(0)
+        with pytest.raises(SubDownloadError):
+            formatter = PathFormatter([FOURTH, tmp_path / "fifth.txt"])
+            asw.download_subtitles(
+                [SUBTITLES, uncached], tmp_path, formatter, store=store
+            )
+        assert not FOURTH.exists()
+
+
 # TODO: combine the logic up above with down here
 def test__download_subtitles():
     asw = _dummy_auth_subwinder()
@@ -184,7 +376,9 @@ def test__download_subtitles():
         sub_path = Path(temp_dir) / "test download.txt"
 
         with patch.object(asw, "_request", return_value=RESP) as mocked:
-            asw._download_subtitles([SEARCH_RESULT1.subtitles], [sub_path])
+            with DownloadLedger(Path(temp_dir) / "ledger.sqlite") as ledger:
+                asw._download_subtitles([SEARCH_RESULT1.subtitles], [sub_path], ledger)
+                assert ledger.get(sub_path) == SEARCH_RESULT1.subtitles.file_id
 
         mocked.assert_called_with(
             Endpoint.DOWNLOAD_SUBTITLES, [SEARCH_RESULT1.subtitles.file_id]
@@ -195,6 +389,41 @@ def test__download_subtitles():
             assert f.read() == IDEAL_CONTENTS
 
 
+def test_daily_remaining():
+    asw = _dummy_auth_subwinder()
+    SUBTITLES = SEARCH_RESULT1.subtitles
+
+    with patch.object(
+        asw, "daily_download_info", return_value=DOWNLOAD_INFO
+    ) as info, patch.object(asw, "_download_subtitles") as mocked:
+        # Synced once and then tracked locally through downloads
+        assert asw.daily_remaining == DOWNLOAD_INFO.remaining
+        asw.download_subtitles([SUBTITLES] * 3, "dir")
+        assert asw.daily_remaining == DOWNLOAD_INFO.remaining - 3
+        info.assert_called_once()
+
+        # A failed download means syncing again
+        mocked.side_effect = SubDownloadError("407 Download limit reached")
+        with pytest.raises(SubDownloadError):
+            asw.download_subtitles([SUBTITLES], "dir")
+        assert asw.daily_remaining == DOWNLOAD_INFO.remaining
+        assert info.call_count == 2
+
+        # And so does going past the resync interval
+        asw.quota_resync_interval = 0
+        assert asw.daily_remaining == DOWNLOAD_INFO.remaining
+        assert info.call_count == 3
+
+    # Getting the `ServerInfo` syncs it too
+    with (SUBWINDER_RESPONSES / "server_info.json").open() as f:
+        RESP = json.load(f)
+    asw = _dummy_auth_subwinder()
+    with patch.object(asw, "_request", return_value=RESP) as mocked:
+        asw.server_info()
+        assert asw.daily_remaining == SERVER_INFO.daily_download_info.remaining
+        mocked.assert_called_once()
+
+
 def test_get_comments():
     # Build up the empty `SearchResult`s and add the `subtitles.id`
     queries = [[SEARCH_RESULT1, SEARCH_RESULT2]]
@@ -229,6 +458,40 @@ def test_get_comments():
     _standard_asw_mock("get_comments", "_request", queries, RESP, CALL, ideal_result)
 
 
+def test_get_comments_batched():
+    with (SUBWINDER_RESPONSES / "get_comments.json").open() as f:
+        RESP = json.load(f)
+    ID1 = SEARCH_RESULT1.subtitles.id
+    ID2 = SEARCH_RESULT2.subtitles.id
+    QUERIES = [SEARCH_RESULT1, SEARCH_RESULT2, SEARCH_RESULT1]
+
+    def fake_request(endpoint, ids):
+        # Batches can be sent in any order so respond based off of the ids
+        return {"data": {f"_{id}": RESP["data"][f"_{id}"] for id in ids}}
+
+    # Repeats are only requested once and each batch is its own request
+    asw = _dummy_auth_subwinder()
+    with patch.object(asw, "_request", side_effect=fake_request) as mocked:
+        comments = asw.get_comments(QUERIES, batch_size=1, parallelism=2)
+
+    assert sorted(mocked.call_args_list) == [
+        call(Endpoint.GET_COMMENTS, [ID1]),
+        call(Endpoint.GET_COMMENTS, [ID2]),
+    ]
+    assert [len(c) for c in comments] == [1, 2, 1]
+    assert comments[0] == comments[2]
+    assert comments[0] is not comments[2]
+
+    # The streaming version only merges repeats within a batch
+    with patch.object(asw, "_request", return_value=RESP) as mocked:
+        assert list(asw.iter_get_comments(iter(QUERIES), batch_size=3)) == comments
+
+    mocked.assert_called_once_with(Endpoint.GET_COMMENTS, [ID1, ID2])
+
+    with pytest.raises(ValueError):
+        asw.get_comments(QUERIES, batch_size=0)
+
+
 def test_guess_media():
     asw = _dummy_auth_subwinder()
 
@@ -294,7 +557,7 @@ def test_report_media():
 
 def test_search_subtitles():
     QUERIES = [[(MEDIA1, "en"), (MOVIE_INFO1, "fr"), (EPISODE_INFO1, "de")]]
-    CALL = [*QUERIES]
+    CALL = [[_PreparedQuery(query) for query in QUERIES[0]]]
     # Just testing that the correct amount of `SearchResult`s are returned
     RESP = [
         [SEARCH_RESULT2],
@@ -315,7 +578,7 @@ def test_search_subtitles():
 
 # XXX: combine this with the above
 def test__search_subtitles_unranked():
-    QUERIES = [[(MEDIA1, "en")]]
+    QUERIES = [[_PreparedQuery((MEDIA1, "en"))]]
     CALL = (
         Endpoint.SEARCH_SUBTITLES,
         [
@@ -336,6 +599,106 @@ def test__search_subtitles_unranked():
     )
 
 
+def test_search_subtitles_unranked_languages():
+    QUERIES = [(MEDIA1, "en"), (MEDIA1, "fr"), (MOVIE_INFO1, "en"), (MEDIA1, "de")]
+    with (SUBWINDER_RESPONSES / "search_subtitles.json").open() as f:
+        RESP = json.load(f)
+    french = dict(RESP["data"][0], ISO639="fr", SubLanguageID="fre")
+    RESP["data"].append(french)
+    # Languages for the same media get merged into one query
+    CALL = (
+        Endpoint.SEARCH_SUBTITLES,
+        [
+            {
+                "sublanguageid": "eng,fre,ger",
+                "moviehash": "18379ac9af039390",
+                "moviebytesize": "366876694",
+            },
+            {"sublanguageid": "eng", "imdbid": MOVIE_INFO1.imdbid},
+        ],
+    )
+
+    asw = _dummy_auth_subwinder()
+    with patch.object(asw, "_request", return_value=RESP) as mocked:
+        results = asw.search_subtitles_unranked(QUERIES)
+
+    mocked.assert_called_once_with(*CALL)
+    # And then get split back out by language
+    assert results[0] == [SEARCH_RESULT2]
+    assert [r.subtitles.lang_2 for r in results[1]] == ["fr"]
+    assert results[2:] == [[], []]
+
+    # The dev useragent only gets 5 results per query so each language is searched
+    # on its own instead of sharing them
+    asw.limited_search_size = True
+    with patch.object(asw, "_request", return_value={"data": []}) as mocked:
+        asw.search_subtitles_unranked(QUERIES)
+
+    assert mocked.call_count == 4
+    assert [c[0][1][0]["sublanguageid"] for c in mocked.call_args_list] == [
+        "eng",
+        "fre",
+        "eng",
+        "ger",
+    ]
+
+
+def test_search_subtitles_unranked_duplicates():
+    with (SUBWINDER_RESPONSES / "search_subtitles.json").open() as f:
+        RESP = json.load(f)
+    # Same file in a different spot
+    DUPLICATE = MediaFile.from_parts(
+        MEDIA1.hash, MEDIA1.size, Path("other dir"), Path("other file.mkv")
+    )
+    QUERIES = [(MEDIA1, "en"), (MOVIE_INFO1, "en"), (DUPLICATE, "en")]
+
+    asw = _dummy_auth_subwinder()
+    asw.limited_search_size = True
+    with patch.object(asw, "_request", return_value=RESP) as mocked, patch(
+        "subwinder.core._build_search_query", wraps=_build_search_query
+    ) as mocked_build:
+        results = asw.search_subtitles_unranked(QUERIES)
+
+    # Each query is only built once no matter how many steps use it
+    assert mocked_build.call_count == len(QUERIES)
+    # The duplicate is only searched for once
+    assert mocked.call_count == 2
+    assert results[0] == [SEARCH_RESULT2]
+    # But still gets results pointing to its own location
+    [duplicate] = results[2]
+    assert duplicate.media.get_dirname() == Path("other dir")
+    assert duplicate.media.get_filename() == Path("other file.mkv")
+    assert duplicate.subtitles == SEARCH_RESULT2.subtitles
+    assert results[0][0].media.get_dirname() == MEDIA1.get_dirname()
+
+    assert asw.search_stats() == SearchStats(queries=3, duplicates=1, requests_saved=1)
+
+
+def test__search_subtitles_unranked_cache():
+    QUERIES = [_PreparedQuery((MEDIA1, "en")), _PreparedQuery((MOVIE_INFO1, "fr"))]
+    with (SUBWINDER_RESPONSES / "search_subtitles.json").open() as f:
+        RESP = json.load(f)
+
+    asw = _dummy_auth_subwinder()
+    asw.search_cache = MemorySearchCache()
+
+    # The first search caches both the result and the query without any results
+    with patch.object(asw, "_request", return_value=RESP) as mocked:
+        assert asw._search_subtitles_unranked(QUERIES) == [[SEARCH_RESULT2], []]
+        mocked.assert_called_once()
+
+        assert asw._search_subtitles_unranked(QUERIES) == [[SEARCH_RESULT2], []]
+        mocked.assert_called_once()
+
+    # Only the queries that aren't cached get sent
+    with patch.object(asw, "_request", return_value={"data": []}) as mocked:
+        queries = [_PreparedQuery((EPISODE_INFO1, "de")), QUERIES[0]]
+        assert asw._search_subtitles_unranked(queries) == [[], [SEARCH_RESULT2]]
+
+    assert len(mocked.call_args[0][1]) == 1
+    assert mocked.call_args[0][1][0]["imdbid"] == EPISODE_INFO1.imdbid
+
+
 def test_suggest_media():
     QUERY = ["matrix"]
     CALL = (Endpoint.SUGGEST_MOVIE, "matrix")
@@ -404,3 +767,153 @@ def test__preview_subtitles():
     IDEAL = ["1\r\n00:00:12,345 --> 00:01:23,456\r\nFirst subtitle\r\nblock"]
 
     _standard_asw_mock("_preview_subtitles", "_request", QUERIES, RESP, CALL, IDEAL)
+
+
+def test_multicall():
+    asw = _dummy_auth_subwinder()
+    asw._token = "<token>"
+    with (SUBWINDER_RESPONSES / "get_comments.json").open() as f:
+        COMMENTS_RESP = json.load(f)
+    OK_RESP = {"status": "200 OK", "seconds": "0.055"}
+    CALLS = [
+        call(
+            [
+                (Endpoint.SUBTITLES_VOTE, "<token>", (SEARCH_RESULT1.subtitles.id, 7)),
+                (
+                    Endpoint.ADD_COMMENT,
+                    "<token>",
+                    (SEARCH_RESULT1.subtitles.id, "Hi", False),
+                ),
+            ]
+        ),
+        call(
+            [
+                (
+                    Endpoint.GET_COMMENTS,
+                    "<token>",
+                    ([SEARCH_RESULT1.subtitles.id, SEARCH_RESULT2.subtitles.id],),
+                ),
+            ]
+        ),
+    ]
+
+    with patch("subwinder._request.multicall") as mocked:
+        mocked.side_effect = [[OK_RESP, SubDownloadError("<err>")], [COMMENTS_RESP]]
+
+        with asw.multicall(chunk_size=2) as mc:
+            vote = mc.vote(SEARCH_RESULT1, 7)
+            comment = mc.add_comment(SEARCH_RESULT1, "Hi")
+            comments = mc.get_comments([SEARCH_RESULT1, SEARCH_RESULT2])
+
+            # Nothing is sent till the `Multicall` is flushed
+            assert len(mc) == 3
+            assert not vote.done()
+            mocked.assert_not_called()
+
+    # Calls get sent in chunks of `chunk_size`
+    assert mocked.call_args_list == CALLS
+    assert vote.result() is None
+    with pytest.raises(SubDownloadError):
+        comment.result()
+    assert len(comments.result()[1]) == 2
+
+    # Invalid calls are caught before they're queued
+    with pytest.raises(ValueError):
+        asw.multicall().vote(SEARCH_RESULT1, 11)
+
+
+def test_download_subtitles_parallelism():
+    NUM_DOWNLOADS = 45
+    DOWNLOADS = [SEARCH_RESULT1.subtitles] * NUM_DOWNLOADS
+    PATHS = [Path("test dir") / f"{i}.srt" for i in range(NUM_DOWNLOADS)]
+
+    class _Formatter(NameFormatter):
+        def __init__(self):
+            self.count = 0
+
+        def generate(self, *args):
+            path = PATHS[self.count]
+            self.count += 1
+            return path
+
+    asw = _dummy_auth_subwinder()
+
+    with patch.object(asw, "daily_download_info", return_value=DOWNLOAD_INFO):
+        with patch.object(asw, "_download_subtitles", return_value=None) as mocked:
+            result = asw.download_subtitles(
+                DOWNLOADS, "test dir", _Formatter(), parallelism=3
+            )
+
+        # Batches can finish in any order, but the paths still match the downloads
+        assert result == PATHS
+        assert sorted(c.args[1] for c in mocked.call_args_list) == sorted(
+            [PATHS[:20], PATHS[20:40], PATHS[40:]]
+        )
+
+        with pytest.raises(ValueError):
+            asw.download_subtitles(DOWNLOADS, "test dir", parallelism=0)
+
+
+def test_iter_variants():
+    asw = _dummy_auth_subwinder()
+
+    # Results come out as each batch is done, and any iterable works
+    def guesses():
+        yield from ["one", "two", "three", "four"]
+
+    with patch.object(asw, "_guess_media_unranked") as mocked:
+        mocked.side_effect = lambda batch: [f"<{query}>" for query in batch]
+        results = asw.iter_guess_media_unranked(guesses())
+        assert next(results) == "<one>"
+        assert mocked.call_count == 1
+        assert list(results) == ["<two>", "<three>", "<four>"]
+        assert mocked.call_count == 2
+
+    with patch.object(asw, "_preview_subtitles") as mocked:
+        mocked.side_effect = lambda ids: ids
+        previews = asw.iter_preview_subtitles(iter([SEARCH_RESULT1] * 21))
+        assert len(list(previews)) == 21
+        assert mocked.call_count == 2
+
+    with patch.object(asw, "_search_subtitles_unranked") as mocked:
+        mocked.side_effect = lambda batch: [[] for _ in batch]
+        queries = ((media, "en") for media in [MEDIA1, MOVIE_INFO1, MEDIA1])
+        assert list(asw.iter_search_subtitles_unranked(queries)) == [[], [], []]
+        # Duplicates in the same batch are still only searched once
+        mocked.assert_called_once_with(
+            [_PreparedQuery((MEDIA1, "en")), _PreparedQuery((MOVIE_INFO1, "en"))]
+        )
+
+    # Invalid queries are still caught
+    with pytest.raises(ValueError):
+        list(asw.iter_search_subtitles_unranked(iter([MEDIA1])))
+
+
+def test_iter_download_subtitles():
+    asw = _dummy_auth_subwinder()
+    DOWNLOADS = iter([SEARCH_RESULT1.subtitles] * 25)
+
+    with patch.object(asw, "daily_download_info", return_value=DOWNLOAD_INFO) as info:
+        with patch.object(asw, "_download_subtitles") as mocked:
+            paths = asw.iter_download_subtitles(DOWNLOADS, "dir")
+            assert next(paths) == Path("dir") / SEARCH_RESULT1.subtitles.filename
+            assert mocked.call_count == 1
+
+            assert len(list(paths)) == 24
+            assert mocked.call_count == 2
+
+    # The remaining downloads are only checked once and then tracked locally
+    info.assert_called_once()
+    assert asw.daily_remaining == DOWNLOAD_INFO.remaining - 25
+
+    asw = _dummy_auth_subwinder()
+    remaining = DOWNLOAD_INFO.remaining
+    with patch.object(asw, "daily_download_info", return_value=DOWNLOAD_INFO):
+        with patch.object(asw, "_download_subtitles") as mocked:
+            paths = asw.iter_download_subtitles(
+                [SEARCH_RESULT1.subtitles] * (remaining + 1), "dir"
+            )
+            with pytest.raises(SubDownloadError):
+                list(paths)
+
+    assert mocked.call_count == remaining // 20
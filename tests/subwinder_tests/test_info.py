@@ -1,5 +1,6 @@
 import json
 from datetime import datetime
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
@@ -16,6 +17,7 @@ from subwinder.info import (
     User,
     build_media,
 )
+from subwinder.ranking import rank_search_subtitles
 from tests.constants import (
     EPISODE_INFO1,
     FULL_USER_INFO1,
@@ -116,3 +118,53 @@ def test_SearchResult():
     search_result = SearchResult.from_data(SAMPLE_RESP)
     search_result.media.set_filepath("/path/to/file.mkv")
     assert SEARCH_RESULT2 == search_result
+
+
+def test_compact_containers():
+    with (SUBWINDER_RESPONSES / "search_subtitles.json").open() as f:
+        SAMPLE_RESP = json.load(f)["data"][0]
+
+    search_result = SearchResult.from_data(SAMPLE_RESP)
+    for container in (search_result, search_result.media, search_result.subtitles):
+        assert not hasattr(container, "__dict__")
+
+    # Fields are only parsed when they're used
+    assert not hasattr(search_result, "_upload_date")
+    assert search_result.upload_date == SEARCH_RESULT2.upload_date
+    assert hasattr(search_result, "_upload_date")
+    # Repeated strings share the same object between results
+    other = SearchResult.from_data(SAMPLE_RESP)
+    assert other.subtitles.ext is search_result.subtitles.ext
+    assert other.subtitles.filename == search_result.subtitles.filename
+
+
+def test_compact_containers_non_str():
+    # The API can give ints for string fields, those are kept as is
+    movie = Movie(1917, 2019, 8579674, None, None)
+    assert movie.name == 1917
+    assert movie.imdbid == 8579674
+
+
+def test_SearchResult_lazy():
+    with (SUBWINDER_RESPONSES / "search_subtitles.json").open() as f:
+        SAMPLE_RESP = json.load(f)["data"][0]
+
+    search_result = SearchResult.from_data(SAMPLE_RESP)
+    search_result._locate_media("/path/to", "file.mkv")
+
+    # Ranking only needs a few fields so the rest are never parsed
+    assert rank_search_subtitles([search_result], None, sub_exts=["SRT"]) is not None
+    for field in ("_author", "_media", "_subtitles", "_upload_date", "_rating"):
+        assert not hasattr(search_result, field)
+
+    # Setting a field takes precedence over the raw data
+    search_result.score = 0.0
+    assert search_result.score == 0.0
+    search_result.score = SEARCH_RESULT2.score
+    assert search_result == SEARCH_RESULT2
+
+    # Relocating a parsed media leaves the original alone
+    media = search_result.media
+    search_result._locate_media("/other", "file.mkv")
+    assert search_result.media.get_dirname() == Path("/other")
+    assert media.get_dirname() == Path("/path/to")
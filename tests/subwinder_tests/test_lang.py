@@ -1,6 +1,11 @@
-from datetime import timedelta
+import threading
+import time
+from datetime import datetime, timedelta
 from unittest.mock import call, patch
 
+import pytest
+
+from subwinder.exceptions import SubLangError
 from subwinder.lang import (
     LangFormat,
     _converter,
@@ -8,6 +13,8 @@ from subwinder.lang import (
     lang_2s,
     lang_3s,
     lang_longs,
+    pin_snapshot,
+    save_snapshot,
 )
 
 # Snippet of the GetSubLanguages response
@@ -64,3 +71,130 @@ def test_globals(no_fake_langs):
 
         # `_get_languages` should only be called once
         mocked.assert_called_once_with()
+
+
+def test_LangConverter_indexes():
+    converter = _LangConverter()
+    # Duplicates match the first entry just like searching the list would
+    converter.set(
+        datetime.now(), [["de", "en", "en"], ["ger", "eng", "enx"], ["G", "E1", "E2"]]
+    )
+
+    assert converter.convert("en", LangFormat.LANG_2, LangFormat.LANG_3) == "eng"
+    assert converter.convert("enx", LangFormat.LANG_3, LangFormat.LANG_LONG) == "E2"
+    assert converter.contains("ger", LangFormat.LANG_3)
+    assert not converter.contains("ger", LangFormat.LANG_2)
+
+    with pytest.raises(SubLangError):
+        converter.convert("fr", LangFormat.LANG_2, LangFormat.LANG_3)
+
+    # `dump` resets everything
+    converter.dump()
+    with patch.object(converter, "_fetch", return_value=RESP):
+        assert converter.contains("fr", LangFormat.LANG_2)
+
+
+def test_LangConverter_swap():
+    converter = _LangConverter()
+    converter.set(datetime.now(), [["de", "en"], ["ger", "eng"], ["German", "English"]])
+
+    class RacingIndex(dict):
+        def __getitem__(self, lang):
+            # A refresh that reorders the list lands in the middle of the lookup
+            converter.set(
+                datetime.now(),
+                [["fr", "en", "de"], ["fre", "eng", "ger"], ["F", "E", "G"]],
+            )
+            return super().__getitem__(lang)
+
+    langs, indexes = converter._table
+    indexes[LangFormat.LANG_2.value] = RacingIndex(indexes[LangFormat.LANG_2.value])
+
+    # The lookup sticks with the list it started with
+    assert converter.convert("de", LangFormat.LANG_2, LangFormat.LANG_3) == "ger"
+    assert converter.convert("de", LangFormat.LANG_2, LangFormat.LANG_3) == "ger"
+    assert converter.list(LangFormat.LANG_2) == ["fr", "en", "de"]
+
+
+def test_contains():
+    assert "fr" in lang_2s
+    assert "fre" not in lang_2s
+    assert None not in lang_2s
+
+
+def test_LangConverter_cache_file(tmp_path):
+    CACHE_FILE = tmp_path / "langs.json"
+    IDEAL = ["de", "en", "fr"]
+
+    converter = _LangConverter()
+    converter.cache_file = CACHE_FILE
+    with patch.object(converter, "_fetch", return_value=RESP) as mocked:
+        # Nothing to serve yet so this has to block on fetching
+        assert converter.list(LangFormat.LANG_2) == IDEAL
+        mocked.assert_called_once_with()
+
+    # Another converter can pick up right where the first left off
+    other = _LangConverter()
+    other.cache_file = CACHE_FILE
+    assert other.load(CACHE_FILE)
+    with patch.object(other, "_fetch", return_value=RESP) as mocked:
+        assert other.list(LangFormat.LANG_2) == IDEAL
+        mocked.assert_not_called()
+
+        # Stale lists are still served while refreshing in the background
+        stale = datetime.now() - timedelta(hours=2)
+        other.set(stale, other._langs)
+        assert other.list(LangFormat.LANG_2) == IDEAL
+        other._refresher.join()
+        mocked.assert_called_once_with()
+        assert other._last_updated > stale
+
+    # Lookups don't wait on a slow refresh that's already running
+    fetching = threading.Event()
+    finish = threading.Event()
+
+    def slow_fetch():
+        fetching.set()
+        finish.wait(10)
+        return RESP[:1]
+
+    other.set(stale, other._langs)
+    with patch.object(other, "_fetch", side_effect=slow_fetch):
+        assert other.list(LangFormat.LANG_2) == IDEAL
+        assert fetching.wait(10)
+
+        start = time.monotonic()
+        assert other.list(LangFormat.LANG_2) == IDEAL
+        assert time.monotonic() - start < 1
+
+        finish.set()
+        other._refresher.join()
+        assert other.list(LangFormat.LANG_2) == ["de"]
+
+    # Corrupt files are just ignored
+    CACHE_FILE.write_text("not json")
+    assert not _LangConverter().load(CACHE_FILE)
+
+
+def test_snapshot(tmp_path, no_fake_langs):
+    SNAPSHOT = tmp_path / "snapshot.json"
+
+    with patch.object(_converter, "_fetch", return_value=RESP) as mocked:
+        save_snapshot(SNAPSHOT)
+        mocked.assert_called_once_with()
+
+    try:
+        _converter.default()
+        pin_snapshot(SNAPSHOT)
+
+        # Pinned lists never get refreshed even if they're old
+        _converter.set(datetime.now() - timedelta(days=365), _converter._langs)
+        with patch.object(_converter, "_fetch") as mocked:
+            assert "eng" == lang_2s.convert("en", LangFormat.LANG_3)
+            mocked.assert_not_called()
+    finally:
+        pin_snapshot(None)
+
+    with pytest.raises(SubLangError):
+        pin_snapshot(tmp_path / "missing.json")
+    assert not _converter.pinned
@@ -1,6 +1,10 @@
+from contextlib import ExitStack
 from pathlib import Path
 
+import pytest
+
 from subwinder import MediaFile
+from subwinder.exceptions import SubHashError
 from tests.utils import RandomTempFile
 
 
@@ -13,3 +17,37 @@ def test_Media():
         assert media.get_filename() == Path(rand_file.name)
         assert media.get_dirname() == rand_file.parent
         assert media.get_filepath() == rand_file
+
+
+def test_from_paths():
+    SIZES = [128 * 1024, 128 * 1024 - 1, 256 * 1024, 128 * 1024 + 1]
+
+    with ExitStack() as stack:
+        files = [
+            stack.enter_context(RandomTempFile(size, seed=i))
+            for i, size in enumerate(SIZES)
+        ]
+
+        # Results stream in as they finish, so compare them unordered
+        results = dict(MediaFile.from_paths(files, workers=2))
+        assert set(results) == set(files)
+        for filepath, size in zip(files, SIZES):
+            result = results[filepath]
+            # Too small files report the error instead of failing the whole batch
+            if size < 128 * 1024:
+                assert isinstance(result, SubHashError)
+            else:
+                assert result == MediaFile(filepath)
+
+        # `ordered` matches the order of the original files
+        ordered = [path for path, _ in MediaFile.from_paths(files, ordered=True)]
+        assert ordered == files
+
+    with pytest.raises(ValueError):
+        next(MediaFile.from_paths(files, workers=0))
+
+    # Files that can't be read are reported without stopping the rest
+    missing = [Path("/nonexistent1"), Path("/nonexistent2")]
+    results = list(MediaFile.from_paths(missing, ordered=True))
+    assert [path for path, _ in results] == missing
+    assert all(isinstance(result, FileNotFoundError) for _, result in results)
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from subwinder.exceptions import SubDownloadError
+from subwinder.names import NameFormatter
+from tests.constants import SUBTITLES_INFO1, SUBTITLES_INFO2
+
+
+def test_NameFormatter():
+    formatter = NameFormatter("{media_name}.{lang_3}.{lang_long}.{ext}")
+    DIR = Path("dir")
+    MEDIA = Path("media.mkv")
+    IDEAL = DIR / "media.ger.German.<ext>"
+
+    assert formatter.generate(SUBTITLES_INFO1, MEDIA, DIR, None) == IDEAL
+    # `download_dir` takes priority over the media's directory
+    assert formatter.generate(SUBTITLES_INFO1, MEDIA, Path("other"), DIR) == IDEAL
+
+    # Bulk generation matches generating each one
+    targets = [
+        (SUBTITLES_INFO1, MEDIA, DIR, None),
+        (SUBTITLES_INFO2, MEDIA, None, DIR),
+        (SUBTITLES_INFO1, Path("other.mkv"), DIR, None),
+    ]
+    assert formatter.generate_many(targets) == [
+        formatter.generate(*target) for target in targets
+    ]
+
+    # Fields can still use attributes
+    formatter = NameFormatter("{upload_filename.stem}-{upload_name}")
+    assert formatter.generate(SUBTITLES_INFO1, None, DIR, None) == (
+        DIR / "sub-filename-sub-filename"
+    )
+
+
+def test_NameFormatter_errors():
+    # Bad templates are caught up front
+    for name_format in ["{unknown}", "{}", "{0}", "{ext:{bad}}", "{ext"]:
+        with pytest.raises(ValueError):
+            NameFormatter(name_format)
+
+    # `media_name` is only needed when it's used
+    formatter = NameFormatter("{media_name}.{ext}")
+    with pytest.raises(SubDownloadError):
+        formatter.generate(SUBTITLES_INFO1, None, Path("dir"), None)
+    assert NameFormatter("{ext}").generate(SUBTITLES_INFO1, None, Path("d"), None)
+
+    # No directory to save to
+    with pytest.raises(SubDownloadError):
+        formatter.generate_many([(SUBTITLES_INFO1, Path("media.mkv"), None, None)])
@@ -1,4 +1,12 @@
-from subwinder.ranking import rank_guess_media, rank_search_subtitles
+from subwinder.ranking import (
+    Ranker,
+    has_ext,
+    hearing_impaired,
+    is_good,
+    rank_guess_media,
+    rank_search_subtitles,
+    score,
+)
 from tests.constants import (
     GUESS_MEDIA_RESULT,
     MOVIE_INFO1,
@@ -33,3 +41,27 @@ def test_rank_search_subtitles():
     )
     # `None` when nothing matches
     assert rank_search_subtitles(DUMMY_RESULTS, MOVIE_INFO1, sub_exts=["ass"]) is None
+
+
+def test_Ranker():
+    DUMMY_RESULTS = [SEARCH_RESULT2, SEARCH_RESULT1, SEARCH_RESULT2]
+
+    # Defaults to just ranking by score, keeping the order from the API for ties
+    ranker = Ranker()
+    assert ranker(DUMMY_RESULTS, MOVIE_INFO1) == SEARCH_RESULT1
+    top = ranker.top(DUMMY_RESULTS, 2)
+    assert top == [SEARCH_RESULT1, SEARCH_RESULT2]
+    assert top[1] is DUMMY_RESULTS[0]
+    assert ranker.top(DUMMY_RESULTS, 10) == [SEARCH_RESULT1] + [SEARCH_RESULT2] * 2
+    assert ranker.top([], 3) == []
+    assert ranker([], MOVIE_INFO1) is None
+
+    # Filters all have to pass
+    assert Ranker([is_good]).top(DUMMY_RESULTS, 3) == [SEARCH_RESULT2] * 2
+    assert Ranker([is_good, has_ext("ass")])(DUMMY_RESULTS, MOVIE_INFO1) is None
+
+    # Heavily weighted keys win out over the score
+    ranker = Ranker(keys=[(score, 1.0), (has_ext("srt"), 1000.0)])
+    assert ranker(DUMMY_RESULTS, MOVIE_INFO1) == SEARCH_RESULT2
+    ranker = Ranker(keys=[(score, -1.0), (hearing_impaired, -1000.0)])
+    assert ranker(DUMMY_RESULTS, MOVIE_INFO1) == SEARCH_RESULT2
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import subwinder._request
+from subwinder._rate_limit import FileTokenBucket, TokenBucket
+from subwinder._request import Endpoint, _client, request, set_rate_limit
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _acquire_all(buckets, num_requests):
+    clock = _FakeClock()
+    start = clock.now
+    with patch("subwinder._rate_limit.time", clock):
+        for i in range(num_requests):
+            buckets[i % len(buckets)].acquire()
+
+    return clock.now - start
+
+
+def test_TokenBucket():
+    # `burst` requests go through right away
+    assert _acquire_all([TokenBucket(rate=2, burst=4)], 4) == 0
+    # Then the rest are spaced out at `rate`
+    assert _acquire_all([TokenBucket(rate=2, burst=4)], 10) == pytest.approx(3)
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(burst=0)
+
+
+def test_FileTokenBucket(tmp_path):
+    LOCK_FILE = tmp_path / "rate_limit"
+
+    # Buckets with the same file share the limit like separate processes would
+    buckets = [FileTokenBucket(LOCK_FILE, rate=2, burst=4) for _ in range(2)]
+    assert _acquire_all(buckets, 10) == pytest.approx(3)
+
+
+def test_FileTokenBucket_async(tmp_path):
+    bucket = FileTokenBucket(tmp_path / "rate_limit", rate=2, burst=4)
+    threads = []
+
+    take = bucket._take
+
+    def recording_take():
+        threads.append(threading.get_ident())
+        return take()
+
+    # The file lock is only ever taken off of the event loop's thread
+    with patch.object(bucket, "_take", recording_take):
+        assert asyncio.run(bucket.acquire_async()) == 0
+
+    assert threads and threading.get_ident() not in threads
+
+
+class _RequestAdapter:
+    def acquire(self):
+        request(Endpoint.SERVER_INFO, None)
+
+
+def test_rate_limited_request():
+    RESP = {"status": "200 OK", "seconds": "0.15"}
+
+    # Note: the original rate limiter is restored by `_no_rate_limit` in conftest
+    set_rate_limit(rate=2, burst=1)
+    with patch.object(_client, "ServerInfo", return_value=RESP):
+        assert _acquire_all([_RequestAdapter()], 3) == pytest.approx(1)
+
+    set_rate_limit(None)
+    assert subwinder._request._rate_limiter is None
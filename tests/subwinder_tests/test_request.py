@@ -1,11 +1,20 @@
 from datetime import datetime as dt
+from http.client import RemoteDisconnected
 from multiprocessing.dummy import Pool
-from unittest.mock import call, patch
+from unittest.mock import MagicMock, call, patch
+from xmlrpc.client import Fault
 
 import pytest
 
-from subwinder._request import Endpoint, _client, request
-from subwinder.exceptions import SubServerError
+from subwinder._request import (
+    Endpoint,
+    PoolStats,
+    _client,
+    _PooledTransport,
+    multicall,
+    request,
+)
+from subwinder.exceptions import SubAuthError, SubLibError, SubServerError
 from subwinder.types import Token
 
 
@@ -56,3 +65,117 @@ def _test_request_timeout(endpoint):
 
         # `request` should keep trying long enough for the rate limit to expire
         assert (dt.now() - start).total_seconds() > RATE_LIMIT_SECONDS
+
+
+def test_pooled_transport_reuse():
+    transport = _PooledTransport(max_connections=2)
+    connection = MagicMock()
+    connection.sock = "<socket>"
+
+    with patch.object(transport, "_new_connection", return_value=connection):
+        with patch.object(transport, "single_request", return_value="resp"):
+            # The connection gets reused once the first request checks it back in
+            for _ in range(3):
+                assert transport.request("host", "/handler", b"body") == "resp"
+
+    assert transport.stats() == PoolStats(
+        size=2, in_use=0, idle=1, hits=2, misses=1, reconnects=0
+    )
+
+    # Closed connections aren't kept around
+    connection.sock = None
+    with patch.object(transport, "single_request", return_value="resp"):
+        transport.request("host", "/handler", b"body")
+    assert transport.stats().idle == 0
+
+
+def test_pooled_transport_reconnect():
+    transport = _PooledTransport(max_connections=1)
+    connection = MagicMock()
+    connection.sock = "<socket>"
+
+    with patch.object(transport, "_new_connection", return_value=connection):
+        with patch.object(transport, "single_request") as mocked:
+            # The first request warms up the pool, the second one finds the idle
+            # connection closed by the server and has to reconnect
+            mocked.side_effect = ["resp1", RemoteDisconnected(), "resp2"]
+            assert transport.request("host", "/handler", b"body") == "resp1"
+            assert transport.request("host", "/handler", b"body") == "resp2"
+
+            # A fresh connection failing is a real error though
+            transport.close_all()
+            mocked.side_effect = [RemoteDisconnected()]
+            with pytest.raises(RemoteDisconnected):
+                transport.request("host", "/handler", b"body")
+
+    assert transport.stats() == PoolStats(
+        size=1, in_use=0, idle=1, hits=1, misses=2, reconnects=1
+    )
+
+
+def test_pooled_transport_resize():
+    transport = _PooledTransport(max_connections=3)
+
+    with pytest.raises(ValueError):
+        transport.resize(0)
+
+    transport.resize(1)
+    assert transport.stats().size == 1
+
+
+def test_multicall():
+    CALLS = [
+        (Endpoint.NO_OPERATION, Token("<token>"), ()),
+        (Endpoint.SUBTITLES_VOTE, Token("<token>"), ("<sub-id>", 5)),
+        (Endpoint.SERVER_INFO, None, ()),
+    ]
+    PAYLOAD = [
+        {"methodName": "NoOperation", "params": ["<token>"]},
+        {"methodName": "SubtitlesVote", "params": ["<token>", "<sub-id>", 5]},
+        {"methodName": "ServerInfo", "params": []},
+    ]
+    OK_RESP = {"status": "200 OK", "seconds": "0.055"}
+    RESP = [
+        [OK_RESP],
+        [{"status": "401 Unauthorized", "seconds": "0.055"}],
+        {"faultCode": 1, "faultString": "<fault>"},
+    ]
+
+    system = MagicMock()
+    system.multicall.return_value = RESP
+    with patch.object(_client, "system", system):
+        results = multicall(CALLS)
+
+    system.multicall.assert_called_once_with(PAYLOAD)
+    assert results[0] == OK_RESP
+    # Errors are mapped the same as with `request`
+    assert isinstance(results[1], SubAuthError)
+    assert isinstance(results[2], SubLibError)
+
+    # Nothing to send means no request
+    assert multicall([]) == []
+
+
+def test_multicall_fallback():
+    CALLS = [
+        (Endpoint.NO_OPERATION, Token("<token>"), ()),
+        (Endpoint.GET_USER_INFO, Token("<token>"), ()),
+    ]
+    OK_RESP = {"status": "200 OK", "seconds": "0.055"}
+
+    system = MagicMock()
+    system.multicall.side_effect = Fault(-32601, "server error. requested method")
+    with patch("subwinder._request._multicall_supported", True):
+        with patch.object(_client, "system", system):
+            with patch.object(_client, "NoOperation", return_value=OK_RESP):
+                with patch.object(_client, "GetUserInfo") as mocked:
+                    mocked.return_value = {"status": "401 Unauthorized"}
+                    results = multicall(CALLS)
+
+                    # Multicall was rejected so the calls get sent individually
+                    assert results[0] == OK_RESP
+                    assert isinstance(results[1], SubAuthError)
+
+                    # And multicall isn't tried again
+                    multicall(CALLS)
+                    system.multicall.assert_called_once()
@@ -1,10 +1,13 @@
+import base64
+import gzip
 import os
+from io import BytesIO
 from tempfile import NamedTemporaryFile
 
 import pytest
 
 from subwinder.exceptions import SubHashError
-from subwinder.utils import extract, special_hash
+from subwinder.utils import extract, extract_to, special_hash
 from tests.utils import RandomTempFile
 
 
@@ -55,3 +58,31 @@ def test_special_hash():
     for i, hash in zip(range(5), HASHES):
         with RandomTempFile(HASHED_SIZE, seed=i) as rand_file:
             assert hash == special_hash(rand_file)
+
+
+def test_extract_to():
+    # Larger than a chunk and not evenly divisible so that leftovers get carried over
+    IDEAL = bytes(range(256)) * 1000
+    compressed = base64.b64encode(gzip.compress(IDEAL)).decode("ascii")
+
+    for b in [compressed, compressed.encode("ascii")]:
+        for chunk_size in [1, 7, 64 * 1024]:
+            out = BytesIO()
+            assert extract_to(b, out, chunk_size) == len(IDEAL)
+            assert out.getvalue() == IDEAL
+
+    # Whitespace is ignored just like with `extract`
+    wrapped = "\n".join(compressed[i : i + 76] for i in range(0, len(compressed), 76))
+    out = BytesIO()
+    extract_to(wrapped, out, chunk_size=100)
+    assert out.getvalue() == extract(wrapped)
+
+    # Multiple gzip members get concatenated
+    multi = base64.b64encode(gzip.compress(b"Hello ") + gzip.compress(b"there"))
+    out = BytesIO()
+    extract_to(multi, out, chunk_size=8)
+    assert out.getvalue() == b"Hello there"
+
+    # Truncated data is an error
+    with pytest.raises(EOFError):
+        extract_to(base64.b64encode(gzip.compress(IDEAL)[:-100]), BytesIO())